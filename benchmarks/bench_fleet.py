@@ -0,0 +1,158 @@
+"""
+Macro benchmarks for connecting and running commands on many sessions
+
+The fake device (netdev.testing.FakeDevice) runs in a separate process on localhost, so the
+client side is measured without the server competing for its event loop. For every count of
+sessions it measures:
+
+* connects per second: all sessions are connected concurrently (not more than --limit at once)
+* commands per second: every connected session sends --commands commands
+* fleet jobs per second: netdev.fleet.run() with connecting, commands and disconnecting
+
+Thousands of sessions need a high limit of open files (ulimit -n).
+
+Usage: python benchmarks/bench_fleet.py [--sessions 1,10,100,1000,5000] [--json results.json]
+"""
+import asyncio
+import functools
+import multiprocessing
+import time
+
+from common import parser, result, write_json
+
+import netdev
+import netdev.fleet
+from netdev.testing import FakeDevice
+
+OUTPUT = "\n".join(
+    "GigabitEthernet0/{} is up, line protocol is up".format(i) for i in range(48)
+)
+
+
+def fake_device(args):
+    return FakeDevice(
+        args.device_type, latency=args.latency, outputs={"show interfaces": OUTPUT}
+    )
+
+
+def serve(args, ports):
+    """Entry point of the server process"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    fake = fake_device(args)
+    loop.run_until_complete(fake.start())
+    ports.put(fake.port)
+    loop.run_forever()
+
+
+def raise_open_files_limit():
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def bench_sessions(params, sessions, args):
+    """Return connects per second and commands per second for the count of sessions"""
+    devices = [netdev.create(**params) for _ in range(sessions)]
+    limit = asyncio.Semaphore(args.limit)
+
+    async def connect(device):
+        async with limit:
+            await device.connect()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[connect(device) for device in devices])
+    connects = sessions / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[send_commands(device, args.commands) for device in devices])
+    commands = sessions * args.commands / (time.perf_counter() - start)
+    await asyncio.gather(*[device.disconnect() for device in devices])
+    return connects, commands
+
+
+async def send_commands(device, count):
+    for _ in range(count):
+        await device.send_command("show interfaces")
+
+
+async def bench_fleet(params, sessions, args):
+    """Return jobs per second of netdev.fleet.run()"""
+    job = functools.partial(send_commands, count=args.commands)
+    start = time.perf_counter()
+    async for item in netdev.fleet.run([params] * sessions, job, limit=args.limit):
+        if item.exception is not None:
+            raise item.exception
+    return sessions / (time.perf_counter() - start)
+
+
+async def run(params, args):
+    results = []
+    print(
+        "{:>10}{:>16}{:>16}{:>16}".format(
+            "sessions", "connects/s", "commands/s", "fleet jobs/s"
+        )
+    )
+    for sessions in args.sessions:
+        connects, commands = await bench_sessions(params, sessions, args)
+        jobs = await bench_fleet(params, sessions, args)
+        print(
+            "{:>10}{:>16.1f}{:>16.1f}{:>16.1f}".format(
+                sessions, connects, commands, jobs
+            )
+        )
+        common = dict(
+            sessions=sessions,
+            device_type=args.device_type,
+            latency=args.latency,
+            commands=args.commands,
+        )
+        results.append(result("connects", connects, "1/s", **common))
+        results.append(result("commands", commands, "1/s", **common))
+        results.append(result("fleet_jobs", jobs, "1/s", **common))
+    return results
+
+
+def main():
+    args = parser(__doc__.strip().splitlines()[0])
+    args.add_argument(
+        "--sessions",
+        default="1,10,100",
+        type=lambda value: [int(count) for count in value.split(",")],
+        help="comma separated counts of sessions. Default is 1,10,100",
+    )
+    args.add_argument("--commands", type=int, default=10, help="commands per session")
+    args.add_argument("--limit", type=int, default=500, help="simultaneous connects")
+    args.add_argument(
+        "--latency", type=float, default=0, help="latency of the device in seconds"
+    )
+    args.add_argument("--device-type", default="cisco_ios", help="emulated platform")
+    args = args.parse_args()
+    raise_open_files_limit()
+
+    context = multiprocessing.get_context("spawn")
+    ports = context.Queue()
+    server = context.Process(target=serve, args=(args, ports), daemon=True)
+    server.start()
+    try:
+        fake = fake_device(args)
+        fake.host, fake.port = "127.0.0.1", ports.get(timeout=30)
+        params = fake.connection_params()
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            results = loop.run_until_complete(run(params, args))
+        finally:
+            loop.close()
+    finally:
+        server.terminate()
+        server.join()
+    write_json(args.json, "fleet", results)
+
+
+if __name__ == "__main__":
+    main()
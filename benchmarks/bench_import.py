@@ -0,0 +1,49 @@
+"""
+Benchmarks for the import time of netdev
+
+Every statement is run in a fresh interpreter, so the time includes the cold import of all modules
+which are pulled by it. The time of the bare interpreter start is subtracted.
+
+Usage: python benchmarks/bench_import.py [--json results.json]
+"""
+import os
+import subprocess
+import sys
+import time
+
+from common import ROOT, parser, result, write_json
+
+STATEMENTS = (
+    ("import netdev", "import netdev"),
+    ("create one device", "import netdev; netdev.create(host='h', device_type='cisco_ios')"),
+    ("import all vendors", "from netdev.vendors import *"),
+    ("import asyncssh", "import asyncssh"),
+)
+
+
+def run(statement, repeat):
+    """Return the best time of running the statement in a new interpreter in milliseconds"""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="")
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], env=env, check=True)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best * 1000
+
+
+def main(repeat=10):
+    args = parser(__doc__.strip().splitlines()[0]).parse_args()
+    results = []
+    baseline = run("pass", repeat)
+    print("{:<28}{:>12}".format("statement", "time,ms"))
+    for title, statement in STATEMENTS:
+        value = run(statement, repeat) - baseline
+        print("{:<28}{:>12.1f}".format(title, value))
+        results.append(result("import", value, "ms", statement=title))
+    write_json(args.json, "import", results)
+
+
+if __name__ == "__main__":
+    main()
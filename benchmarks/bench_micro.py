@@ -0,0 +1,116 @@
+"""
+Micro benchmarks for the hot path of reading and post-processing the output
+
+Reading runs the real _read_until_prompt() of the device over a stub channel which returns
+the prepared output in chunks of the given size, so only the reading loop is measured.
+It's measured again with the stats of instrumentation hooks collected for every read.
+Post-processing functions are called on the whole output like in send_command()
+
+Usage: python benchmarks/bench_micro.py [--quick] [--json results.json]
+"""
+import asyncio
+
+from common import ChunkReader, best_time, make_output, parser, result, write_json
+from netdev.instrumentation import Hooks, OperationStats
+from netdev.vendors import CiscoIOS
+
+SIZES = (1024, 64 * 1024, 1024 * 1024, 8 * 1024 * 1024, 50 * 1024 * 1024)
+
+QUICK_SIZES = (1024, 64 * 1024, 1024 * 1024)
+
+CHUNK_SIZES = (256, 4096, 32768)
+
+PROMPT = "router#"
+
+COMMAND = "show interfaces\n"
+
+
+def make_device(loop):
+    device = CiscoIOS(host="localhost", loop=loop)
+    device._base_prompt = PROMPT[:-1]
+    device._base_pattern = CiscoIOS._pattern.format(prompt="router", delimiters=r">|\#")
+    return device
+
+
+def bench_read(loop, sizes, chunk_sizes, name="read_until_prompt", hooks=False):
+    device = make_device(loop)
+    if hooks:
+        device._hooks = Hooks()
+        device._stats = OperationStats("send_command", COMMAND)
+    results = []
+    for size in sizes:
+        data = COMMAND.replace("\n", "\r\n") + make_output(size) + "\r\n" + PROMPT
+        number = max(1, 4 * 1024 * 1024 // size)
+        for chunk_size in chunk_sizes:
+            reader = device._stdout = ChunkReader(data, chunk_size)
+
+            def read():
+                reader.rewind()
+                loop.run_until_complete(device._read_until_prompt())
+
+            value = best_time(read, number)
+            results.append(result(name, value, "ms", size=size, chunk_size=chunk_size))
+    return results
+
+
+def bench_processing(loop, sizes):
+    device = make_device(loop)
+
+    def normalize_output(data):
+        return device._normalize_output(
+            data, COMMAND, strip_command=True, strip_prompt=True
+        )
+
+    functions = (
+        ("strip_ansi_escape_codes", device._strip_ansi_escape_codes, True),
+        ("normalize_linefeeds", device._normalize_linefeeds, False),
+        ("strip_command", lambda data: device._strip_command(COMMAND, data), False),
+        ("normalize_output", normalize_output, False),
+    )
+    results = []
+    for size in sizes:
+        number = max(1, 4 * 1024 * 1024 // size)
+        for name, func, with_ansi in functions:
+            data = COMMAND + make_output(size, with_ansi) + "\r\n" + PROMPT
+            value = best_time(lambda: func(data), number)
+            results.append(result(name, value, "ms", size=size))
+    return results
+
+
+def print_results(results):
+    print(
+        "{:<28}{:>12}{:>12}{:>12}{:>12}".format("", "size", "chunk", "time,ms", "MB/s")
+    )
+    for item in results:
+        params = item["params"]
+        print(
+            "{:<28}{:>12}{:>12}{:>12.3f}{:>12.1f}".format(
+                item["name"],
+                params["size"],
+                params.get("chunk_size", ""),
+                item["value"],
+                params["size"] / 1024 / 1024 / item["value"] * 1000,
+            )
+        )
+
+
+def main():
+    args = parser(__doc__.strip().splitlines()[0])
+    args.add_argument("--quick", action="store_true", help="only outputs up to 1 MB")
+    args = args.parse_args()
+    sizes = QUICK_SIZES if args.quick else SIZES
+    loop = asyncio.new_event_loop()
+    try:
+        results = bench_read(loop, sizes, CHUNK_SIZES)
+        results += bench_read(
+            loop, sizes, (256,), name="read_until_prompt_hooks", hooks=True
+        )
+        results += bench_processing(loop, sizes)
+    finally:
+        loop.close()
+    print_results(results)
+    write_json(args.json, "micro", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmarks for the text processing of netdev output
+
+Usage: python benchmarks/bench_text.py [--json results.json]
+"""
+import re
+
+from common import best_time, make_output, parser, result, write_json
+from netdev.vendors import BaseDevice
+
+
+def legacy_strip_ansi_escape_codes(string_buffer):
+    """Previous implementation of BaseDevice._strip_ansi_escape_codes with 11 passes"""
+    code_save_cursor = chr(27) + r"7"
+    code_scroll_screen = chr(27) + r"\[r"
+    code_restore_cursor = chr(27) + r"8"
+    code_cursor_up = chr(27) + r"\[\d+A"
+    code_cursor_down = chr(27) + r"\[\d+B"
+
+    code_position_cursor = chr(27) + r"\[\d+;\d+H"
+    code_show_cursor = chr(27) + r"\[\?25h"
+    code_next_line = chr(27) + r"E"
+    code_erase_line_from_cursor = chr(27) + r"\[K"
+    code_erase_line = chr(27) + r"\[2K"
+    code_enable_scroll = chr(27) + r"\[\d+;\d+r"
+
+    code_set = [
+        code_save_cursor,
+        code_scroll_screen,
+        code_restore_cursor,
+        code_cursor_up,
+        code_cursor_down,
+        code_position_cursor,
+        code_show_cursor,
+        code_erase_line,
+        code_erase_line_from_cursor,
+        code_enable_scroll,
+    ]
+
+    output = string_buffer
+    for ansi_esc_code in code_set:
+        output = re.sub(ansi_esc_code, "", output)
+    return re.sub(code_next_line, "\n", output)
+
+
+def legacy_normalize_output(output, command_string, base_prompt):
+    """Previous post-processing of send_command: regex linefeeds and split/join for prompt and command"""
+    output = re.compile(r"(\r\r\n|\r\n|\n\r)").sub("\n", output)
+    response_list = output.split("\n")
+    if base_prompt in response_list[-1]:
+        output = "\n".join(response_list[:-1])
+    if "\x08" in output:
+        output = output.replace("\x08", "")
+        return "\n".join(output.split("\n")[1:])
+    return output[len(command_string) :]
+
+
+def bench(func, data, number):
+    """Return the best time of one call in milliseconds"""
+    return best_time(lambda: func(data), number)
+
+
+def main():
+    args = parser(__doc__.strip().splitlines()[0]).parse_args()
+    results = []
+    print("{:<28}{:>12}{:>12}{:>12}".format("strip_ansi_escape_codes", "size", "legacy,ms", "new,ms"))
+    for with_ansi in (False, True):
+        for size in (1024, 64 * 1024, 1024 * 1024):
+            data = make_output(size, with_ansi)
+            assert legacy_strip_ansi_escape_codes(data) == BaseDevice._strip_ansi_escape_codes(data)
+            number = max(1, 2 * 1024 * 1024 // size)
+            legacy = bench(legacy_strip_ansi_escape_codes, data, number)
+            new = bench(BaseDevice._strip_ansi_escape_codes, data, number)
+            title = "with codes" if with_ansi else "without codes"
+            print("{:<28}{:>12}{:>12.3f}{:>12.3f}".format(title, size, legacy, new))
+            for name, value in (("legacy", legacy), ("new", new)):
+                item = result("strip_ansi_escape_codes", value, "ms", size=size, with_ansi=with_ansi, implementation=name)
+                results.append(item)
+
+    device = BaseDevice(host="localhost")
+    device._base_prompt = "router"
+    command = "show interfaces\n"
+
+    def normalize(data):
+        return device._normalize_output(data, command, strip_command=True, strip_prompt=True)
+
+    print("{:<28}{:>12}{:>12}{:>12}".format("normalize_output", "size", "legacy,ms", "new,ms"))
+    for size in (1024, 64 * 1024, 1024 * 1024, 8 * 1024 * 1024):
+        data = "show interfaces\r\n" + make_output(size, False) + "\r\nrouter#"
+        assert legacy_normalize_output(data, command, "router") == normalize(data)
+        number = max(1, 2 * 1024 * 1024 // size)
+        legacy = bench(lambda out: legacy_normalize_output(out, command, "router"), data, number)
+        new = bench(normalize, data, number)
+        print("{:<28}{:>12}{:>12.3f}{:>12.3f}".format("", size, legacy, new))
+        for name, value in (("legacy", legacy), ("new", new)):
+            results.append(result("normalize_output", value, "ms", size=size, implementation=name))
+    write_json(args.json, "text", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Helpers shared by the benchmarks: test output, the stub channel, timing and machine readable results
+
+Every benchmark script accepts ``--json PATH`` and writes one document there::
+
+    {"benchmark": "micro", "environment": {...}, "results": [
+        {"name": "read_until_prompt", "params": {"size": 1024, "chunk_size": 4096},
+         "value": 0.051, "unit": "ms"}, ...]}
+
+Documents of two commits are compared by benchmarks/compare.py
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+ESC = "\x1b"
+
+
+class ChunkReader(object):
+    """Stub of the channel returning the output in chunks of the fixed size"""
+
+    def __init__(self, data, chunk_size):
+        self._chunks = [
+            data[start : start + chunk_size]
+            for start in range(0, len(data), chunk_size)
+        ]
+        self._index = 0
+
+    def rewind(self):
+        self._index = 0
+
+    async def read(self, n):
+        chunk = self._chunks[self._index]
+        self._index += 1
+        return chunk
+
+
+def make_output(size, with_ansi=False):
+    """Make output of the given size looking like IOS output (or SG3XX and Mikrotik output with ANSI codes)"""
+    line = "ether1   R  1500  00:0C:42:00:00:01  enabled   uplink to core\r\n"
+    if with_ansi:
+        line = ESC + "[K" + line + ESC + "7" + ESC + "[1;24r" + ESC + "8" + ESC + "E"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def parser(description):
+    """Return the argument parser with the common arguments"""
+    result = argparse.ArgumentParser(description=description)
+    result.add_argument(
+        "--json", metavar="PATH", help="write results as JSON to the file"
+    )
+    return result
+
+
+def best_time(func, number, repeat=3):
+    """Return the best time of one call of func in milliseconds"""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+def environment():
+    """Describe the commit and the machine the results were measured on"""
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        )
+        commit = commit.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    from netdev.version import __version__
+
+    return {
+        "commit": commit,
+        "netdev": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def result(name, value, unit, **params):
+    """Return one measurement"""
+    return {"name": name, "params": params, "value": value, "unit": unit}
+
+
+def write_json(path, benchmark, results):
+    """Write results of the benchmark to the file if the path is given"""
+    if not path:
+        return
+    document = {
+        "benchmark": benchmark,
+        "environment": environment(),
+        "results": results,
+    }
+    with open(path, "w") as file:
+        json.dump(document, file, indent=2)
+        file.write("\n")
@@ -0,0 +1,83 @@
+"""
+Compare JSON results of benchmarks measured on two commits
+
+Results are matched by the name and the params. Times ("ms") are better when they are lower,
+rates ("1/s") are better when they are higher. The exit code is 1 if any result is worse than
+the threshold, so the script can fail CI jobs.
+
+Usage: python benchmarks/compare.py base.json new.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ("ms",)
+
+
+def load(path):
+    with open(path) as file:
+        document = json.load(file)
+    return {
+        (item["name"], json.dumps(item["params"], sort_keys=True)): item
+        for item in document["results"]
+    }
+
+
+def change(base, new):
+    """Return the change of the value in percents"""
+    if base["value"] == 0:
+        return 0.0
+    return (new["value"] / base["value"] - 1) * 100
+
+
+def is_regression(base, new, threshold):
+    percents = change(base, new)
+    if base["unit"] in LOWER_IS_BETTER:
+        return percents > threshold
+    return percents < -threshold * 100 / (100 + threshold)
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    args.add_argument("base", help="JSON results of the base commit")
+    args.add_argument("new", help="JSON results of the new commit")
+    args.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="regression threshold in percents. Default is 10",
+    )
+    args = args.parse_args()
+    base, new = load(args.base), load(args.new)
+    regressions = 0
+    print(
+        "{:<28}{:<48}{:>12}{:>12}{:>10}".format("", "params", "base", "new", "change")
+    )
+    for key in sorted(set(base) & set(new)):
+        name, params = key
+        mark = ""
+        if is_regression(base[key], new[key], args.threshold):
+            regressions += 1
+            mark = " !"
+        print(
+            "{:<28}{:<48}{:>12.3f}{:>12.3f}{:>+9.1f}%{}".format(
+                name,
+                params,
+                base[key]["value"],
+                new[key]["value"],
+                change(base[key], new[key]),
+                mark,
+            )
+        )
+    for key in sorted(set(base) ^ set(new)):
+        print(
+            "{:<28}{:<48} only in {}".format(
+                key[0], key[1], "base" if key in base else "new"
+            )
+        )
+    print("Regressions over {}%: {}".format(args.threshold, regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,51 @@
-import netdev.vendors
-from netdev.dispatcher import create, platforms
-from netdev.exceptions import DisconnectError, TimeoutError, CommitError
+import importlib
+import sys
+
+from netdev.dispatcher import create, platforms, register
+from netdev.exceptions import DisconnectError, TimeoutError, CommitError, ConfigError
+from netdev.instrumentation import Hooks, OperationStats
 from netdev.logger import logger
+from netdev.profiles import ProfileCache
 from netdev.version import __author__, __author_email__, __url__, __version__
 
 __all__ = (
     "create",
     "platforms",
+    "register",
     "logger",
     "DisconnectError",
     "TimeoutError",
     "CommitError",
+    "ConfigError",
+    "Hooks",
+    "OperationStats",
+    "ConnectionPool",
+    "ProfileCache",
     "vendors",
+    "fleet",
 )
+
+_LAZY = {"ConnectionPool": "netdev.pool", "fleet": None, "vendors": None}
+"""Attributes which import asyncssh. They are imported on the first access"""
+
+
+def __getattr__(name):
+    """Import the submodule or the attribute of the submodule on the first access"""
+    if name not in _LAZY:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    if _LAZY[name] is None:
+        value = importlib.import_module("{}.{}".format(__name__, name))
+    else:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ isn't supported (PEP 562), so everything is imported at once
+    for _name in _LAZY:
+        __getattr__(_name)
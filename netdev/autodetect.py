@@ -0,0 +1,220 @@
+"""
+Detecting device_type of the device over one SSH connection
+
+The device is fingerprinted by the SSH server banner and the shape of its first prompt. Only for
+IOS like prompts (host# or host>) one version command is sent. Then the connection and the shell
+channel are handed over to the class of the detected platform, so nothing is reconnected.
+Detected device_types are cached per host in the process and in ProfileCache if it's given
+"""
+import inspect
+import re
+
+from netdev.dispatcher import create
+from netdev.logger import logger
+from netdev.vendors.base import BaseDevice
+
+_PROMPT_SIGNATURES = (
+    (r"ROSSSH", r"^\[\S+@.+\] ?>$", "mikrotik_routeros"),
+    (r"HUAWEI", r"^<.+>$", "huawei"),
+    (r"", r"^<.+>$", "hp_comware"),
+    (r"", r"^RP/\d+/\w+/CPU\d+:.+#$", "cisco_ios_xr"),
+    (r"", r"^\S+@[\w.\-]+[>#%]$", "juniper_junos"),
+    (r"", r"^\S+@\S+:.*[$#]$", "terminal"),
+)
+"""(SSH banner, prompt, device_type). The first signature matched by both patterns wins"""
+
+_IOS_LIKE_PROMPT = r"^\S.*[>#]$"
+"""Prompt of the platforms which are recognized by the output of the version command"""
+
+_VERSION_COMMAND = "show version"
+
+_VERSION_SIGNATURES = (
+    (r"Cisco IOS XR", "cisco_ios_xr"),
+    (r"Cisco Nexus|NX-OS", "cisco_nxos"),
+    (r"Cisco Adaptive Security Appliance", "cisco_asa"),
+    (r"IOS[ -]XE", "cisco_ios_xe"),
+    (r"Cisco IOS Software|Cisco Internetwork Operating System", "cisco_ios"),
+    (r"Arista", "arista_eos"),
+    (r"ArubaOS.*Version 8\.", "aruba_aos_8"),
+    (r"ArubaOS.*Version 6\.", "aruba_aos_6"),
+    (r"EdgeSwitch", "ubiquity_edge"),
+    (r"JUNOS|Junos", "juniper_junos"),
+)
+"""(pattern in the output of the version command, device_type)"""
+
+_PAGING_PATTERN = r"--More--|-- More --|<--- More --->"
+
+_detected = {}
+"""Detected device_types by host in this process"""
+
+
+class AutoDetect(object):
+    """
+    Device which detects its device_type while connecting. It's created by
+    :func:`netdev.create` with ``device_type="autodetect"``
+
+    The context manager returns the connected object of the detected class. After connect()
+    all attributes are taken from this object::
+
+        async with netdev.create(host="10.0.0.1", device_type="autodetect", **params) as device:
+            print(device.device_type, await device.send_command("show clock"))
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._args = args
+        self._kwargs = kwargs
+        self._device = None
+
+    @property
+    def device(self):
+        """Connected object of the detected class or None before connecting"""
+        return self._device
+
+    @property
+    def device_type(self):
+        """Detected device_type or None before connecting"""
+        if self._device is None:
+            return None
+        return self._device._device_type
+
+    def __getattr__(self, name):
+        device = self.__dict__.get("_device")
+        if device is None:
+            raise AttributeError(
+                "{!r} has no attribute {!r} before connecting".format(self, name)
+            )
+        return getattr(device, name)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self._device
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._device.disconnect()
+
+    async def connect(self):
+        """
+        Detect device_type (or take it from cache) and connect by the detected class
+
+        If connecting by the cached device_type fails, the cached value is dropped and device_type
+        is detected again, because the device may have been replaced by another platform
+        """
+        host = self._kwargs.get("host")
+        profile_cache = self._kwargs.get("profile_cache")
+        device_type = _detected.get(host)
+        if device_type is None and profile_cache is not None:
+            profile = profile_cache.get(host, "autodetect")
+            device_type = profile and profile.get("device_type")
+        if device_type is not None:
+            logger.info("Host %s: Using detected device_type %s", host, device_type)
+            device = create(*self._args, **self._params(device_type))
+            try:
+                await device.connect()
+            except Exception as e:
+                logger.info(
+                    "Host %s: Connecting as %s has failed: %r. Detecting device_type again",
+                    host,
+                    device_type,
+                    e,
+                )
+                _close(device)
+                _detected.pop(host, None)
+            else:
+                self._device = device
+                return
+
+        detector = _Detector(*self._args, **self._detector_params())
+        try:
+            device_type, prompt = await detector.detect()
+        except BaseException:
+            _close(detector)
+            raise
+        _detected[host] = device_type
+        if profile_cache is not None:
+            profile_cache.set(host, "autodetect", {"device_type": device_type})
+        device = create(*self._args, **self._params(device_type))
+        device._adopt_session(detector, prompt)
+        try:
+            await device.connect()
+        except BaseException:
+            _close(device)
+            raise
+        self._device = device
+
+    def _params(self, device_type):
+        return dict(self._kwargs, device_type=device_type)
+
+    def _detector_params(self):
+        """
+        Params of the detector: only connection params of BaseDevice without caching. Hooks aren't
+        given, so detection isn't reported as connecting of the device
+        """
+        accepted = set(inspect.signature(BaseDevice.__init__).parameters)
+        accepted -= {"profile_cache", "channels", "pattern", "exec_mode", "hooks"}
+        params = {
+            name: value for name, value in self._kwargs.items() if name in accepted
+        }
+        params["device_type"] = "autodetect"
+        return params
+
+
+def _close(device):
+    """Close the SSH connection of the device which has failed to connect or to detect"""
+    if device._conn is not None:
+        device._conn.close()
+
+
+class _Detector(BaseDevice):
+    """Session for fingerprinting the device before its class is known"""
+
+    _delimiter_list = [">", "#", "]", "%", "$"]
+
+    async def detect(self):
+        """
+        Connect and return the detected device_type and the last read prompt
+
+        :raises ValueError: if the device isn't recognized
+        """
+        output = await self._establish_connection()
+        banner = self._conn.get_extra_info("server_version") or ""
+        prompt = self._last_line(output)
+        if not re.search(r"[>#\]%$]$", prompt):
+            prompt = self._last_line(await self._find_prompt())
+        logger.debug("Host %s: Banner: %r, prompt: %r", self._host, banner, prompt)
+
+        for banner_pattern, prompt_pattern, device_type in _PROMPT_SIGNATURES:
+            if re.search(banner_pattern, banner) and re.search(prompt_pattern, prompt):
+                return self._detected(device_type), prompt
+        if re.search(_IOS_LIKE_PROMPT, prompt):
+            version = await self._show_version()
+            for pattern, device_type in _VERSION_SIGNATURES:
+                if re.search(pattern, version):
+                    return self._detected(device_type), self._last_line(version)
+        raise ValueError(
+            "Host {}: Unable to detect device_type by banner {!r} and prompt {!r}".format(
+                self._host, banner, prompt
+            )
+        )
+
+    def _detected(self, device_type):
+        logger.info("Host %s: Detected device_type %s", self._host, device_type)
+        return device_type
+
+    async def _show_version(self):
+        """Return the first page of the version command output up to the prompt"""
+        self._write_channel(self._normalize_cmd(_VERSION_COMMAND))
+        prompt_pattern = r"[>#]\s*$"
+        output = await self._read_until_pattern(
+            r"{}|{}".format(prompt_pattern, _PAGING_PATTERN)
+        )
+        if re.search(_PAGING_PATTERN, output):
+            # Paging isn't disabled yet, the first page is enough
+            self._write_channel("q")
+            output += await self._read_until_pattern(prompt_pattern)
+        return output
+
+    def _last_line(self, output):
+        output = output.strip()
+        if "\x1b" in output:
+            output = self._strip_ansi_escape_codes(output)
+        return output[output.rfind("\n") + 1 :].strip()
@@ -0,0 +1,119 @@
+"""
+Incremental buffer for reading data from the channel
+
+Searching the prompt in the whole accumulated output after every read is quadratic in the output size.
+ReadBuffer keeps received chunks in a list and joins them only once, and rescans only the new chunk
+plus a bounded overlap window from the previously received data. Streamed data which can't contain
+a match anymore is taken out of the buffer, so only pending data is kept.
+"""
+
+
+class ReadBuffer(object):
+    """
+    Accumulator of channel chunks with incremental pattern searching
+
+    A match can start inside the overlap window and end in the new chunk, so the window must be
+    at least as long as the longest possible prompt (or interactive pattern) for reading to be correct.
+    """
+
+    def __init__(self, window=1024, empty=""):
+        """
+        :param int window: count of already scanned characters which are rescanned with the next chunk
+        :param empty: empty value of the channel data type ("" for text channel, b"" for binary)
+        """
+        self._window = window
+        self._empty = empty
+        self._chunks = []
+        self._count = 0
+        # Absolute offset of the first received character which isn't taken out
+        self._start = 0
+        self._tail = empty
+        # Absolute offset of the first character of the tail
+        self._tail_start = 0
+        # Absolute offset from which the next match can start
+        self._scan_start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def chunks(self):
+        """Count of chunks received"""
+        return self._count
+
+    @property
+    def start(self):
+        """Absolute offset of the first character which isn't taken out of the buffer"""
+        return self._start
+
+    @property
+    def scan_start(self):
+        """Absolute offset from which the next match can start. Data before it is already scanned"""
+        return self._scan_start
+
+    def feed(self, chunk):
+        """Append new chunk to the buffer"""
+        self._chunks.append(chunk)
+        self._count += 1
+        self._tail += chunk
+        self._size += len(chunk)
+
+    def search(self, *patterns):
+        """
+        Search compiled patterns in the data that may contain a new match
+
+        The search starts one character after the beginning of the tail when it's possible,
+        so anchors and lookbehind assertions see the real preceding character.
+        If nothing is found, the scanned part beyond the window is dropped from the tail.
+
+        :param patterns: compiled regular expressions
+        :return: the first found match object (positions are relative to :attr:`tail`) or None
+        """
+        pos = self._scan_start - self._tail_start
+        for pattern in patterns:
+            match = pattern.search(self._tail, pos)
+            if match:
+                return match
+        self._advance(self._size - self._window)
+        return None
+
+    def consume(self, match):
+        """Mark data up to the end of the match as scanned, so the next search starts after it"""
+        self._advance(self._tail_start + match.end())
+
+    @property
+    def tail(self):
+        """Last part of the data which is used for searching"""
+        return self._tail
+
+    @property
+    def tail_start(self):
+        """Absolute offset of the tail in the whole data"""
+        return self._tail_start
+
+    def getvalue(self):
+        """Return all received data which isn't taken out"""
+        if len(self._chunks) > 1:
+            self._chunks = [self._empty.join(self._chunks)]
+        return self._chunks[0] if self._chunks else self._empty
+
+    def take(self, count):
+        """
+        Remove the first count characters from the received data and return them
+
+        Offsets of the tail and of matches are absolute, so they aren't changed
+        """
+        data = self.getvalue()
+        self._chunks = [data[count:]]
+        self._start += count
+        return data[:count]
+
+    def _advance(self, scan_start):
+        """Move the scan start forward and trim the tail keeping one character of context"""
+        if scan_start <= self._scan_start:
+            return
+        self._scan_start = scan_start
+        keep_from = max(self._scan_start - 1, self._tail_start)
+        self._tail = self._tail[keep_from - self._tail_start :]
+        self._tail_start = keep_from
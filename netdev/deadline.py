@@ -0,0 +1,113 @@
+"""
+Deadline of one operation with idle and total timeouts
+"""
+import asyncio
+
+_TIMER_RESOLUTION = 0.001
+"""Timers of the loop can fire slightly before the scheduled time"""
+
+# asyncio.current_task is available since Python 3.7
+_current_task = getattr(asyncio, "current_task", None) or asyncio.Task.current_task
+
+# asyncio.get_running_loop is available since Python 3.7. In coroutines get_event_loop returns it
+_running_loop = getattr(asyncio, "get_running_loop", None) or asyncio.get_event_loop
+
+
+class Deadline(object):
+    """
+    Idle and total timeouts of one operation, which use only one timer
+
+    Reads only store the time of the last activity with :meth:`touch`. The timer isn't rescheduled
+    for every chunk: when it fires, it checks the idle time and moves itself forward if data has been
+    received meanwhile. When one of the timeouts is exceeded, the task of the operation is cancelled
+    and :class:`asyncio.TimeoutError` is raised from the context manager. The timer is scheduled on
+    the loop running the operation, even if the object is created with another loop.
+
+    Usage::
+
+        with Deadline(loop, idle_timeout=15, total_timeout=300) as deadline:
+            while True:
+                data = await reader.read(65535)
+                deadline.touch()
+    """
+
+    def __init__(self, loop, idle_timeout=None, total_timeout=None):
+        """
+        :param loop: asyncio loop object
+        :param float idle_timeout: maximum time in seconds without receiving any data
+        :param float total_timeout: maximum time in seconds of the whole operation
+        """
+        self._loop = loop
+        self._idle_timeout = idle_timeout
+        self._total_timeout = total_timeout
+        self._start_clock()
+        self._handle = None
+        self._task = None
+        self._expired = False
+
+    @property
+    def expired(self):
+        """True if one of the timeouts was exceeded"""
+        return self._expired
+
+    def touch(self):
+        """Register activity (receiving data) in the operation"""
+        self._last_activity = self._loop.time()
+
+    def remaining(self):
+        """Return seconds left until the nearest timeout or None if there are no timeouts"""
+        when = self._next_deadline()
+        if when is None:
+            return None
+        return max(when - self._loop.time(), 0)
+
+    def __enter__(self):
+        loop = _running_loop()
+        if loop is not self._loop:
+            # The given loop isn't running (it was taken before asyncio.run() for example)
+            self._loop = loop
+            self._start_clock()
+        self._task = _current_task(loop=self._loop)
+        self._schedule()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._expired and exc_type is asyncio.CancelledError:
+            # Cancellation was requested by us, so it shouldn't be visible for the task
+            if hasattr(self._task, "uncancel"):
+                self._task.uncancel()
+            raise asyncio.TimeoutError
+        return False
+
+    def _start_clock(self):
+        """Take the start of the operation from the clock of the loop"""
+        self._start = self._last_activity = self._loop.time()
+        self._total_deadline = None
+        if self._total_timeout is not None:
+            self._total_deadline = self._start + self._total_timeout
+
+    def _next_deadline(self):
+        """Time of loop when the operation is expired if no data will be received"""
+        deadlines = []
+        if self._idle_timeout is not None:
+            deadlines.append(self._last_activity + self._idle_timeout)
+        if self._total_deadline is not None:
+            deadlines.append(self._total_deadline)
+        return min(deadlines) if deadlines else None
+
+    def _schedule(self):
+        when = self._next_deadline()
+        if when is not None:
+            self._handle = self._loop.call_at(when, self._on_timer)
+
+    def _on_timer(self):
+        self._handle = None
+        if self._next_deadline() - self._loop.time() > _TIMER_RESOLUTION:
+            # Data has been received after scheduling, so the idle deadline has moved
+            self._schedule()
+            return
+        self._expired = True
+        self._task.cancel()
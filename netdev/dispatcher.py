@@ -1,56 +1,138 @@
 """
 Factory function for creating netdev classes
 """
-from netdev.vendors import AlcatelAOS
-from netdev.vendors import AristaEOS
-from netdev.vendors import ArubaAOS6, ArubaAOS8
-from netdev.vendors import CiscoASA, CiscoIOS, CiscoIOSXR, CiscoNXOS, CiscoSG3XX
-from netdev.vendors import FujitsuSwitch
-from netdev.vendors import HPComware, HPComwareLimited
-from netdev.vendors import JuniperJunOS
-from netdev.vendors import MikrotikRouterOS
-from netdev.vendors import Terminal
-from netdev.vendors import UbiquityEdgeSwitch
-from netdev.vendors import HW1000
-from netdev.vendors import Huawei
+import importlib
+
+from netdev.logger import logger
 
 # @formatter:off
-# The keys of this dictionary are the supported device_types
+# The keys of this dictionary are the supported device_types.
+# Classes are given as "module:Class" and imported by create() on the first use
 CLASS_MAPPER = {
-    "alcatel_aos": AlcatelAOS,
-    "arista_eos": AristaEOS,
-    "aruba_aos_6": ArubaAOS6,
-    "aruba_aos_8": ArubaAOS8,
-    "cisco_asa": CiscoASA,
-    "cisco_ios": CiscoIOS,
-    "cisco_ios_xe": CiscoIOS,
-    "cisco_ios_xr": CiscoIOSXR,
-    "cisco_nxos": CiscoNXOS,
-    "cisco_sg3xx": CiscoSG3XX,
-    "fujitsu_switch": FujitsuSwitch,
-    "hp_comware": HPComware,
-    "hp_comware_limited": HPComwareLimited,
-    "juniper_junos": JuniperJunOS,
-    "mikrotik_routeros": MikrotikRouterOS,
-    "ubiquity_edge": UbiquityEdgeSwitch,
-    "terminal": Terminal,
-    "hw1000": HW1000,
-    "huawei": Huawei,
+    "alcatel_aos": "netdev.vendors.alcatel.alcatel_aos:AlcatelAOS",
+    "arista_eos": "netdev.vendors.arista.arista_eos:AristaEOS",
+    "aruba_aos_6": "netdev.vendors.aruba.aruba_aos_6:ArubaAOS6",
+    "aruba_aos_8": "netdev.vendors.aruba.aruba_aos_8:ArubaAOS8",
+    "cisco_asa": "netdev.vendors.cisco.cisco_asa:CiscoASA",
+    "cisco_ios": "netdev.vendors.cisco.cisco_ios:CiscoIOS",
+    "cisco_ios_xe": "netdev.vendors.cisco.cisco_ios:CiscoIOS",
+    "cisco_ios_xr": "netdev.vendors.cisco.cisco_iosxr:CiscoIOSXR",
+    "cisco_nxos": "netdev.vendors.cisco.cisco_nxos:CiscoNXOS",
+    "cisco_sg3xx": "netdev.vendors.cisco.cisco_sg3xx:CiscoSG3XX",
+    "fujitsu_switch": "netdev.vendors.fujitsu.fujitsu_switch:FujitsuSwitch",
+    "hp_comware": "netdev.vendors.hp.hp_comware:HPComware",
+    "hp_comware_limited": "netdev.vendors.hp.hp_comware_limited:HPComwareLimited",
+    "juniper_junos": "netdev.vendors.juniper.juniper_junos:JuniperJunOS",
+    "mikrotik_routeros": "netdev.vendors.mikrotik.mikrotik_routeros:MikrotikRouterOS",
+    "ubiquity_edge": "netdev.vendors.ubiquiti.ubiquity_edge:UbiquityEdgeSwitch",
+    "terminal": "netdev.vendors.terminal.terminal:Terminal",
+    "hw1000": "netdev.vendors.infotecs.HW1000:HW1000",
+    "huawei": "netdev.vendors.huawei.huawei:Huawei",
 }
 
 # @formatter:on
 
-platforms = list(CLASS_MAPPER.keys())
-platforms.sort()
-platforms_str = u"\n".join(platforms)
+ENTRY_POINT_GROUP = "netdev.vendors"
+"""Group of package entry points for vendor plugins. The name of the entry point is the device_type"""
+
+platforms = sorted(CLASS_MAPPER)
+"""Sorted supported device_types. Plugins from entry points are added after their discovery"""
+
+_classes = {}
+"""Already imported classes by device_type"""
+
+_entry_points_loaded = False
+
+
+def register(device_type, connection_class):
+    """
+    Register the class for device_type. An existing device_type is overridden
+
+    Usage::
+
+        netdev.register("cisco_ios_fast", "mypackage.fast_ios:FastIOS")
+
+    :param str device_type: name of the platform for :func:`create`
+    :param connection_class: "module:Class" string which is imported on the first use or the class itself
+    """
+    if isinstance(connection_class, str):
+        if ":" not in connection_class:
+            raise ValueError(
+                "Class must be given as 'module:Class', got {!r}".format(
+                    connection_class
+                )
+            )
+        _classes.pop(device_type, None)
+    else:
+        _classes[device_type] = connection_class
+    if device_type not in CLASS_MAPPER:
+        platforms.append(device_type)
+        platforms.sort()
+    CLASS_MAPPER[device_type] = connection_class
+
+
+def load_entry_points():
+    """
+    Register vendor plugins from entry points of installed packages
+
+    Only metadata of the packages is read, plugin modules are imported on the first use of their
+    device_type. Entry points don't override already known device_types. It's done only once
+    and it's called by :func:`create` for an unknown device_type
+    """
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in _entry_points():
+        if entry_point.name in CLASS_MAPPER:
+            logger.warning(
+                "Skipping plugin %s for the known device_type %s",
+                entry_point.value,
+                entry_point.name,
+            )
+            continue
+        register(entry_point.name, entry_point.value)
+
+
+def _entry_points():
+    """Return entry points of the plugin group. Without importlib.metadata (Python < 3.8) none"""
+    try:
+        from importlib import metadata
+    except ImportError:
+        return []
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=ENTRY_POINT_GROUP)
+    return entry_points.get(ENTRY_POINT_GROUP, [])
+
+
+def get_class(device_type):
+    """Return the class for device_type importing its module on the first call"""
+    connection_class = _classes.get(device_type)
+    if connection_class is None:
+        if device_type not in CLASS_MAPPER:
+            load_entry_points()
+        if device_type not in CLASS_MAPPER:
+            raise ValueError(
+                "Unsupported device_type: "
+                "currently supported platforms are: {0}".format(u"\n".join(platforms))
+            )
+        module_name, _, class_name = CLASS_MAPPER[device_type].partition(":")
+        module = importlib.import_module(module_name)
+        connection_class = _classes[device_type] = getattr(module, class_name)
+    return connection_class
 
 
 def create(*args, **kwargs):
-    """Factory function selects the proper class and creates object based on device_type"""
-    if kwargs["device_type"] not in platforms:
-        raise ValueError(
-            "Unsupported device_type: "
-            "currently supported platforms are: {0}".format(platforms_str)
-        )
-    connection_class = CLASS_MAPPER[kwargs["device_type"]]
+    """
+    Factory function selects the proper class and creates object based on device_type
+
+    With device_type="autodetect" the platform is detected while connecting,
+    see :class:`AutoDetect <netdev.autodetect.AutoDetect>`
+    """
+    if kwargs["device_type"] == "autodetect":
+        from netdev.autodetect import AutoDetect
+
+        return AutoDetect(*args, **kwargs)
+    connection_class = get_class(kwargs["device_type"])
     return connection_class(*args, **kwargs)
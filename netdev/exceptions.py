@@ -8,6 +8,9 @@ class DisconnectError(Exception):
         self.msg = "Host {} Disconnect Error: {}".format(ip_address, reason)
         super().__init__(self.msg)
 
+    def __reduce__(self):
+        return type(self), (self.ip_address, self.code, self.reason)
+
 
 class TimeoutError(Exception):
     """concurrent.futures._base.TimeoutError with ip address"""
@@ -17,6 +20,9 @@ class TimeoutError(Exception):
         self.msg = "Host {} Timeout Error".format(ip_address)
         super().__init__(self.msg)
 
+    def __reduce__(self):
+        return type(self), (self.ip_address,)
+
 
 class CommitError(Exception):
     """concurrent.futures._base.TimeoutError with ip address"""
@@ -26,3 +32,22 @@ class CommitError(Exception):
         self.reason = reason
         self.msg = "Host {} Commit Error: {}".format(ip_address, reason)
         super().__init__(self.msg)
+
+    def __reduce__(self):
+        return type(self), (self.ip_address, self.reason)
+
+
+class ConfigError(Exception):
+    """Configuration command rejected by the device with ip address"""
+
+    def __init__(self, ip_address, command, reason):
+        self.ip_address = ip_address
+        self.command = command
+        self.reason = reason
+        self.msg = "Host {} Config Error in {!r}: {}".format(
+            ip_address, command, reason
+        )
+        super().__init__(self.msg)
+
+    def __reduce__(self):
+        return type(self), (self.ip_address, self.command, self.reason)
@@ -0,0 +1,414 @@
+"""
+Running one job on many devices with bounded concurrency
+
+Opening all connections at once exhausts file descriptors, overloads AAA servers and triggers
+rate limits on devices. run() limits count of simultaneous sessions globally, per device_type
+and per site, spreads connection starts in time and yields results as they complete.
+ShardedRunner does the same in several worker processes for using all CPU cores
+"""
+import asyncio
+import collections
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+import zlib
+
+from netdev.dispatcher import create
+from netdev.logger import logger
+from netdev.pool import ConnectionPool, _connect
+
+_WORKERS_CHECK_INTERVAL = 1
+"""Interval in seconds between checks that worker processes are alive"""
+
+Result = collections.namedtuple("Result", ["host", "params", "result", "exception"])
+"""
+Result of the job for one device
+
+:param str host: host of the device
+:param dict params: inventory item of the device
+:param result: return value of the job or None if it has failed
+:param Exception exception: exception raised by connecting or by the job or None
+"""
+
+
+class _RateLimiter(object):
+    """Spread the starts evenly: not more than rate starts per second"""
+
+    def __init__(self, rate):
+        self._interval = 1.0 / rate
+        self._next_start = None
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_event_loop()
+            now = loop.time()
+            if self._next_start is not None and self._next_start > now:
+                await asyncio.sleep(self._next_start - now)
+                now = self._next_start
+            self._next_start = now + self._interval
+
+
+class _Limits(object):
+    """Semaphores for the global limit and for the limits of device types and sites"""
+
+    def __init__(self, limit, type_limits, site_limits):
+        self._global = asyncio.Semaphore(limit)
+        self._type_limits = type_limits or {}
+        self._site_limits = site_limits
+        self._semaphores = {}
+
+    def semaphores(self, device_type, site):
+        """
+        Return semaphores for the device in the order of acquiring
+
+        Specific limits are acquired before the global one, so the device waiting for its site
+        or device_type doesn't hold a global slot which could be used by others
+        """
+        semaphores = []
+        if device_type in self._type_limits:
+            semaphores.append(
+                self._get(("device_type", device_type), self._type_limits[device_type])
+            )
+        site_limit = self._site_limit(site)
+        if site_limit is not None:
+            semaphores.append(self._get(("site", site), site_limit))
+        semaphores.append(self._global)
+        return semaphores
+
+    def _site_limit(self, site):
+        if site is None or self._site_limits is None:
+            return None
+        if isinstance(self._site_limits, dict):
+            return self._site_limits.get(site)
+        return self._site_limits
+
+    def _get(self, key, limit):
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(limit)
+        return semaphore
+
+
+async def run(
+    inventory,
+    job,
+    limit=100,
+    type_limits=None,
+    site_limits=None,
+    site_key="site",
+    ramp_up=None,
+    pool=None,
+):
+    """
+    Run the job for every device in inventory and yield results as they complete
+
+    Usage::
+
+        async def job(device):
+            return await device.send_command("show version")
+
+        async for result in netdev.fleet.run(inventory, job, limit=200, type_limits={"cisco_asa": 20},
+                                             site_limits=50, ramp_up=20):
+            if result.exception is None:
+                print(result.host, result.result)
+
+    :param inventory: iterable with dicts of params for :func:`netdev.create`
+    :param job: coroutine function which is called with the connected device
+    :param int limit: maximum count of simultaneous sessions
+    :param dict type_limits: maximum count of simultaneous sessions for device types {device_type: limit}
+    :param site_limits: maximum count of simultaneous sessions for sites, int for every site
+            or dict {site: limit}
+    :param str site_key: key of the site in the inventory item. It isn't passed to :func:`netdev.create`
+    :param float ramp_up: maximum count of sessions started per second. Default is None (no limit)
+    :param pool: :class:`ConnectionPool <netdev.pool.ConnectionPool>` for reusing sessions
+    :return: async iterator with :class:`Result` objects
+    """
+    limits = _Limits(limit, type_limits, site_limits)
+    rate_limiter = _RateLimiter(ramp_up) if ramp_up else None
+    tasks = [
+        asyncio.ensure_future(_run_job(item, job, limits, site_key, rate_limiter, pool))
+        for item in inventory
+    ]
+    logger.info("Running job on %s devices", len(tasks))
+    try:
+        for future in asyncio.as_completed(tasks):
+            yield await future
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _run_job(item, job, limits, site_key, rate_limiter, pool):
+    """Run the job for one device under all its limits. Exceptions are returned in the result"""
+    params = dict(item)
+    site = params.pop(site_key, None)
+    host = params.get("host")
+    semaphores = limits.semaphores(params.get("device_type"), site)
+    acquired = []
+    try:
+        for semaphore in semaphores:
+            await semaphore.acquire()
+            acquired.append(semaphore)
+        if rate_limiter is not None:
+            await rate_limiter.wait()
+        if pool is not None:
+            async with pool.connection(**params) as device:
+                result = await job(device)
+        else:
+            # The context manager doesn't close the connection if connect() fails
+            device = create(**params)
+            await _connect(device)
+            try:
+                result = await job(device)
+            finally:
+                await device.disconnect()
+    except Exception as e:
+        logger.info("Host %s: Job has failed: %r", host, e)
+        return Result(host, item, None, e)
+    finally:
+        for semaphore in acquired:
+            semaphore.release()
+    return Result(host, item, result, None)
+
+
+class ShardedRunner(object):
+    """
+    Runner of jobs in several worker processes, each with its own event loop and connection pool
+
+    The inventory is sharded by the hash of the host, so the host always lands on the same worker
+    and reuses its pooled session in the next runs. The limits of :func:`run` are applied in every
+    worker separately. Jobs and their results must be picklable, so the job should be a coroutine
+    function defined at the module level.
+
+    Usage::
+
+        async with ShardedRunner(workers=8, limit=200, pool_options={"idle_ttl": 600}) as runner:
+            async for result in runner.run(inventory, job):
+                print(result.host, result.result)
+    """
+
+    def __init__(self, workers=None, pool_options=None, **run_options):
+        """
+        :param int workers: count of worker processes. Default is count of CPU
+        :param dict pool_options: params of :class:`ConnectionPool <netdev.pool.ConnectionPool>`
+                in workers
+        :param run_options: params of :func:`run` (limit, type_limits, site_limits, site_key, ramp_up)
+        """
+        self._workers = workers or os.cpu_count() or 1
+        self._pool_options = pool_options or {}
+        self._run_options = run_options
+        self._context = multiprocessing.get_context("spawn")
+        self._task_queues = []
+        self._results = None
+        self._processes = []
+        self._reader = None
+        self._loop = None
+        self._runs = {}
+        self._run_ids = itertools.count()
+        self._dead = set()
+        self._closing = False
+
+    def shard(self, host):
+        """Return index of the worker for the host"""
+        return zlib.crc32(host.encode()) % self._workers
+
+    def start(self):
+        """Start worker processes. It must be called in the running event loop"""
+        self._loop = asyncio.get_event_loop()
+        self._results = self._context.Queue()
+        self._dead = set()
+        self._closing = False
+        for index in range(self._workers):
+            tasks = self._context.Queue()
+            process = self._context.Process(
+                target=_worker_main,
+                args=(
+                    index,
+                    tasks,
+                    self._results,
+                    self._pool_options,
+                    self._run_options,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._task_queues.append(tasks)
+            self._processes.append(process)
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+        logger.info("Started %s fleet workers", self._workers)
+
+    async def close(self):
+        """Stop workers after finishing their runs. Pooled sessions are closed"""
+        self._closing = True
+        for tasks in self._task_queues:
+            tasks.put(None)
+        for process in self._processes:
+            await self._loop.run_in_executor(None, process.join)
+        self._results.put(None)
+        await self._loop.run_in_executor(None, self._reader.join)
+        self._task_queues, self._processes = [], []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def run(self, inventory, job):
+        """
+        Run the job for every device in inventory and yield results as they complete
+
+        :param inventory: iterable with dicts of params for :func:`netdev.create`
+        :param job: picklable coroutine function which is called with the connected device
+        :return: async iterator with :class:`Result` objects
+        :raises RuntimeError: if the worker of some devices has died. Devices of other workers
+                are served by the next runs
+        """
+        shards = [[] for _ in range(self._workers)]
+        for item in inventory:
+            shards[self.shard(item["host"])].append(item)
+        pending = {index for index, items in enumerate(shards) if items}
+        if pending & self._dead:
+            raise RuntimeError("Fleet worker has died")
+        run_id = next(self._run_ids)
+        results = asyncio.Queue()
+        self._runs[run_id] = (results, pending)
+        for index in pending:
+            self._task_queues[index].put((run_id, shards[index], job))
+        try:
+            while pending:
+                kind, result = await results.get()
+                if kind == "done":
+                    pending.discard(result)
+                elif kind == "error":
+                    raise result
+                else:
+                    yield result
+        finally:
+            del self._runs[run_id]
+
+    def _read_results(self):
+        """
+        Thread routing messages from workers to the queues of runs in the event loop
+
+        Results are unpickled here, so the event loop isn't blocked by big outputs. Workers are
+        checked on the timer, because other workers may keep sending results while one is dead
+        """
+        reported = set()
+        next_check = time.monotonic() + _WORKERS_CHECK_INTERVAL
+        while True:
+            try:
+                message = self._results.get(timeout=_WORKERS_CHECK_INTERVAL)
+            except queue.Empty:
+                pass
+            else:
+                if message is None:
+                    return
+                run_id, kind, result = message
+                if kind == "result":
+                    message = run_id, kind, _loads_result(result)
+                self._loop.call_soon_threadsafe(self._route, message)
+            now = time.monotonic()
+            if now < next_check or self._closing:
+                continue
+            next_check = now + _WORKERS_CHECK_INTERVAL
+            for index, process in enumerate(self._processes):
+                if index not in reported and not process.is_alive():
+                    reported.add(index)
+                    self._loop.call_soon_threadsafe(self._fail_worker, index)
+
+    def _route(self, message):
+        run_id, kind, result = message
+        run = self._runs.get(run_id)
+        if run is not None:
+            run[0].put_nowait((kind, result))
+
+    def _fail_worker(self, index):
+        """Stop the runs waiting for the dead worker, because their results can't be received"""
+        logger.error("Fleet worker %s has died", index)
+        self._dead.add(index)
+        for results, pending in self._runs.values():
+            if index in pending:
+                results.put_nowait(("error", RuntimeError("Fleet worker has died")))
+
+
+def _worker_main(index, tasks, results, pool_options, run_options):
+    """Entry point of the worker process"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(
+            _worker(index, tasks, results, pool_options, run_options)
+        )
+    finally:
+        loop.close()
+
+
+async def _worker(index, tasks, results, pool_options, run_options):
+    """Run shards of jobs concurrently until the stop message, then close the pool"""
+    loop = asyncio.get_event_loop()
+    pool = ConnectionPool(**pool_options)
+    running = set()
+    try:
+        while True:
+            task = await loop.run_in_executor(None, tasks.get)
+            if task is None:
+                break
+            future = asyncio.ensure_future(
+                _run_shard(index, results, pool, run_options, *task)
+            )
+            running.add(future)
+            future.add_done_callback(running.discard)
+        if running:
+            await asyncio.wait(running)
+    finally:
+        await pool.close()
+
+
+async def _run_shard(index, results, pool, run_options, run_id, items, job):
+    """Run the job for the shard and send results and the index of the worker to the parent process"""
+    try:
+        async for result in run(items, job, pool=pool, **run_options):
+            results.put((run_id, "result", _dumps_result(result)))
+    finally:
+        results.put((run_id, "done", index))
+
+
+def _dumps_result(result):
+    """
+    Pickle the result for sending to the parent process. The output is pickled only once
+
+    Exceptions with custom __init__ are pickled, but can't be unpickled, so only the exception is
+    checked by unpickling. The exception or the result which can't be sent is replaced
+
+    :return: the inventory item and the pickled result
+    """
+    if result.exception is not None:
+        try:
+            pickle.loads(pickle.dumps(result.exception))
+        except Exception:
+            result = result._replace(exception=RuntimeError(repr(result.exception)))
+    try:
+        data = pickle.dumps(result)
+    except Exception as e:
+        data = pickle.dumps(
+            result._replace(result=None, exception=RuntimeError(repr(e)))
+        )
+    return result.params, data
+
+
+def _loads_result(payload):
+    """Unpickle the result sent by :func:`_dumps_result`. It's replaced if it can't be unpickled"""
+    params, data = payload
+    try:
+        return pickle.loads(data)
+    except Exception as e:
+        exception = RuntimeError("Result can't be unpickled: {!r}".format(e))
+        return Result(params["host"], params, None, exception)
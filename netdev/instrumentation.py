@@ -0,0 +1,133 @@
+"""
+Instrumentation hooks of the session
+
+Hooks receive timings of every phase of connect() (TCP connect, SSH key exchange, authentication,
+prompt discovery, entering privilege mode, disabling paging...) and the stats of every command:
+time to the first byte, bytes and chunks read, time spent in searching the prompt and in
+post-processing the output. Only a few clock reads and counters are added to the hot path, so the
+hooks can be left on in production::
+
+    class SlowCommands(netdev.Hooks):
+        def on_operation(self, device, stats):
+            if stats.duration > 10:
+                print(device.host, stats.command, stats.first_byte, stats.bytes)
+
+    async with netdev.create(host="10.0.0.1", device_type="cisco_ios", hooks=SlowCommands()) as device:
+        await device.send_command("show running-config")
+
+Hooks are called synchronously in the event loop, so they must be fast and must not raise.
+All times are taken from :func:`time.monotonic` and are in seconds
+"""
+import time
+
+
+class OperationStats(object):
+    """Timings and counters of one operation of the session"""
+
+    __slots__ = (
+        "operation",
+        "command",
+        "commands",
+        "start",
+        "duration",
+        "first_byte",
+        "bytes",
+        "chunks",
+        "reads",
+        "scan_time",
+        "normalize_time",
+    )
+
+    def __init__(self, operation, command=None):
+        """
+        :param str operation: name of the operation: send_command, send_commands, send_config_set
+                or exec_command
+        :param command: the command or the list of commands
+        """
+        if isinstance(command, str):
+            commands = 1
+        elif hasattr(command, "__len__"):
+            commands = len(command)
+            command = None
+        else:
+            commands = command = None
+        self.operation = operation
+        """Name of the operation"""
+        self.command = command
+        """The command of send_command and exec_command or None for the operations with several commands"""
+        self.commands = commands
+        """Count of commands or None if they are given by an iterator"""
+        self.start = time.monotonic()
+        """Time of the start"""
+        self.duration = None
+        """Duration of the whole operation"""
+        self.first_byte = None
+        """Time from the start to receiving the first chunk of the output"""
+        self.bytes = 0
+        """Length of all read data (characters in text mode)"""
+        self.chunks = 0
+        """Count of chunks received from the channel"""
+        self.reads = 0
+        """Count of reads until the prompt or the pattern"""
+        self.scan_time = 0.0
+        """Time spent in searching the prompt and patterns in the read data"""
+        self.normalize_time = 0.0
+        """Time spent in post-processing of the output"""
+
+    def add_read(self, size, chunks):
+        """Add the counters of one finished read"""
+        self.bytes += size
+        self.chunks += chunks
+        self.reads += 1
+
+    def __repr__(self):
+        return "<OperationStats {} {!r} duration={} bytes={}>".format(
+            self.operation, self.command, self.duration, self.bytes
+        )
+
+
+class Hooks(object):
+    """
+    Receiver of instrumentation events of sessions. All methods do nothing, subclasses override the
+    needed ones. One object can be given to many sessions by the ``hooks`` param of
+    :func:`netdev.create`
+    """
+
+    def on_phase(self, device, phase, start, duration):
+        """
+        Called after every successful phase of connecting
+
+        The phases are tcp_connect, kex and auth of the SSH connection, establish_connection (it includes
+        them, opening the shell and reading the first prompt), set_base_prompt, enable_mode, disable_paging
+        and others which are specific for the platform. The last phase is connect for the whole connect()
+
+        :param device: the session
+        :param str phase: name of the phase
+        :param float start: time of the start
+        :param float duration: duration in seconds
+        """
+
+    def on_operation(self, device, stats):
+        """
+        Called after every successful operation (send_command, send_commands, send_config_set, exec_command)
+
+        :param device: the session
+        :param OperationStats stats: timings and counters of the operation
+        """
+
+    def on_error(self, device, operation, exception):
+        """
+        Called when connecting or the operation fails
+
+        :param device: the session
+        :param str operation: connect or the name of the operation
+        :param Exception exception: the raised exception
+        """
+
+    def on_disconnect(self, device):
+        """
+        Called after closing the connection by disconnect(). It's called even if the cleanup has failed,
+        because the session isn't used after that
+
+        :param device: the session
+        """
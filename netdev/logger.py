@@ -1,7 +1,58 @@
 """
 Logging configuration for netdev
+
+All messages use lazy %-formatting, so nothing is formatted when the level is disabled.
+Debug events of the session are structured: the fields are available in the ``netdev`` attribute
+of the log record. The whole output of commands is logged only by the ``netdev.payload`` logger,
+which is disabled by default even if the ``netdev`` logger is in debug level. For capturing payloads::
+
+    logging.getLogger("netdev.payload").setLevel(logging.DEBUG)
 """
 import logging
 
 logger = logging.getLogger(__package__)
 logger.setLevel(logging.WARNING)
+
+payload_logger = logging.getLogger(__package__ + ".payload")
+payload_logger.setLevel(logging.WARNING)
+
+
+class _EventFields(object):
+    """Lazy formatter of event fields, it's called only when the record is emitted"""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return " ".join(
+            "{}={:.6f}".format(key, value)
+            if isinstance(value, float)
+            else "{}={}".format(key, value)
+            for key, value in sorted(self.fields.items())
+        )
+
+
+def log_event(host, phase, payload=None, **fields):
+    """
+    Log structured debug event of the session
+
+    :param str host: device hostname or ip address
+    :param str phase: name of the phase, for example "send_command" or "read"
+    :param payload: full output of the phase. It's logged only by the netdev.payload logger
+    :param fields: structured fields of the event like bytes, chunks or duration
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        event = dict(fields, host=host, phase=phase)
+        logger.debug(
+            "Host %s: %s %s", host, phase, _EventFields(fields), extra={"netdev": event}
+        )
+    if payload is not None and payload_logger.isEnabledFor(logging.DEBUG):
+        payload_logger.debug(
+            "Host %s: %s payload: %r",
+            host,
+            phase,
+            payload,
+            extra={"netdev": {"host": host, "phase": phase}},
+        )
@@ -0,0 +1,278 @@
+"""
+Metrics of sessions in Prometheus text format
+
+:class:`Metrics` is the instrumentation hooks object which counts connects, commands, received
+bytes and errors of all sessions it's given to. It's optional and has no dependencies, the metrics
+are rendered in the Prometheus text exposition format (version 0.0.4) and exposed by a local HTTP
+endpoint or written to a file for the textfile collector of node_exporter::
+
+    import netdev.metrics
+
+    metrics = netdev.metrics.Metrics()
+    server = await metrics.serve(port=9300)
+    async for result in netdev.fleet.run([dict(params, hooks=metrics) for params in inventory], job):
+        ...
+    metrics.write("/var/lib/node_exporter/netdev.prom")
+
+Exported metrics, all of them have the device_type label:
+
+* netdev_connect_duration_seconds - histogram of successful connects
+* netdev_command_duration_seconds - histogram of successful operations with the operation label
+* netdev_received_bytes_total - bytes (characters in text mode) read by the operations
+* netdev_timeouts_total - :class:`TimeoutError <netdev.exceptions.TimeoutError>` by operation
+* netdev_disconnects_total - :class:`DisconnectError <netdev.exceptions.DisconnectError>` by operation
+* netdev_commit_failures_total - :class:`CommitError <netdev.exceptions.CommitError>`
+* netdev_sessions_active - sessions which are connected and not disconnected yet
+
+Worker processes of :class:`ShardedRunner <netdev.fleet.ShardedRunner>` get their own copies of
+the hooks, so only the sessions of the current process are counted
+"""
+
+import asyncio
+import bisect
+import os
+
+from netdev.exceptions import CommitError, DisconnectError, TimeoutError
+from netdev.instrumentation import Hooks
+
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+"""Upper bounds of histogram buckets in seconds. SSH commands may run for minutes, so they are wider
+than the default buckets of Prometheus clients"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""Content type of the Prometheus text format"""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(object):
+    """Family of samples with the same name and label names"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+
+    def _labels(self, labelvalues, extra=()):
+        pairs = list(zip(self.labelnames, labelvalues)) + list(extra)
+        if not pairs:
+            return ""
+        return "{{{}}}".format(
+            ",".join('{}="{}"'.format(name, _escape(value)) for name, value in pairs)
+        )
+
+    def _samples(self):
+        for labelvalues in sorted(self._values):
+            yield self.name, self._labels(labelvalues), self._values[labelvalues]
+
+    def render(self):
+        """Return lines of the metric in the text format"""
+        lines = [
+            "# HELP {} {}".format(self.name, self.documentation),
+            "# TYPE {} {}".format(self.name, self.type),
+        ]
+        for name, labels, value in self._samples():
+            lines.append("{}{} {}".format(name, labels, _format_value(value)))
+        return lines
+
+
+class _Counter(_Metric):
+    type = "counter"
+
+    def inc(self, labelvalues, amount=1):
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class _Gauge(_Counter):
+    type = "gauge"
+
+    def dec(self, labelvalues):
+        self.inc(labelvalues, -1)
+
+
+class _Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labelvalues, value):
+        counts = self._values.get(labelvalues)
+        if counts is None:
+            # Counts of buckets (the last one is +Inf) and the sum of values
+            counts = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def _samples(self):
+        bounds = self.buckets + (float("inf"),)
+        for labelvalues in sorted(self._values):
+            counts = self._values[labelvalues]
+            total = 0
+            for bound, count in zip(bounds, counts):
+                total += count
+                le = (("le", _format_value(float(bound))),)
+                yield self.name + "_bucket", self._labels(labelvalues, le), total
+            yield self.name + "_sum", self._labels(labelvalues), counts[-1]
+            yield self.name + "_count", self._labels(labelvalues), total
+
+
+class Metrics(Hooks):
+    """
+    Hooks collecting counters and histograms of the sessions
+
+    One object should be given to all sessions by the ``hooks`` param, so the metrics cover the fleet.
+    Subclasses may extend the hooks, but they must call the methods of this class
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param buckets: upper bounds of buckets of the latency histograms in seconds
+        """
+        self._connect_duration = _Histogram(
+            "netdev_connect_duration_seconds",
+            "Duration of successful connects to devices",
+            ("device_type",),
+            buckets,
+        )
+        self._command_duration = _Histogram(
+            "netdev_command_duration_seconds",
+            "Duration of successful operations with commands",
+            ("device_type", "operation"),
+            buckets,
+        )
+        self._received_bytes = _Counter(
+            "netdev_received_bytes_total",
+            "Bytes received from devices by the operations",
+            ("device_type",),
+        )
+        self._timeouts = _Counter(
+            "netdev_timeouts_total",
+            "Connects and operations failed by timeout",
+            ("device_type", "operation"),
+        )
+        self._disconnects = _Counter(
+            "netdev_disconnects_total",
+            "Connects and operations failed by disconnecting of the device",
+            ("device_type", "operation"),
+        )
+        self._commit_failures = _Counter(
+            "netdev_commit_failures_total",
+            "Configuration commits failed on devices",
+            ("device_type",),
+        )
+        self._sessions_active = _Gauge(
+            "netdev_sessions_active",
+            "Connected sessions which aren't disconnected yet",
+            ("device_type",),
+        )
+        self._metrics = (
+            self._connect_duration,
+            self._command_duration,
+            self._received_bytes,
+            self._timeouts,
+            self._disconnects,
+            self._commit_failures,
+            self._sessions_active,
+        )
+        self._server = None
+
+    def on_phase(self, device, phase, start, duration):
+        if phase == "connect":
+            self._connect_duration.observe((device.device_type,), duration)
+            self._sessions_active.inc((device.device_type,))
+
+    def on_operation(self, device, stats):
+        device_type = device.device_type
+        self._command_duration.observe((device_type, stats.operation), stats.duration)
+        self._received_bytes.inc((device_type,), stats.bytes)
+
+    def on_error(self, device, operation, exception):
+        if isinstance(exception, TimeoutError):
+            self._timeouts.inc((device.device_type, operation))
+        elif isinstance(exception, DisconnectError):
+            self._disconnects.inc((device.device_type, operation))
+        elif isinstance(exception, CommitError):
+            self._commit_failures.inc((device.device_type,))
+
+    def on_disconnect(self, device):
+        self._sessions_active.dec((device.device_type,))
+
+    def render(self):
+        """Return all metrics in the Prometheus text format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write the metrics to the file
+
+        The file is replaced atomically, so the textfile collector never reads a partial file
+
+        :param str path: path of the file. The textfile collector of node_exporter reads only ``*.prom``
+        """
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(temp_path, "w") as file:
+            file.write(self.render())
+        os.replace(temp_path, path)
+
+    async def serve(self, host="127.0.0.1", port=0):
+        """
+        Start the HTTP endpoint which returns the metrics by ``GET /metrics``
+
+        :param str host: address for listening. Default is localhost only
+        :param int port: port for listening. Default is any free port
+        :return: the started :class:`asyncio.AbstractServer`. The port is in its sockets
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def close(self):
+        """Stop the HTTP endpoint"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                # Skip headers
+                pass
+            parts = request.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] not in ("GET", "HEAD"):
+                status, body = "405 Method Not Allowed", ""
+            elif parts[1].split("?")[0] != "/metrics":
+                status, body = "404 Not Found", ""
+            else:
+                status, body = "200 OK", self.render()
+            body = body.encode()
+            head = (
+                "HTTP/1.0 {}\r\nContent-Type: {}\r\nContent-Length: {}\r\n"
+                "Connection: close\r\n\r\n".format(status, CONTENT_TYPE, len(body))
+            )
+            writer.write(head.encode())
+            if parts and parts[0] != "HEAD":
+                writer.write(body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
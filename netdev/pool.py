@@ -0,0 +1,234 @@
+"""
+Pool of connected devices for reusing SSH sessions between jobs
+
+Connecting to the device is expensive: TCP and SSH handshakes, PTY allocation, finding the prompt,
+entering privilege mode and disabling paging. ConnectionPool keeps ready sessions and gives them out
+again for the same connection params
+"""
+import asyncio
+import collections
+import time
+
+import asyncssh
+
+from netdev.dispatcher import create
+from netdev.exceptions import ConfigError, DisconnectError, TimeoutError
+from netdev.logger import logger
+
+_BROKEN_SESSION_ERRORS = (TimeoutError, DisconnectError, asyncssh.Error, OSError)
+"""Errors after which the state of the session is unknown and it can't be reused"""
+
+_DISCARD_SESSION_ERRORS = _BROKEN_SESSION_ERRORS + (ConfigError, asyncio.CancelledError)
+"""
+Errors of the job after which the session isn't returned to the pool. Besides broken sessions, it's
+left in configuration mode by stop_on_error or it has unread output of the cancelled command
+"""
+
+
+async def _connect(device):
+    """Connect the device. If connect() fails, the SSH connection opened by it is closed"""
+    try:
+        await device.connect()
+    except BaseException:
+        conn = getattr(device, "_conn", None)
+        if conn is not None:
+            conn.close()
+        raise
+
+
+def _is_closed(conn):
+    """
+    Check that the SSH connection is closed
+
+    is_closed() appeared in asyncssh 2.15. All releases clear the transport of the connection
+    when it's closed, so it's checked by older releases
+    """
+    is_closed = getattr(conn, "is_closed", None)
+    if is_closed is not None:
+        return is_closed()
+    return conn._transport is None
+
+
+class ConnectionPool(object):
+    """
+    Pool of connected devices keyed by all connection params (host, credentials, device_type etc)
+
+    Usage::
+
+        pool = ConnectionPool(max_per_host=2, idle_ttl=300)
+        async with pool.connection(host="10.0.0.1", username="user", password="pass",
+                                   device_type="cisco_ios") as device:
+            output = await device.send_command("show version")
+        await pool.close()
+
+    Sessions are given out in LIFO order, so the least recently used sessions expire first.
+    Expired idle sessions are closed on checkout for the same params and by :meth:`purge`.
+    """
+
+    def __init__(
+        self, max_per_host=1, idle_ttl=300, health_check=True, health_check_timeout=5
+    ):
+        """
+        :param int max_per_host: maximum count of sessions to one host (idle and checked out)
+        :param float idle_ttl: time in seconds after which the idle session is closed
+        :param bool health_check: check the idle session by the prompt before giving it out
+        :param float health_check_timeout: timeout in seconds for the health check
+        """
+        self._max_per_host = max_per_host
+        self._idle_ttl = idle_ttl
+        self._health_check = health_check
+        self._health_check_timeout = health_check_timeout
+        # key -> deque of (device, time of checkin)
+        self._idle = collections.defaultdict(collections.deque)
+        # host -> semaphore limiting the count of sessions to the host
+        self._host_limits = {}
+        # checked out device -> key
+        self._checked_out = {}
+        self._closed = False
+
+    def connection(self, **kwargs):
+        """
+        Async context manager with a connected device for the params of :func:`netdev.create`
+
+        The device is returned to the pool on exit. If an error of the session is raised inside,
+        the device is closed instead.
+        """
+        return _PooledConnection(self, kwargs)
+
+    async def acquire(self, **kwargs):
+        """
+        Checkout the connected device for the params of :func:`netdev.create`
+
+        It waits if max_per_host sessions to the host are already checked out.
+        The device must be returned by :meth:`release`
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        host = kwargs.get("host")
+        key = self._make_key(kwargs)
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self._max_per_host)
+        await limit.acquire()
+        try:
+            device = await self._get_idle(key)
+            if device is None:
+                logger.info("Host %s: Opening new pooled connection", host)
+                device = create(**kwargs)
+                await _connect(device)
+        except BaseException:
+            limit.release()
+            raise
+        self._checked_out[device] = key
+        return device
+
+    async def release(self, device, discard=False):
+        """
+        Return the checked out device to the pool
+
+        :param device: device returned by :meth:`acquire`
+        :param bool discard: close the session instead of returning it to the pool
+        """
+        key = self._checked_out.pop(device)
+        try:
+            if discard or self._closed:
+                await self._disconnect(device)
+            else:
+                self._idle[key].append((device, time.monotonic()))
+        finally:
+            self._host_limits[device._host].release()
+
+    async def purge(self):
+        """Close all idle sessions which are expired by idle_ttl"""
+        expired = []
+        for key in list(self._idle):
+            expired.extend(self._pop_expired(key))
+        await asyncio.gather(*(self._disconnect(device) for device in expired))
+
+    async def close(self):
+        """Close all idle sessions. Checked out sessions are closed on release"""
+        self._closed = True
+        idle = [device for sessions in self._idle.values() for device, _ in sessions]
+        self._idle.clear()
+        await asyncio.gather(*(self._disconnect(device) for device in idle))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @staticmethod
+    def _make_key(params):
+        """Key of the session: all connection params, so sessions are never shared between credentials"""
+        return tuple(sorted((name, repr(value)) for name, value in params.items()))
+
+    def _pop_expired(self, key):
+        """Remove expired sessions from the idle queue. The oldest sessions are in the beginning"""
+        sessions = self._idle[key]
+        deadline = time.monotonic() - self._idle_ttl
+        expired = []
+        while sessions and sessions[0][1] < deadline:
+            expired.append(sessions.popleft()[0])
+        if not sessions:
+            del self._idle[key]
+        return expired
+
+    async def _get_idle(self, key):
+        """Return the most recently used healthy idle session or None"""
+        for device in self._pop_expired(key):
+            await self._disconnect(device)
+        sessions = self._idle.get(key)
+        while sessions:
+            device, _ = sessions.pop()
+            if await self._is_healthy(device):
+                return device
+            await self._disconnect(device)
+        return None
+
+    async def _is_healthy(self, device):
+        """Check that the channel is open and the device answers with the prompt"""
+        if getattr(device, "_exec_mode", False):
+            # Every command opens its own channel, so only the connection is checked
+            return not _is_closed(device._conn)
+        if device._stdout is None or device._stdout.at_eof():
+            return False
+        if not self._health_check:
+            return True
+        try:
+            with device._deadline_scope(total_timeout=self._health_check_timeout):
+                device._write_channel(device._normalize_cmd("\n"))
+                await device._read_until_prompt()
+        except _BROKEN_SESSION_ERRORS:
+            logger.info("Host %s: Pooled connection is broken", device._host)
+            return False
+        return True
+
+    @staticmethod
+    async def _disconnect(device):
+        """Close the session. Errors of the cleanup are ignored and the connection is aborted"""
+        try:
+            await device.disconnect()
+        except Exception:
+            logger.info("Host %s: Aborting pooled connection", device._host)
+            device._conn.abort()
+
+
+class _PooledConnection(object):
+    """Async context manager returned by :meth:`ConnectionPool.connection`"""
+
+    def __init__(self, pool, params):
+        self._pool = pool
+        self._params = params
+        self._device = None
+
+    async def __aenter__(self):
+        self._device = await self._pool.acquire(**self._params)
+        return self._device
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        discard = exc_type is not None and (
+            issubclass(exc_type, _DISCARD_SESSION_ERRORS)
+            or not issubclass(exc_type, Exception)
+        )
+        await self._pool.release(self._device, discard=discard)
@@ -0,0 +1,84 @@
+"""
+Persistent cache of facts discovered about devices while connecting
+
+Discovering the prompt and the platform specific modes takes several round trips on every connect,
+but these facts rarely change. ProfileCache stores them in JSON lines file, so the next sessions
+only validate the cached prompt against the first prompt sent by the device
+"""
+import json
+import os
+
+from netdev.logger import logger
+
+
+class ProfileCache(object):
+    """
+    Cache of device profiles in JSON lines file keyed by host and device_type
+
+    Every update appends one line with the whole profile, the last line for the key wins.
+    The file is loaded once, so one object should be shared between all sessions.
+
+    Usage::
+
+        profiles = ProfileCache("profiles.jsonl")
+        async with netdev.create(**params, profile_cache=profiles) as device:
+            ...
+        profiles.compact()
+    """
+
+    def __init__(self, path):
+        """
+        :param str path: path to the JSON lines file. It's created on the first update
+        """
+        self._path = path
+        self._profiles = {}
+        self._lines = 0
+        self._load()
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def get(self, host, device_type):
+        """Return copy of the profile or None if the device isn't in cache"""
+        profile = self._profiles.get((host, device_type))
+        return dict(profile) if profile is not None else None
+
+    def set(self, host, device_type, profile):
+        """Store the profile of the device and append it to the file"""
+        if self._profiles.get((host, device_type)) == profile:
+            return
+        self._profiles[(host, device_type)] = dict(profile)
+        with open(self._path, "a") as file:
+            file.write(self._dumps(host, device_type, profile))
+        self._lines += 1
+
+    def compact(self):
+        """Rewrite the file with only one line for every device"""
+        if self._lines == len(self._profiles):
+            return
+        tmp_path = self._path + ".tmp"
+        with open(tmp_path, "w") as file:
+            for (host, device_type), profile in self._profiles.items():
+                file.write(self._dumps(host, device_type, profile))
+        os.replace(tmp_path, self._path)
+        self._lines = len(self._profiles)
+
+    def _load(self):
+        """Read all profiles from the file. Broken lines (after interrupted write) are skipped"""
+        if not os.path.exists(self._path):
+            return
+        with open(self._path) as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                    key = (record.pop("host"), record.pop("device_type"))
+                except (ValueError, KeyError, AttributeError):
+                    logger.warning("Skipping broken line in profile cache %s", self._path)
+                    continue
+                self._profiles[key] = record
+                self._lines += 1
+
+    @staticmethod
+    def _dumps(host, device_type, profile):
+        record = dict(profile, host=host, device_type=device_type)
+        return json.dumps(record, separators=(",", ":"), sort_keys=True) + "\n"
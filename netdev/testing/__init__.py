@@ -0,0 +1,14 @@
+"""
+Emulated network devices for testing and benchmarking netdev without the lab
+
+:class:`FakeDevice` is an SSH server on localhost which answers like the device of the given
+device_type. It's started in the event loop of the test::
+
+    async with FakeDevice("juniper_junos", latency=0.05) as fake:
+        async with netdev.create(**fake.connection_params()) as device:
+            await device.send_config_set(["set system host-name lab"])
+"""
+from netdev.testing.platforms import PLATFORMS, Platform
+from netdev.testing.server import FakeDevice
+
+__all__ = ("FakeDevice", "Platform", "PLATFORMS")
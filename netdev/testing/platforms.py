@@ -0,0 +1,352 @@
+"""
+Behaviour of the emulated platforms
+
+Every Platform describes prompts of the modes, commands for changing modes, paging and messages
+of the real device closely enough for the netdev class of this device_type to work with it
+"""
+
+_IOS_ERROR = "% Invalid input detected at '^' marker."
+
+_IOS_VERSION = (
+    "Cisco IOS Software, C2960X Software (C2960X-UNIVERSALK9-M), Version 15.2(2)E7\r\n"
+    "Technical Support: http://www.cisco.com/techsupport\r\n"
+    "ROM: Bootstrap program is C2960X boot loader\r\n"
+    "{hostname} uptime is 1 week, 2 days, 3 hours, 4 minutes\r\n"
+)
+
+
+class Platform(object):
+    """
+    Description of the emulated platform
+
+    Prompts are format strings with {hostname} and {username} fields. Transitions are tuples
+    (command, modes where the command works, new mode). In config_modes every command is accepted
+    silently, unless it starts with "invalid" (then the error message is printed)
+    """
+
+    def __init__(
+        self,
+        prompts,
+        initial_mode,
+        transitions=(),
+        submodes=(),
+        config_modes=(),
+        paging_commands=(),
+        more_prompt=" --More-- ",
+        error=_IOS_ERROR,
+        outputs=None,
+        dialogs=None,
+        commit_command=None,
+        commit_output="",
+        uncommitted_question=None,
+        config_header="",
+        exit_commands=("exit", "quit", "logout"),
+        access_denied="% Access denied",
+        banner="\r\n",
+        ansi=False,
+        ssh_version="OpenSSH_7.4",
+        username_options=False,
+        secret_param=None,
+        exec_supported=False,
+    ):
+        """
+        :param dict prompts: prompt format for every mode {mode: prompt}
+        :param str initial_mode: mode after login
+        :param transitions: tuples (command, modes, new mode) for changing modes
+        :param submodes: tuples (first word of the command, mode, new mode) like "interface" in IOS
+        :param config_modes: modes where all commands are accepted
+        :param paging_commands: commands which disable paging
+        :param str more_prompt: paging prompt which waits for a key
+        :param str error: message for unknown commands
+        :param dict outputs: outputs of commands {command: output}. Format fields are like in prompts
+        :param dict dialogs: questions asked by commands before doing them {command: [(question, echo)]}.
+                The command is rejected if the answer to a question without echo isn't the secret
+        :param str commit_command: command for committing the candidate configuration
+        :param str commit_output: output of the successful commit
+        :param str uncommitted_question: question asked when leaving config modes with uncommitted changes
+        :param str config_header: line printed before prompts of config modes like [edit] in JunOS
+        :param exit_commands: commands which leave the submode or close the session in other modes
+        :param str access_denied: message for the wrong password in dialogs
+        :param str banner: text printed before the first prompt. It must not contain prompt delimiters
+        :param bool ansi: wrap the output and prompts with ANSI escape codes
+        :param str ssh_version: software version of the SSH server like "Cisco-1.25"
+        :param bool username_options: ignore options after "+" in the username like RouterOS
+        :param str secret_param: param of the netdev class for the password asked in dialogs
+        :param bool exec_supported: run commands of SSH exec requests
+        """
+        self.prompts = prompts
+        self.initial_mode = initial_mode
+        self.transitions = transitions
+        self.submodes = submodes
+        self.config_modes = config_modes
+        self.paging_commands = paging_commands
+        self.more_prompt = more_prompt
+        self.error = error
+        self.outputs = outputs or {}
+        self.dialogs = dialogs or {}
+        self.commit_command = commit_command
+        self.commit_output = commit_output
+        self.uncommitted_question = uncommitted_question
+        self.config_header = config_header
+        self.exit_commands = exit_commands
+        self.access_denied = access_denied
+        self.banner = banner
+        self.ansi = ansi
+        self.ssh_version = ssh_version
+        self.username_options = username_options
+        self.secret_param = secret_param
+        self.exec_supported = exec_supported
+
+
+def _ios_like(
+    prompt="{hostname}",
+    initial_mode="user",
+    config_enter=("conf t", "configure terminal"),
+    config_prompt="{prompt}(config)#",
+    submode_prompt="{prompt}(config-if)#",
+    enable_prompt="{prompt}#",
+    user_prompt="{prompt}>",
+    **kwargs
+):
+    """Platform with user exec, privilege exec and configuration modes of Cisco IOS"""
+    prompts = {
+        "user": user_prompt.replace("{prompt}", prompt),
+        "enable": enable_prompt.replace("{prompt}", prompt),
+        "config": config_prompt.replace("{prompt}", prompt),
+        "config-if": submode_prompt.replace("{prompt}", prompt),
+    }
+    transitions = [
+        ("enable", ("user",), "enable"),
+        ("disable", ("enable",), "user"),
+        ("end", ("config", "config-if"), "enable"),
+    ]
+    transitions += [(command, ("enable",), "config") for command in config_enter]
+    if kwargs.get("commit_command"):
+        transitions.append(("abort", ("config", "config-if"), "enable"))
+    kwargs.setdefault("paging_commands", ("terminal length 0",))
+    kwargs.setdefault("dialogs", {"enable": [("Password: ", False)]})
+    kwargs.setdefault("secret_param", "secret")
+    kwargs.setdefault("outputs", {"show version": _IOS_VERSION})
+    return Platform(
+        prompts,
+        initial_mode,
+        transitions=transitions,
+        submodes=(("interface", "config", "config-if"),),
+        config_modes=("config", "config-if"),
+        **kwargs
+    )
+
+
+def _comware_like(paging_command, more_prompt, **kwargs):
+    """Platform with user view and system view of HP Comware and Huawei"""
+    kwargs.setdefault("error", "% Unrecognized command found at '^' position.")
+    return Platform(
+        {
+            "user": "<{hostname}>",
+            "system": "[{hostname}]",
+            "interface": "[{hostname}-if]",
+        },
+        "user",
+        transitions=[
+            ("system-view", ("user",), "system"),
+            ("return", ("system", "interface"), "user"),
+        ],
+        submodes=(("interface", "system", "interface"),),
+        config_modes=("system", "interface"),
+        paging_commands=(paging_command,),
+        more_prompt=more_prompt,
+        **kwargs
+    )
+
+
+_JUNOS_VERSION = (
+    "Hostname: {hostname}\r\nModel: mx960\r\nJunos: 18.4R2.7\r\n"
+    "JUNOS OS Kernel 64-bit  [20190517.f0321c3_builder_stable_11]\r\n"
+)
+
+PLATFORMS = {
+    "alcatel_aos": Platform(
+        {"enable": "{hostname}-> "},
+        "enable",
+        paging_commands=("terminal length 0",),
+        error="ERROR: Invalid entry",
+        outputs={"show system": "System:\r\n  Description: Alcatel-Lucent OS6450\r\n"},
+    ),
+    "arista_eos": _ios_like(
+        dialogs={},
+        outputs={
+            "show version": "Arista DCS-7050SX-64-R\r\nSoftware image version: 4.20.1F\r\n"
+        },
+        exec_supported=True,
+    ),
+    "aruba_aos_6": _ios_like(
+        user_prompt="({hostname}) >",
+        enable_prompt="({hostname}) #",
+        config_prompt="({hostname}) (config) #",
+        submode_prompt="({hostname}) (config-if) #",
+        paging_commands=("no paging",),
+        more_prompt="-- More -- (q) quit (u) pageup (/) search (n) repeat",
+        outputs={"show version": "ArubaOS (MODEL: Aruba7010), Version 6.5.4.8\r\n"},
+    ),
+    "aruba_aos_8": _ios_like(
+        user_prompt="({hostname}) [mynode] >",
+        enable_prompt="({hostname}) [mynode] #",
+        config_prompt="({hostname}) [mynode] (config) #",
+        submode_prompt="({hostname}) [mynode] (config-if) #",
+        paging_commands=("no paging",),
+        more_prompt="-- More -- (q) quit (u) pageup (/) search (n) repeat",
+        outputs={"show version": "ArubaOS (MODEL: Aruba7030), Version 8.3.0.7\r\n"},
+    ),
+    "cisco_asa": _ios_like(
+        paging_commands=("terminal pager 0",),
+        more_prompt="<--- More --->",
+        error="ERROR: % Invalid input detected at '^' marker.",
+        outputs={
+            "show version": "Cisco Adaptive Security Appliance Software Version 9.8(2)\r\n",
+            "show mode": "Security context mode: single\r\n",
+        },
+    ),
+    "cisco_ios": _ios_like(ssh_version="Cisco-1.25", exec_supported=True),
+    "cisco_ios_xe": _ios_like(
+        ssh_version="Cisco-1.25",
+        outputs={
+            "show version": "Cisco IOS XE Software, Version 16.09.03\r\n"
+            "Cisco IOS Software [Fuji], ISR Software, Version 16.9.3\r\n"
+        },
+        exec_supported=True,
+    ),
+    "cisco_ios_xr": _ios_like(
+        prompt="RP/0/RSP0/CPU0:{hostname}",
+        initial_mode="enable",
+        commit_command="commit",
+        uncommitted_question="Uncommitted changes found, commit them before exiting(yes/no/cancel)? [cancel]:",
+        ssh_version="Cisco-1.25",
+        outputs={"show version": "Cisco IOS XR Software, Version 6.1.4\r\n"},
+    ),
+    "cisco_nxos": _ios_like(
+        initial_mode="enable",
+        outputs={
+            "show version": "Cisco Nexus Operating System (NX-OS) Software\r\nNXOS: version 7.0(3)I7(6)\r\n"
+        },
+        exec_supported=True,
+    ),
+    "cisco_sg3xx": _ios_like(
+        initial_mode="enable",
+        paging_commands=("terminal datadump",),
+        more_prompt="More: <space>,  Quit: q or CTRL+Z, One line: <return> ",
+        ansi=True,
+        outputs={
+            "show version": "SW version    1.4.8.6 ( date  13-Jun-2017 time  16:09:36 )\r\n"
+        },
+    ),
+    "fujitsu_switch": _ios_like(
+        user_prompt="({hostname}) >",
+        enable_prompt="({hostname}) #",
+        config_prompt="({hostname}) (config)#",
+        submode_prompt="({hostname}) (config-if)#",
+        config_enter=("conf", "configure"),
+        paging_commands=("no pager",),
+        more_prompt="--More-- or (q)uit",
+        outputs={"show version": "Fujitsu PY CB Eth Switch/IBP 10Gb 18/8\r\n"},
+    ),
+    "hp_comware": _comware_like(
+        "screen-length disable",
+        "  ---- More ----",
+        ssh_version="Comware-7.1.064",
+        outputs={
+            "display version": "HPE Comware Software, Version 7.1.070, Release 3208P08\r\n"
+        },
+    ),
+    "hp_comware_limited": _comware_like(
+        "screen-length disable",
+        "  ---- More ----",
+        ssh_version="Comware-5.20",
+        outputs={
+            "display version": "HP Comware Platform Software, Version 5.20.99, Release 1118\r\n",
+            "_cmdline-mode on": "Warning: Now you enter an all-command mode for developer's testing, "
+            "some commands may affect operation by wrong use, please carefully use it with "
+            "our engineer's direction.\r\n",
+        },
+        dialogs={
+            "_cmdline-mode on": [
+                ("All commands can be displayed and executed. Continue? [Y/N]", True),
+                ("Please input password:", False),
+            ]
+        },
+        access_denied="Invalid password",
+        secret_param="cmdline_password",
+    ),
+    "huawei": _comware_like(
+        "screen-length 0 temporary",
+        "  ---- More ----",
+        error="Error: Unrecognized command found at '^' position.",
+        ssh_version="HUAWEI-1.5",
+        outputs={
+            "display version": "Huawei Versatile Routing Platform Software\r\nVRP (R) software, Version 5.170\r\n"
+        },
+    ),
+    "hw1000": Platform(
+        {"user": "{hostname}> ", "enable": "{hostname}# "},
+        "user",
+        transitions=[("enable", ("user",), "enable"), ("exit", ("enable",), "user")],
+        dialogs={"enable": [("Password: ", False)]},
+        secret_param="secret",
+        exit_commands=("quit", "logout"),
+        error="Unknown command",
+        outputs={"show version": "HW1000 ViPNet Coordinator 4.3\r\n"},
+    ),
+    "juniper_junos": Platform(
+        {"cli": "{username}@{hostname}> ", "config": "{username}@{hostname}# "},
+        "cli",
+        transitions=[
+            ("configure", ("cli",), "config"),
+            ("exit configuration-mode", ("config",), "cli"),
+        ],
+        config_modes=("config",),
+        paging_commands=("set cli screen-length 0",),
+        more_prompt="---(more)---",
+        error="error: unknown command: {command}",
+        outputs={
+            "show version": _JUNOS_VERSION,
+            "configure": "Entering configuration mode\r\n",
+        },
+        commit_command="commit",
+        commit_output="commit complete\r\n",
+        config_header="\r\n[edit]\r\n",
+        exec_supported=True,
+    ),
+    "mikrotik_routeros": Platform(
+        {"cli": "[{username}@{hostname}] > "},
+        "cli",
+        error="bad command name {command} (line 1 column 1)",
+        outputs={
+            "/system resource print": "version: 6.45.1 (stable)\r\nboard-name: CCR1036-8G-2S+\r\n"
+        },
+        exit_commands=("quit",),
+        # RouterOS redraws the prompt after detecting the terminal
+        banner="\r\n\r\n  MikroTik RouterOS 6.45.1 (c) 1999-2019       http://www.mikrotik.com/\r\n\r\n"
+        "[{username}@{hostname}] > \r",
+        ansi=True,
+        ssh_version="ROSSSH",
+        username_options=True,
+    ),
+    "terminal": Platform(
+        {"shell": "{username}@{hostname}:~$ "},
+        "shell",
+        error="-bash: {command}: command not found",
+        outputs={"uname -a": "Linux {hostname} 5.4.0-42-generic x86_64 GNU/Linux\r\n"},
+        exec_supported=True,
+    ),
+    "ubiquity_edge": _ios_like(
+        user_prompt="({hostname}) >",
+        enable_prompt="({hostname}) #",
+        config_prompt="({hostname}) (Config)#",
+        submode_prompt="({hostname}) (Interface)#",
+        config_enter=("configure",),
+        more_prompt="--More-- or (q)uit",
+        outputs={
+            "show version": "Machine Description............. EdgeSwitch 24-Port Lite\r\n"
+        },
+    ),
+}
+"""Emulated platforms by device_type"""
@@ -0,0 +1,462 @@
+"""
+SSH server emulating network devices on localhost
+
+FakeDevice answers like the real device of the given device_type: prompts of the modes, entering
+enable and configuration modes, paging, ANSI escape codes, errors of unknown commands. Latency,
+bandwidth and chunking of the output are configurable, so connections and reading of netdev can be
+tested and benchmarked without the lab. The server is started only on loopback addresses
+"""
+import asyncio
+import ipaddress
+import re
+
+import asyncssh
+
+from netdev.testing.platforms import PLATFORMS
+
+_host_key = None
+"""Host key shared by all fake devices of the process. Generating it for every server is slow"""
+
+_LINE_END = re.compile(r"\r\n|\r|\n")
+
+_MAX_READ = 65535
+
+_ANSI_LINE_END = "\x1b[K"
+
+_ANSI_PROMPT_START = "\x1b[m"
+
+
+def _get_host_key():
+    global _host_key
+    if _host_key is None:
+        _host_key = asyncssh.generate_private_key("ssh-ed25519")
+    return _host_key
+
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _crlf(text):
+    """Return text with CRLF line endings and with the line ending after the last line"""
+    if not text:
+        return ""
+    text = text.replace("\r\n", "\n").replace("\n", "\r\n")
+    if not text.endswith("\r\n"):
+        text += "\r\n"
+    return text
+
+
+class FakeDevice(object):
+    """
+    SSH server emulating the device of the given device_type
+
+    Usage::
+
+        async with FakeDevice("cisco_ios", outputs={"show clock": "12:00:00.000 UTC"}) as fake:
+            async with netdev.create(**fake.connection_params()) as device:
+                print(await device.send_command("show clock"))
+
+    Every command received in the shell or in exec requests is appended to :attr:`commands`
+    """
+
+    def __init__(
+        self,
+        device_type="cisco_ios",
+        hostname="fake",
+        username="admin",
+        password="admin",
+        secret="secret",
+        outputs=None,
+        latency=0,
+        bandwidth=None,
+        chunk_size=None,
+        page_lines=24,
+    ):
+        """
+        :param str device_type: emulated platform, one of :data:`PLATFORMS <netdev.testing.PLATFORMS>`
+        :param str hostname: hostname in the prompts
+        :param str username: accepted username
+        :param str password: accepted password
+        :param str secret: password for privilege exec and other password questions of the device
+        :param dict outputs: outputs of commands {command: output}. They override outputs of the platform
+        :param float latency: delay in seconds of every output of the device like round trip time of the network
+        :param int bandwidth: maximum bytes per second sent by one session. Default is None (no limit)
+        :param int chunk_size: maximum size of one written piece of the output. Default is None (no limit)
+        :param int page_lines: count of lines on one page while paging isn't disabled
+        """
+        if device_type not in PLATFORMS:
+            raise ValueError(
+                "Unsupported device_type {!r}. Supported device types: {}".format(
+                    device_type, ", ".join(sorted(PLATFORMS))
+                )
+            )
+        self.device_type = device_type
+        self.platform = PLATFORMS[device_type]
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.secret = secret
+        self.outputs = outputs or {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.chunk_size = chunk_size
+        self.page_lines = page_lines
+        self.host = None
+        self.port = None
+        self.commands = []
+        self._server = None
+        self._connections = set()
+        self._sessions = set()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        await self.wait_closed()
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        Start listening. Port 0 selects a free port, it's available in :attr:`port` after starting
+
+        :raises ValueError: if host isn't a loopback address
+        """
+        if not _is_loopback(host):
+            raise ValueError(
+                "Fake devices listen only on loopback addresses, not on {!r}".format(
+                    host
+                )
+            )
+        self._server = await asyncssh.create_server(
+            lambda: _SSHServer(self),
+            host,
+            port,
+            server_host_keys=[_get_host_key()],
+            server_version=self.platform.ssh_version,
+            process_factory=self._run_session,
+            line_editor=False,
+        )
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+
+    def close(self):
+        """Stop listening and close all connections"""
+        if self._server is not None:
+            self._server.close()
+        for conn in list(self._connections):
+            conn.close()
+
+    async def wait_closed(self):
+        """Wait for closing the server and ending of all sessions"""
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._sessions:
+            await asyncio.wait(list(self._sessions))
+
+    def connection_params(self, **params):
+        """Return params of :func:`netdev.create` for connecting to this device"""
+        result = dict(
+            host=self.host,
+            port=self.port,
+            device_type=self.device_type,
+            username=self.username,
+            password=self.password,
+            known_hosts=None,
+        )
+        if self.platform.secret_param:
+            result[self.platform.secret_param] = self.secret
+        result.update(params)
+        return result
+
+    def _run_session(self, process):
+        session = asyncio.ensure_future(_Session(self, process).run())
+        self._sessions.add(session)
+        session.add_done_callback(self._sessions.discard)
+        return session
+
+
+class _SSHServer(asyncssh.SSHServer):
+    """Password authentication and tracking of connections"""
+
+    def __init__(self, device):
+        self._device = device
+        self._conn = None
+
+    def connection_made(self, conn):
+        self._conn = conn
+        self._device._connections.add(conn)
+
+    def connection_lost(self, exc):
+        self._device._connections.discard(self._conn)
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        if self._device.platform.username_options:
+            # Like "admin+ct200w" of RouterOS
+            username = username.split("+", 1)[0]
+        return username == self._device.username and password == self._device.password
+
+
+class _Session(object):
+    """One shell or exec channel of the fake device"""
+
+    def __init__(self, device, process):
+        self._device = device
+        self._platform = device.platform
+        self._process = process
+        self._loop = asyncio.get_event_loop()
+        self._mode = self._platform.initial_mode
+        self._previous_modes = []
+        self._paging = bool(self._platform.paging_commands)
+        self._changed = False
+        self._input = ""
+        self._skip_lf = False
+        self._output = asyncio.Queue()
+
+    async def run(self):
+        writer = asyncio.ensure_future(self._write_output())
+        status = 0
+        try:
+            if self._process.command is not None:
+                status = self._run_exec(self._process.command)
+            else:
+                await self._run_shell()
+        except (asyncssh.Error, ConnectionError):
+            writer.cancel()
+            return
+        self._output.put_nowait(None)
+        try:
+            await writer
+            self._process.exit(status)
+        except (asyncssh.Error, ConnectionError):
+            pass
+
+    async def _run_shell(self):
+        self._send(self._format(self._platform.banner) + self._prompt())
+        while True:
+            line = await self._read_line()
+            if line is None or not await self._handle(line):
+                return
+
+    def _run_exec(self, command):
+        command = " ".join(command.split())
+        self._device.commands.append(command)
+        if not self._platform.exec_supported:
+            self._process.stderr.write("Exec requests aren't supported\r\n")
+            return 1
+        output = self._command_output(command)
+        if output is None:
+            self._process.stderr.write(_crlf(self._error(command)))
+            return 1
+        self._send(output)
+        return 0
+
+    async def _handle(self, line):
+        """Run the command and write its output and the prompt. Return False for closing the session"""
+        platform = self._platform
+        command = " ".join(line.split())
+        self._send(line + "\r\n")
+        if not command:
+            self._send(self._prompt())
+            return True
+        self._device.commands.append(command)
+
+        mode = self._new_mode(command)
+        output = self._command_output(command)
+        if mode is None and output is None:
+            return await self._handle_other(command)
+        if command in platform.dialogs and not await self._dialog(
+            platform.dialogs[command]
+        ):
+            self._send(_crlf(platform.access_denied) + self._prompt())
+            return True
+        if command in platform.paging_commands:
+            self._paging = False
+        if mode is not None:
+            await self._change_mode(mode)
+        await self._respond(output)
+        return True
+
+    async def _handle_other(self, command):
+        """Exiting, committing and commands of configuration modes"""
+        platform = self._platform
+        output = ""
+        if command in platform.exit_commands:
+            if not self._previous_modes:
+                return False
+            await self._change_mode(self._previous_modes[-1])
+        elif command == platform.commit_command and self._mode in platform.config_modes:
+            self._changed = False
+            output = platform.commit_output
+        elif self._mode in platform.config_modes and not command.startswith("invalid"):
+            self._changed = True
+        else:
+            output = self._error(command)
+        await self._respond(output)
+        return True
+
+    def _new_mode(self, command):
+        """Return the mode entered by the command or None"""
+        for transition_command, modes, new_mode in self._platform.transitions:
+            if command == transition_command and self._mode in modes:
+                return new_mode
+        first_word = command.split()[0]
+        for submode_command, mode, new_mode in self._platform.submodes:
+            if first_word == submode_command and self._mode == mode:
+                return new_mode
+        return None
+
+    async def _change_mode(self, mode):
+        """Go to the mode. Leaving configuration modes with uncommitted changes can be cancelled"""
+        platform = self._platform
+        leaving = (
+            self._mode in platform.config_modes and mode not in platform.config_modes
+        )
+        if leaving and self._changed and platform.uncommitted_question:
+            self._send(platform.uncommitted_question)
+            answer = (await self._read_line() or "").strip().lower()
+            self._send(answer + "\r\n")
+            if answer not in ("yes", "no"):
+                return
+        if leaving:
+            self._changed = False
+        if mode in self._previous_modes:
+            del self._previous_modes[self._previous_modes.index(mode) :]
+        else:
+            self._previous_modes.append(self._mode)
+        self._mode = mode
+
+    async def _dialog(self, questions):
+        """Ask the questions of the command. Return False if the password is wrong"""
+        for question, echo in questions:
+            self._send(question)
+            answer = await self._read_line()
+            if answer is None:
+                return False
+            self._send((answer if echo else "") + "\r\n")
+            if not echo and answer != self._device.secret:
+                return False
+        return True
+
+    def _command_output(self, command):
+        """Return the output of the command or None if the command has no output"""
+        if command in self._device.outputs:
+            return _crlf(self._device.outputs[command])
+        if command in self._platform.outputs:
+            return _crlf(self._format(self._platform.outputs[command]))
+        if command in self._platform.paging_commands:
+            return ""
+        return None
+
+    def _error(self, command):
+        return self._platform.error.format(command=command)
+
+    async def _respond(self, output):
+        """Write the output page by page while paging is enabled and then the prompt"""
+        lines = _crlf(output).split("\r\n")[:-1]
+        page_lines = self._device.page_lines
+        more_prompt = self._platform.more_prompt
+        count = len(lines) if not self._paging else page_lines
+        start = 0
+        while start < len(lines):
+            page = lines[start : start + count]
+            start += count
+            self._send(self._ansi("\r\n".join(page) + "\r\n"))
+            if start >= len(lines):
+                break
+            self._send(more_prompt)
+            key = await self._read_key()
+            self._send(
+                "\b" * len(more_prompt)
+                + " " * len(more_prompt)
+                + "\b" * len(more_prompt)
+            )
+            if key == " ":
+                count = page_lines
+            elif key in ("\r", "\n"):
+                self._skip_lf = key == "\r"
+                count = 1
+            else:
+                break
+        self._send(self._prompt())
+
+    def _prompt(self):
+        prompt = self._format(self._platform.prompts[self._mode])
+        if self._mode in self._platform.config_modes:
+            prompt = self._platform.config_header + prompt
+        if self._platform.ansi:
+            prompt = _ANSI_PROMPT_START + prompt
+        return prompt
+
+    def _ansi(self, output):
+        if not self._platform.ansi:
+            return output
+        return output.replace("\r\n", _ANSI_LINE_END + "\r\n")
+
+    def _format(self, text):
+        return text.format(
+            hostname=self._device.hostname, username=self._device.username
+        )
+
+    async def _read_line(self):
+        """Return the next line of the input without the line ending or None after the end of the input"""
+        while True:
+            if self._skip_lf and self._input:
+                # The line has ended by CR, LF of CRLF has come in the next chunk
+                if self._input.startswith("\n"):
+                    self._input = self._input[1:]
+                self._skip_lf = False
+            match = _LINE_END.search(self._input)
+            if match:
+                line = self._input[: match.start()]
+                self._input = self._input[match.end() :]
+                self._skip_lf = match.group() == "\r" and not self._input
+                return line
+            data = await self._process.stdin.read(_MAX_READ)
+            if not data:
+                return None
+            self._input += data
+
+    async def _read_key(self):
+        """Return the next character of the input or None after the end of the input"""
+        if not self._input:
+            self._input = await self._process.stdin.read(_MAX_READ)
+            if not self._input:
+                return None
+        key = self._input[0]
+        self._input = self._input[1:]
+        return key
+
+    def _send(self, data):
+        """Queue data for writing after the latency of the device"""
+        self._output.put_nowait((self._loop.time() + self._device.latency, data))
+
+    async def _write_output(self):
+        """Write queued data at its time in chunks limited by chunk_size and bandwidth"""
+        device = self._device
+        while True:
+            item = await self._output.get()
+            if item is None:
+                return
+            write_time, data = item
+            delay = write_time - self._loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            chunk_size = device.chunk_size or len(data) or 1
+            for start in range(0, len(data), chunk_size):
+                chunk = data[start : start + chunk_size]
+                self._process.stdout.write(chunk)
+                if device.bandwidth:
+                    await asyncio.sleep(len(chunk) / device.bandwidth)
+                await self._process.stdout.drain()
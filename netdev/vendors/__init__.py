@@ -1,19 +1,37 @@
-from netdev.vendors.alcatel import AlcatelAOS
-from netdev.vendors.arista import AristaEOS
-from netdev.vendors.aruba import ArubaAOS8, ArubaAOS6
-from netdev.vendors.base import BaseDevice
-from netdev.vendors.cisco import CiscoNXOS, CiscoIOSXR, CiscoASA, CiscoIOS, CiscoSG3XX
-from netdev.vendors.comware_like import ComwareLikeDevice
-from netdev.vendors.fujitsu import FujitsuSwitch
-from netdev.vendors.hp import HPComware, HPComwareLimited
-from netdev.vendors.ios_like import IOSLikeDevice
-from netdev.vendors.juniper import JuniperJunOS
-from netdev.vendors.junos_like import JunOSLikeDevice
-from netdev.vendors.mikrotik import MikrotikRouterOS
-from netdev.vendors.terminal import Terminal
-from netdev.vendors.ubiquiti import UbiquityEdgeSwitch
-from netdev.vendors.infotecs import HW1000
-from netdev.vendors.huawei import Huawei
+"""
+Classes of all supported platforms
+
+Vendor modules are imported on the first access to their class, so importing netdev doesn't pay
+for asyncssh and all platforms when only one of them (or none) is used
+"""
+import importlib
+import sys
+
+_CLASSES = {
+    "AlcatelAOS": "netdev.vendors.alcatel.alcatel_aos",
+    "AristaEOS": "netdev.vendors.arista.arista_eos",
+    "ArubaAOS6": "netdev.vendors.aruba.aruba_aos_6",
+    "ArubaAOS8": "netdev.vendors.aruba.aruba_aos_8",
+    "BaseDevice": "netdev.vendors.base",
+    "CiscoASA": "netdev.vendors.cisco.cisco_asa",
+    "CiscoIOS": "netdev.vendors.cisco.cisco_ios",
+    "CiscoIOSXR": "netdev.vendors.cisco.cisco_iosxr",
+    "CiscoNXOS": "netdev.vendors.cisco.cisco_nxos",
+    "CiscoSG3XX": "netdev.vendors.cisco.cisco_sg3xx",
+    "ComwareLikeDevice": "netdev.vendors.comware_like",
+    "FujitsuSwitch": "netdev.vendors.fujitsu.fujitsu_switch",
+    "HPComware": "netdev.vendors.hp.hp_comware",
+    "HPComwareLimited": "netdev.vendors.hp.hp_comware_limited",
+    "IOSLikeDevice": "netdev.vendors.ios_like",
+    "JuniperJunOS": "netdev.vendors.juniper.juniper_junos",
+    "JunOSLikeDevice": "netdev.vendors.junos_like",
+    "MikrotikRouterOS": "netdev.vendors.mikrotik.mikrotik_routeros",
+    "Terminal": "netdev.vendors.terminal.terminal",
+    "UbiquityEdgeSwitch": "netdev.vendors.ubiquiti.ubiquity_edge",
+    "HW1000": "netdev.vendors.infotecs.HW1000",
+    "Huawei": "netdev.vendors.huawei.huawei",
+}
+"""Modules of the classes. They are imported on the first access"""
 
 __all__ = (
     "CiscoASA",
@@ -46,3 +64,25 @@ __all__ = (
     "AlcatelAOS",
     "Huawei",
 )
+
+
+def __getattr__(name):
+    """Import the vendor class or subpackage on the first access"""
+    if name in _CLASSES:
+        value = getattr(importlib.import_module(_CLASSES[name]), name)
+    elif name in __all__:
+        value = importlib.import_module("{}.{}".format(__name__, name))
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ isn't supported (PEP 562), so everything is imported at once
+    for _name in __all__:
+        __getattr__(_name)
@@ -4,4 +4,5 @@ from netdev.vendors.ios_like import IOSLikeDevice
 class AristaEOS(IOSLikeDevice):
     """Class for working with Arista EOS"""
 
-    pass
+    _exec_supported = True
+    """Platform runs CLI commands by SSH exec requests, so exec_mode can be used"""
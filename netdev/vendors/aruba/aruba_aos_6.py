@@ -30,7 +30,7 @@ class ArubaAOS6(IOSLikeDevice):
 
         For Aruba AOS 6 devices base_pattern is "(prompt) (\(.*?\))?\s?[#|>]
         """
-        logger.info("Host {}: Setting base prompt".format(self._host))
+        logger.info("Host %s: Setting base prompt", self._host)
         prompt = await self._find_prompt()
 
         # Strip off trailing terminator
@@ -40,6 +40,6 @@ class ArubaAOS6(IOSLikeDevice):
         base_prompt = re.escape(self._base_prompt[:12])
         pattern = type(self)._pattern
         self._base_pattern = pattern.format(prompt=base_prompt, delimiters=delimiters)
-        logger.debug("Host {}: Base Prompt: {}".format(self._host, self._base_prompt))
-        logger.debug("Host {}: Base Pattern: {}".format(self._host, self._base_pattern))
+        logger.debug("Host %s: Base Prompt: %s", self._host, self._base_prompt)
+        logger.debug("Host %s: Base Pattern: %s", self._host, self._base_pattern)
         return self._base_prompt
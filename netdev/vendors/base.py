@@ -5,12 +5,85 @@ Connections Method are based upon AsyncSSH and should be running in asyncio loop
 """
 
 import asyncio
+import contextlib
+import copy
+import functools
+import logging
 import re
+import time
 
 import asyncssh
 
-from netdev.exceptions import TimeoutError, DisconnectError
-from netdev.logger import logger
+from netdev.buffer import ReadBuffer
+from netdev.deadline import Deadline, _current_task
+from netdev.exceptions import ConfigError, TimeoutError, DisconnectError
+from netdev.instrumentation import OperationStats
+from netdev.logger import log_event, logger, payload_logger
+
+_ANSI_ESCAPE_CHAR = "\x1b"
+_ANSI_NEXT_LINE = "\x1bE"
+_ANSI_ESCAPE_PATTERN = re.compile(
+    r"\x1b(?:"
+    r"\[[0-?]*[ -/]*[@-~]"  # CSI: ESC [ parameter bytes, intermediate bytes, final byte
+    r"|\][^\x07\x1b]*(?:\x07|\x1b\\)"  # OSC: ESC ] text terminated by BEL or ESC \
+    r"|[ -/]*[0-~]"  # Two-character escapes like ESC7, ESC8 and nF escapes like ESC(B
+    r")"
+)
+"""Single pass pattern for all ANSI escape sequences"""
+
+
+class _ConnectionTimer(asyncssh.SSHClient):
+    """SSH client reporting tcp_connect, kex and auth phases of the connection to the hooks of the device"""
+
+    def __init__(self, device):
+        self._device = device
+        self._last = time.monotonic()
+
+    def _report(self, phase):
+        now = time.monotonic()
+        self._device._hooks.on_phase(self._device, phase, self._last, now - self._last)
+        self._last = now
+
+    def connection_made(self, conn):
+        self._report("tcp_connect")
+
+    def begin_auth(self, username):
+        self._report("kex")
+
+    def auth_completed(self):
+        self._report("auth")
+
+
+def _on_channel(method):
+    """
+    Decorator of send_config_set. With several channels the operation acquires an idle channel
+
+    Subclasses extend send_config_set, so the whole method of the class runs on the acquired channel.
+    The channel of this object is owned by the current task meanwhile, so the nested operations of
+    the method run on it directly
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if not self._shares_channels():
+            return await method(self, *args, **kwargs)
+        channel = await self._acquire_channel()
+        try:
+            if channel is not self:
+                # Parallel channel has only one channel, so the method isn't routed again
+                try:
+                    return await method(channel, *args, **kwargs)
+                finally:
+                    self._config_errors = channel._config_errors
+            self._channel_owner = _current_task()
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                self._channel_owner = None
+        finally:
+            self._idle_channels.put_nowait(channel)
+
+    return wrapper
 
 
 class BaseDevice(object):
@@ -43,6 +116,12 @@ class BaseDevice(object):
         compression_algs=(),
         signature_algs=(),
         server_host_key_algs=None,
+        encoding=u"utf-8",
+        bytes_mode=False,
+        channels=1,
+        profile_cache=None,
+        exec_mode=False,
+        hooks=None,
     ):
         """
         Initialize base class for asynchronous working with network devices
@@ -97,6 +176,26 @@ class BaseDevice(object):
             A list of server host key algorithms to allow during the SSH handshake,
             taken from server host key algorithms.
             https://asyncssh.readthedocs.io/en/latest/api.html#publickeyalgs
+        :param encoding: encoding of the data in the channel. Default is utf-8
+        :param bytes_mode:
+            Open the channel without encoding (encoding=None in asyncssh) and read it as bytes.
+            Prompt is searched by bytes patterns and the output is decoded only once, or it's returned
+            as raw bytes by send_command and stream_command with decode=False
+        :param channels:
+            Maximum count of shell channels opened over one SSH connection. Concurrent send_command
+            calls are dispatched across the channels. Additional channels are opened lazily when all
+            opened channels are busy, and each of them does its own prompt and paging setup
+        :param profile_cache:
+            Cache of the facts discovered while connecting (prompt, platform specific modes).
+            If the first prompt of the session is the cached one, the discovery is skipped
+        :param exec_mode:
+            Run commands by SSH exec requests instead of the interactive shell. Every command gets its own
+            channel and its output is read until EOF, so no shell, prompt or paging setup is needed, and
+            up to channels commands run concurrently. Only non interactive commands are supported and
+            only on the platforms with _exec_supported
+        :param hooks:
+            Receiver of the timings of connecting phases and the stats of every command. Hooks are called
+            synchronously, so they must be fast
         
 
         :type host: str
@@ -127,6 +226,12 @@ class BaseDevice(object):
         :type compression_algs: list[str]
         :type signature_algs: list[str]
         :type server_host_key_algs: list[str]
+        :type encoding: str
+        :type bytes_mode: bool
+        :type channels: int
+        :type profile_cache: :class:`ProfileCache <netdev.profiles.ProfileCache>`
+        :type exec_mode: bool
+        :type hooks: :class:`Hooks <netdev.instrumentation.Hooks>`
         """
         if host:
             self._host = host
@@ -135,6 +240,8 @@ class BaseDevice(object):
         self._port = int(port)
         self._device_type = device_type
         self._timeout = timeout
+        self._encoding = encoding
+        self._bytes_mode = bytes_mode
         if loop is None:
             self._loop = asyncio.get_event_loop()
         else:
@@ -177,7 +284,32 @@ class BaseDevice(object):
         self._stdin = self._stdout = self._stderr = self._conn = None
         self._base_prompt = self._base_pattern = ""
         self._MAX_BUFFER = 65535
+        self._pattern_cache = {}
+        self._deadline = None
         self._ansi_escape_codes = False
+        self._channels = channels
+        self._opened_channels = 1
+        self._idle_channels = None
+        # Task running send_config_set on the channel of this object when there are several channels
+        self._channel_owner = None
+        # Prompt line which ended the last read. None if it's unknown or something was written after it
+        self._last_prompt = None
+        self._profile_cache = profile_cache
+        self._profile = None
+        if profile_cache is not None:
+            self._profile = profile_cache.get(self._host, self._device_type)
+        # True if the profile is validated by the first prompt or updated in this session
+        self._profile_valid = False
+        self._config_errors = []
+        if exec_mode and not type(self)._exec_supported:
+            raise ValueError(
+                "Exec mode isn't supported by {}".format(type(self).__name__)
+            )
+        self._exec_mode = exec_mode
+        self._exec_semaphore = None
+        self._hooks = hooks
+        # Stats of the current operation. It's None if hooks aren't set or no operation is running
+        self._stats = None
 
     _delimiter_list = [">", "#"]
     """All this characters will stop reading from buffer. It mean the end of device prompt"""
@@ -188,11 +320,46 @@ class BaseDevice(object):
     _disable_paging_command = "terminal length 0"
     """Command for disabling paging"""
 
+    _prompt_window = 1024
+    """Maximum length of the prompt. Only this part of already read data is rescanned after each read"""
+
+    _pattern_cache_size = 64
+    """Maximum count of compiled patterns which are cached in the session"""
+
+    _linefeed_replacements = (("\r\r\n", "\n"), ("\r\n", "\n"), ("\n\r", "\n"))
+    """Replacements for normalizing linefeeds in the output. They are applied in this order"""
+
+    _config_error_signatures = ()
+    """Patterns of the messages about rejected configuration commands"""
+
+    _exec_supported = False
+    """Platform runs CLI commands by SSH exec requests, so exec_mode can be used"""
+
     @property
     def base_prompt(self):
         """Returning base prompt for this network device"""
         return self._base_prompt
 
+    @property
+    def host(self):
+        """Hostname or ip address of the device"""
+        return self._host
+
+    @property
+    def device_type(self):
+        """Network device type of the session"""
+        return self._device_type
+
+    @property
+    def config_errors(self):
+        """List of (command, error message) found in the output of the last send_config_set"""
+        return list(self._config_errors)
+
+    @property
+    def _channel_encoding(self):
+        """Encoding for opening the channel. None means that the channel works with bytes"""
+        return None if self._bytes_mode else self._encoding
+
     async def __aenter__(self):
         """Async Context Manager"""
         await self.connect()
@@ -213,39 +380,124 @@ class BaseDevice(object):
         * _set_base_prompt() for finding and setting device prompt
         * _disable_paging() for non interactive output in commands
         """
-        logger.info("Host {}: Trying to connect to the device".format(self._host))
-        await self._establish_connection()
-        await self._set_base_prompt()
-        await self._disable_paging()
-        logger.info("Host {}: Has connected to the device".format(self._host))
+        logger.info("Host %s: Trying to connect to the device", self._host)
+        with self._connecting():
+            if self._exec_mode:
+                return await self._connect_exec()
+            await self._phase("establish_connection", self._establish_connection())
+            await self._phase("set_base_prompt", self._set_base_prompt())
+            await self._phase("disable_paging", self._disable_paging())
+        logger.info("Host %s: Has connected to the device", self._host)
+
+    async def _connect_exec(self):
+        """Connection method for exec mode: only SSH connection without the shell channel"""
+        await self._phase("establish_connection", self._open_connection())
+        logger.info("Host %s: Has connected to the device in exec mode", self._host)
+
+    @contextlib.contextmanager
+    def _connecting(self):
+        """Context manager reporting the whole connect() as the connect phase or its error to the hooks"""
+        if self._hooks is None:
+            yield
+            return
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self._hooks.on_error(self, "connect", e)
+            raise
+        self._hooks.on_phase(self, "connect", start, time.monotonic() - start)
+
+    async def _phase(self, phase, step):
+        """Await the step of connecting and report its duration to the hooks"""
+        if self._hooks is None:
+            return await step
+        start = time.monotonic()
+        result = await step
+        self._hooks.on_phase(self, phase, start, time.monotonic() - start)
+        return result
+
+    async def _open_connection(self):
+        """Initiate SSH connection. Parallel channels already have the connection"""
+        if self._conn is None:
+            params = self._connect_params_dict
+            if self._hooks is not None:
+                timer = _ConnectionTimer(self)
+                params = dict(params, client_factory=lambda: timer)
+            fut = asyncssh.connect(**params)
+            try:
+                self._conn = await asyncio.wait_for(fut, self._timeout)
+            except asyncssh.DisconnectError as e:
+                raise DisconnectError(self._host, e.code, e.reason)
+            except asyncio.TimeoutError:
+                raise TimeoutError(self._host)
 
     async def _establish_connection(self):
         """Establishing SSH connection to the network device"""
         logger.info(
-            "Host {}: Establishing connection to port {}".format(self._host, self._port)
+            "Host %s: Establishing connection to port %s", self._host, self._port
         )
         output = ""
-        # initiate SSH connection
-        fut = asyncssh.connect(**self._connect_params_dict)
-        try:
-            self._conn = await asyncio.wait_for(fut, self._timeout)
-        except asyncssh.DisconnectError as e:
-            raise DisconnectError(self._host, e.code, e.reason)
-        except asyncio.TimeoutError:
-            raise TimeoutError(self._host)
+        await self._open_connection()
+        if self._stdout is not None:
+            # The session is adopted from autodetection and the first prompt is already read
+            return ""
         self._stdin, self._stdout, self._stderr = await self._conn.open_session(
-            term_type="Dumb", term_size=(200, 24)
+            term_type="Dumb", term_size=(200, 24), encoding=self._channel_encoding
         )
-        logger.info("Host {}: Connection is established".format(self._host))
+        logger.info("Host %s: Connection is established", self._host)
         # Flush unnecessary data
         delimiters = map(re.escape, type(self)._delimiter_list)
         delimiters = r"|".join(delimiters)
         output = await self._read_until_pattern(delimiters)
-        logger.debug(
-            "Host {}: Establish Connection Output: {}".format(self._host, repr(output))
+        log_event(
+            self._host, "establish_connection", bytes=len(output), payload=output
         )
+        self._validate_profile(output)
         return output
 
+    def _adopt_session(self, device, output):
+        """
+        Take over the connection and the shell channel of other device object
+
+        It's used after detecting device_type: the channel is at the prompt and the last read
+        output is given for validating the cached profile. connect() doesn't open a new session.
+        In exec mode every command runs in its own channel, so the shell channel is closed
+        """
+        self._conn = device._conn
+        if self._exec_mode:
+            device._stdin.close()
+            return
+        self._stdin, self._stdout, self._stderr = (
+            device._stdin,
+            device._stdout,
+            device._stderr,
+        )
+        self._validate_profile(output)
+
+    def _validate_profile(self, output):
+        """Check the cached profile by the first prompt sent by the device after connecting"""
+        if self._profile is None:
+            return
+        prompt = output.strip()
+        if self._ansi_escape_codes:
+            prompt = self._strip_ansi_escape_codes(prompt)
+        prompt = prompt[prompt.rfind("\n") + 1 :]
+        self._profile_valid = prompt == self._profile.get("prompt")
+        if self._profile_valid:
+            # Nothing was written after the first prompt, so it's the current prompt
+            self._last_prompt = prompt
+        logger.debug(
+            "Host %s: Cached profile is valid: %s", self._host, self._profile_valid
+        )
+
+    def _update_profile(self, **facts):
+        """Store discovered facts in the profile cache if the profile is valid for this session"""
+        if self._profile_cache is None or not self._profile_valid:
+            return
+        self._profile.update(facts)
+        self._profile_cache.set(self._host, self._device_type, self._profile)
+
     async def _set_base_prompt(self):
         """
         Setting two important vars:
@@ -255,7 +507,7 @@ class BaseDevice(object):
 
         For Cisco devices base_pattern is "prompt(\(.*?\))?[#|>]
         """
-        logger.info("Host {}: Setting base prompt".format(self._host))
+        logger.info("Host %s: Setting base prompt", self._host)
         prompt = await self._find_prompt()
 
         # Strip off trailing terminator
@@ -265,31 +517,32 @@ class BaseDevice(object):
         base_prompt = re.escape(self._base_prompt[:12])
         pattern = type(self)._pattern
         self._base_pattern = pattern.format(prompt=base_prompt, delimiters=delimiters)
-        logger.debug("Host {}: Base Prompt: {}".format(self._host, self._base_prompt))
-        logger.debug("Host {}: Base Pattern: {}".format(self._host, self._base_pattern))
+        logger.debug("Host %s: Base Prompt: %s", self._host, self._base_prompt)
+        logger.debug("Host %s: Base Pattern: %s", self._host, self._base_pattern)
         return self._base_prompt
 
     async def _disable_paging(self):
         """Disable paging method"""
-        logger.info("Host {}: Trying to disable paging".format(self._host))
+        logger.info("Host %s: Trying to disable paging", self._host)
         command = type(self)._disable_paging_command
         command = self._normalize_cmd(command)
-        logger.debug(
-            "Host {}: Disable paging command: {}".format(self._host, repr(command))
-        )
-        self._stdin.write(command)
+        logger.debug("Host %s: Disable paging command: %r", self._host, command)
+        self._write_channel(command)
         output = await self._read_until_prompt()
-        logger.debug(
-            "Host {}: Disable paging output: {}".format(self._host, repr(output))
-        )
+        log_event(self._host, "disable_paging", bytes=len(output), payload=output)
         if self._ansi_escape_codes:
             output = self._strip_ansi_escape_codes(output)
         return output
 
     async def _find_prompt(self):
         """Finds the current network device prompt, last line only"""
-        logger.info("Host {}: Finding prompt".format(self._host))
-        self._stdin.write(self._normalize_cmd("\n"))
+        logger.info("Host %s: Finding prompt", self._host)
+        if self._profile_valid and self._last_prompt == self._profile.get("prompt"):
+            logger.debug(
+                "Host %s: Found Prompt in cache: %r", self._host, self._last_prompt
+            )
+            return self._last_prompt
+        self._write_channel(self._normalize_cmd("\n"))
         prompt = ""
         delimiters = map(re.escape, type(self)._delimiter_list)
         delimiters = r"|".join(delimiters)
@@ -301,7 +554,18 @@ class BaseDevice(object):
             raise ValueError(
                 "Host {}: Unable to find prompt: {}".format(self._host, repr(prompt))
             )
-        logger.debug("Host {}: Found Prompt: {}".format(self._host, repr(prompt)))
+        logger.debug("Host %s: Found Prompt: %r", self._host, prompt)
+        # Nothing was written after reading it, so it's the current prompt for checking modes
+        self._last_prompt = prompt
+        if (
+            self._profile_cache is not None
+            and not self._profile_valid
+            and "\n" not in prompt
+        ):
+            # Facts of the old profile can't be trusted with a new prompt
+            self._profile = {}
+            self._profile_valid = True
+            self._update_profile(prompt=prompt)
         return prompt
 
     async def send_command(
@@ -311,6 +575,9 @@ class BaseDevice(object):
         re_flags=0,
         strip_command=True,
         strip_prompt=True,
+        timeout=None,
+        total_timeout=None,
+        decode=True,
     ):
         """
         Sending command to device (support interactive commands with pattern)
@@ -320,17 +587,539 @@ class BaseDevice(object):
         :param re.flags re_flags: re flags for pattern
         :param bool strip_command: True or False for stripping command from output
         :param bool strip_prompt: True or False for stripping ending device prompt
+        :param float timeout: idle timeout in seconds for receiving data. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for the whole command. Default is None (no limit)
+        :param bool decode:
+            False for returning the output as raw bytes in bytes mode. The output isn't post-processed
+            in this case: the echoed command, the ending prompt and linefeeds are kept as received
         :return: The output of the command
         """
-        logger.info("Host {}: Sending command".format(self._host))
+        if self._exec_mode:
+            return await self._run_exec(
+                command_string,
+                pattern=pattern,
+                timeout=timeout,
+                total_timeout=total_timeout,
+                decode=decode,
+            )
+        if self._shares_channels():
+            channel = await self._acquire_channel()
+            try:
+                return await channel._send_command(
+                    command_string,
+                    pattern=pattern,
+                    re_flags=re_flags,
+                    strip_command=strip_command,
+                    strip_prompt=strip_prompt,
+                    timeout=timeout,
+                    total_timeout=total_timeout,
+                    decode=decode,
+                )
+            finally:
+                self._idle_channels.put_nowait(channel)
+        return await self._send_command(
+            command_string,
+            pattern=pattern,
+            re_flags=re_flags,
+            strip_command=strip_command,
+            strip_prompt=strip_prompt,
+            timeout=timeout,
+            total_timeout=total_timeout,
+            decode=decode,
+        )
+
+    async def _send_command(
+        self,
+        command_string,
+        pattern="",
+        re_flags=0,
+        strip_command=True,
+        strip_prompt=True,
+        timeout=None,
+        total_timeout=None,
+        decode=True,
+    ):
+        """Sending command to the channel of this object. Params are the same as in send_command"""
+        logger.info("Host %s: Sending command", self._host)
         output = ""
         command_string = self._normalize_cmd(command_string)
-        logger.debug(
-            "Host {}: Send command: {}".format(self._host, repr(command_string))
+        logger.debug("Host %s: Send command: %r", self._host, command_string)
+        start = time.monotonic()
+        with self._operation("send_command", command_string):
+            with self._deadline_scope(timeout, total_timeout):
+                self._write_channel(command_string)
+                output = await self._read_until_prompt_or_pattern(
+                    pattern, re_flags, decode=decode
+                )
+            if isinstance(output, bytes):
+                log_event(
+                    self._host,
+                    "send_command",
+                    bytes=len(output),
+                    duration=time.monotonic() - start,
+                )
+                return output
+            output = self._normalize_output(
+                output,
+                command_string=command_string,
+                strip_command=strip_command,
+                strip_prompt=strip_prompt,
+            )
+
+        log_event(
+            self._host,
+            "send_command",
+            bytes=len(output),
+            duration=time.monotonic() - start,
+            payload=output,
+        )
+        return output
+
+    async def send_commands(
+        self,
+        commands,
+        strip_command=True,
+        strip_prompt=True,
+        timeout=None,
+        total_timeout=None,
+        window=None,
+    ):
+        """
+        Sending several non interactive commands to device in one round trip
+
+        All commands are written at once and the combined output is split by the device prompts,
+        so the batch costs about one round trip instead of one per command. Paging must be disabled.
+        Usage::
+
+            outputs = await device.send_commands(["show version", "show ip interface brief"])
+            print(outputs["show version"])
+
+        :param list commands: iterable string list with commands
+        :param bool strip_command: True or False for stripping command from output
+        :param bool strip_prompt: True or False for stripping ending device prompt
+        :param float timeout: idle timeout in seconds for receiving data. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for all commands. Default is None (no limit)
+        :param int window: maximum count of commands written to device without waiting for the prompt.
+                Default is None (all commands)
+        :return: dict {command: output} in the order of commands. The last output wins for repeated commands
+        """
+        self._check_window(window)
+        if self._exec_mode:
+            commands = list(commands)
+            outputs = await asyncio.gather(
+                *[
+                    self._run_exec(command, timeout=timeout, total_timeout=total_timeout)
+                    for command in commands
+                ]
+            )
+            return dict(zip(commands, outputs))
+        if self._shares_channels():
+            channel = await self._acquire_channel()
+            try:
+                return await channel._send_commands(
+                    commands,
+                    strip_command=strip_command,
+                    strip_prompt=strip_prompt,
+                    timeout=timeout,
+                    total_timeout=total_timeout,
+                    window=window,
+                )
+            finally:
+                self._idle_channels.put_nowait(channel)
+        return await self._send_commands(
+            commands,
+            strip_command=strip_command,
+            strip_prompt=strip_prompt,
+            timeout=timeout,
+            total_timeout=total_timeout,
+            window=window,
+        )
+
+    async def _send_commands(
+        self,
+        commands,
+        strip_command=True,
+        strip_prompt=True,
+        timeout=None,
+        total_timeout=None,
+        window=None,
+    ):
+        """Sending commands to the channel of this object. Params are the same as in send_commands"""
+        logger.info("Host %s: Sending commands", self._host)
+        commands = list(commands)
+        logger.debug("Host %s: Send commands: %r", self._host, commands)
+        start = time.monotonic()
+        with self._operation("send_commands", commands):
+            with self._deadline_scope(timeout, total_timeout):
+                outputs = await self._send_pipelined(commands, window or len(commands))
+            result = {}
+            for command, output in zip(commands, outputs):
+                result[command] = self._normalize_output(
+                    output,
+                    command_string=self._normalize_cmd(command),
+                    strip_command=strip_command,
+                    strip_prompt=strip_prompt,
+                )
+        log_event(
+            self._host,
+            "send_commands",
+            bytes=sum(len(output) for output in result.values()),
+            duration=time.monotonic() - start,
+            commands=len(commands),
         )
-        self._stdin.write(command_string)
-        output = await self._read_until_prompt_or_pattern(pattern, re_flags)
+        return result
 
+    async def _run_exec(
+        self, command, pattern="", timeout=None, total_timeout=None, decode=True
+    ):
+        """
+        Run the command by exec request in a new channel and return its output read until EOF
+
+        Not more than channels commands are run concurrently. The output has no echoed command and
+        no prompt. Error messages from stderr are appended to the output. Concurrent commands share
+        the session, so every command has its own deadline and stats instead of the session ones.
+        The output is read in chunks, so timeout is the idle timeout like in the shell
+        """
+        if pattern:
+            raise ValueError(
+                "Host {}: Interactive commands aren't supported in exec mode".format(
+                    self._host
+                )
+            )
+        if self._exec_semaphore is None:
+            self._exec_semaphore = asyncio.Semaphore(self._channels)
+        logger.debug("Host %s: Run command: %r", self._host, command)
+        start = time.monotonic()
+        stats = None if self._hooks is None else OperationStats("exec_command", command)
+        try:
+            async with self._exec_semaphore:
+                deadline = Deadline(self._loop, timeout or self._timeout, total_timeout)
+                with deadline:
+                    process = await self._conn.create_process(
+                        command, encoding=self._channel_encoding
+                    )
+                    try:
+                        stdout, stderr = await asyncio.gather(
+                            self._read_exec_stream(process.stdout, deadline),
+                            self._read_exec_stream(process.stderr, deadline),
+                        )
+                    finally:
+                        process.close()
+        except asyncio.TimeoutError:
+            error = TimeoutError(self._host)
+            if stats is not None:
+                self._hooks.on_error(self, "exec_command", error)
+            raise error
+        except Exception as e:
+            if stats is not None:
+                self._hooks.on_error(self, "exec_command", e)
+            raise
+        chunks = stdout + stderr
+        output = (b"" if self._channel_encoding is None else "").join(chunks)
+        if stats is not None:
+            stats.bytes = len(output)
+            stats.reads = len(chunks)
+        if isinstance(output, bytes) and not decode:
+            log_event(
+                self._host,
+                "exec_command",
+                bytes=len(output),
+                duration=time.monotonic() - start,
+            )
+            self._report_operation(stats)
+            return output
+        normalize_start = time.monotonic()
+        output = self._normalize_output(self._decode(output))
+        if output.endswith("\n"):
+            output = output[:-1]
+        if stats is not None:
+            stats.normalize_time = time.monotonic() - normalize_start
+            self._report_operation(stats)
+        log_event(
+            self._host,
+            "exec_command",
+            bytes=len(output),
+            duration=time.monotonic() - start,
+            payload=output,
+        )
+        return output
+
+    async def _read_exec_stream(self, stream, deadline):
+        """Read the stream of the exec channel until EOF and return the list of chunks"""
+        chunks = []
+        while True:
+            chunk = await stream.read(self._MAX_BUFFER)
+            if not chunk:
+                return chunks
+            chunks.append(chunk)
+            deadline.touch()
+
+    def _shares_channels(self):
+        """
+        Check that the operation must acquire a channel: there are several channels and the current
+        task doesn't own the channel of this object already
+        """
+        return self._channels > 1 and self._channel_owner is not _current_task()
+
+    async def _acquire_channel(self):
+        """
+        Return idle channel for the command. The channel of this object is used as the first one
+
+        If all channels are busy and the limit isn't reached, a new channel is opened. If the device
+        refuses to open it, the limit is lowered to the count of already opened channels
+        """
+        if self._idle_channels is None:
+            self._idle_channels = asyncio.Queue()
+            self._idle_channels.put_nowait(self)
+        if self._idle_channels.empty() and self._opened_channels < self._channels:
+            self._opened_channels += 1
+            channel = None
+            try:
+                channel = await self._open_parallel_channel()
+                return channel
+            except asyncssh.ChannelOpenError as e:
+                self._channels = self._opened_channels - 1
+                logger.warning(
+                    "Host %s: Failed to open parallel channel, limit is lowered to %s: %s",
+                    self._host,
+                    self._channels,
+                    e.reason,
+                )
+            finally:
+                if channel is None:
+                    self._opened_channels -= 1
+        return await self._idle_channels.get()
+
+    async def _open_parallel_channel(self):
+        """Open one more channel over the same SSH connection and prepare it like a new session"""
+        logger.info("Host %s: Opening parallel channel", self._host)
+        channel = copy.copy(self)
+        channel._stdin = channel._stdout = channel._stderr = None
+        channel._deadline = None
+        channel._stats = None
+        channel._last_prompt = None
+        channel._channels = 1
+        channel._idle_channels = None
+        channel._channel_owner = None
+        # The channel isn't a new session for the hooks, only opening it is reported
+        channel._hooks = None
+        try:
+            await self._phase("open_channel", channel.connect())
+        except BaseException:
+            # The connection is shared, so only the channel is closed
+            if channel._stdin is not None:
+                channel._stdin.close()
+            raise
+        channel._hooks = self._hooks
+        return channel
+
+    async def stream_command(
+        self,
+        command_string,
+        pattern="",
+        re_flags=0,
+        strip_command=True,
+        strip_prompt=True,
+        timeout=None,
+        total_timeout=None,
+        decode=True,
+    ):
+        """
+        Sending command to device and yielding the output while it arrives
+
+        It works like send_command, but the whole output is never kept in memory. The output is yielded
+        in parts which end on line boundaries and have normalized linefeeds. The last _prompt_window
+        characters are held back, because they can contain the ending device prompt.
+
+        Usage::
+
+            async for part in device.stream_command("show running-config"):
+                file.write(part)
+
+        If the iterator is closed before the end of the output (by aclose() or by the loop after
+        breaking out of async for), the rest of the output is read up to the prompt and dropped,
+        so the channel is ready for the next command.
+
+        :param str command_string: command for executing basically in privilege mode
+        :param str pattern: pattern for waiting in output (for interactive commands)
+        :param re.flags re_flags: re flags for pattern
+        :param bool strip_command: True or False for stripping command from output
+        :param bool strip_prompt: True or False for stripping ending device prompt
+        :param float timeout: idle timeout in seconds for receiving data. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for the whole command. Default is None (no limit)
+        :param bool decode:
+            False for yielding raw bytes in bytes mode. Parts aren't post-processed in this case
+        :return: async iterator with parts of the output
+        """
+        shared = self._shares_channels()
+        channel = await self._acquire_channel() if shared else self
+        parts = channel._stream_command(
+            command_string,
+            pattern=pattern,
+            re_flags=re_flags,
+            strip_command=strip_command,
+            strip_prompt=strip_prompt,
+            timeout=timeout,
+            total_timeout=total_timeout,
+            decode=decode,
+        )
+        try:
+            async for part in parts:
+                yield part
+        finally:
+            try:
+                # The channel is returned only after the rest of the output is read
+                await parts.aclose()
+            finally:
+                if shared:
+                    self._idle_channels.put_nowait(channel)
+
+    async def _stream_command(
+        self,
+        command_string,
+        pattern="",
+        re_flags=0,
+        strip_command=True,
+        strip_prompt=True,
+        timeout=None,
+        total_timeout=None,
+        decode=True,
+    ):
+        """Streaming command on the channel of this object. Params are the same as in stream_command"""
+        logger.info("Host %s: Streaming command", self._host)
+        command_string = self._normalize_cmd(command_string)
+        logger.debug("Host %s: Stream command: %r", self._host, command_string)
+        patterns = self._prompt_or_pattern_regexes(pattern, re_flags)
+        deadline = Deadline(self._loop, timeout or self._timeout, total_timeout)
+        buffer = ReadBuffer(
+            window=self._prompt_window, empty=b"" if self._bytes_mode else ""
+        )
+        self._write_channel(command_string)
+
+        raw = self._bytes_mode and not decode
+        match = None
+        try:
+            while True:
+                match = await self._read_stream_chunk(buffer, patterns, deadline)
+                if match:
+                    break
+                # Data before the scan start can't be a part of the prompt anymore
+                cut = self._find_stream_boundary(
+                    buffer.getvalue(), buffer.scan_start - buffer.start
+                )
+                if not cut:
+                    continue
+                part = buffer.take(cut)
+                if not raw:
+                    # Parts end on linefeeds, so multibyte characters are never split
+                    part = self._normalize_output(
+                        self._decode(part),
+                        command_string=command_string,
+                        strip_command=strip_command,
+                    )
+                strip_command = False
+                if part:
+                    yield part
+
+            self._last_prompt = self._find_prompt_line(buffer.tail, match)
+            output = buffer.getvalue()
+            if not raw:
+                output = self._normalize_output(
+                    self._decode(output),
+                    command_string=command_string,
+                    strip_command=strip_command,
+                    strip_prompt=strip_prompt,
+                )
+            if output:
+                yield output
+        except GeneratorExit:
+            if match is None:
+                await self._drain_stream(buffer, patterns, deadline)
+            raise
+
+    async def _read_stream_chunk(self, buffer, patterns, deadline):
+        """
+        Read one chunk of the streamed output into the buffer and search the patterns in it
+
+        The consumer runs its own code between parts, so the deadline cancels the task only while
+        reading and the time spent by the consumer isn't counted as idle time
+        """
+        deadline.touch()
+        try:
+            with deadline:
+                return await self._read_chunk(buffer, patterns, deadline)
+        except asyncio.TimeoutError:
+            raise TimeoutError(self._host)
+
+    async def _drain_stream(self, buffer, patterns, deadline):
+        """
+        Read and drop the rest of the streamed output up to the prompt after the consumer has stopped
+
+        If the prompt can't be read, the state of the channel is unknown and it's closed
+        """
+        logger.info("Host %s: Dropping the rest of the streamed output", self._host)
+        try:
+            while True:
+                match = await self._read_stream_chunk(buffer, patterns, deadline)
+                if match:
+                    break
+                buffer.take(buffer.scan_start - buffer.start)
+        except BaseException as e:
+            logger.warning(
+                "Host %s: Failed to read the rest of the streamed output, closing the channel: %r",
+                self._host,
+                e,
+            )
+            self._stdin.close()
+            if not isinstance(e, Exception):
+                raise
+            return
+        self._last_prompt = self._find_prompt_line(buffer.tail, match)
+
+    @staticmethod
+    def _find_stream_boundary(data, end):
+        """
+        Find the position before end for splitting streamed data
+
+        The position is placed after the last complete sequence of linefeeds, so the normalization of
+        linefeeds and ANSI escape codes gives the same result for the split data
+        """
+        linefeeds = b"\r\n" if isinstance(data, bytes) else "\r\n"
+        index = data.rfind(linefeeds[1:], 0, max(end, 0))
+        if index < 0:
+            return 0
+        index += 1
+        while index < len(data) and data[index : index + 1] in linefeeds:
+            index += 1
+        return index if index < len(data) else 0
+
+    @staticmethod
+    def _find_prompt_end(data, match):
+        """
+        Return the end of the prompt found by the match including spaces and tabs after it
+
+        Prompts like "user@host> " end with a space after the delimiter. It belongs to the prompt,
+        otherwise it would be the beginning of the output of the next pipelined command
+        """
+        blanks = b" \t" if isinstance(data, bytes) else " \t"
+        end = match.end()
+        while end < len(data) and data[end : end + 1] in blanks:
+            end += 1
+        return end
+
+    def _normalize_output(
+        self, output, command_string="", strip_command=False, strip_prompt=False
+    ):
+        """
+        Post-processing of the output in one stage
+
+        All steps are configured by class attributes: _ansi_escape_codes for removing ANSI escape codes
+        and _linefeed_replacements for normalizing linefeeds. Backspaces, the echoed command and
+        the ending prompt are stripped by slicing without splitting the output into lines
+        """
+        stats = self._stats
+        if stats is not None:
+            start = time.monotonic()
         # Some platforms have ansi_escape codes
         if self._ansi_escape_codes:
             output = self._strip_ansi_escape_codes(output)
@@ -339,19 +1128,16 @@ class BaseDevice(object):
             output = self._strip_prompt(output)
         if strip_command:
             output = self._strip_command(command_string, output)
-
-        logger.debug(
-            "Host {}: Send command output: {}".format(self._host, repr(output))
-        )
+        if stats is not None:
+            stats.normalize_time += time.monotonic() - start
         return output
 
     def _strip_prompt(self, a_string):
         """Strip the trailing router prompt from the output"""
-        logger.info("Host {}: Stripping prompt".format(self._host))
-        response_list = a_string.split("\n")
-        last_line = response_list[-1]
-        if self._base_prompt in last_line:
-            return "\n".join(response_list[:-1])
+        logger.info("Host %s: Stripping prompt", self._host)
+        last_line_start = a_string.rfind("\n")
+        if self._base_prompt in a_string[last_line_start + 1 :]:
+            return a_string[: max(last_line_start, 0)]
         else:
             return a_string
 
@@ -361,47 +1147,210 @@ class BaseDevice(object):
 
     async def _read_until_pattern(self, pattern="", re_flags=0):
         """Read channel until pattern detected. Return ALL data available"""
-        output = ""
-        logger.info("Host {}: Reading until pattern".format(self._host))
+        logger.info("Host %s: Reading until pattern", self._host)
         if not pattern:
             pattern = self._base_pattern
-        logger.debug("Host {}: Reading pattern: {}".format(self._host, pattern))
-        while True:
-            fut = self._stdout.read(self._MAX_BUFFER)
-            try:
-                output += await asyncio.wait_for(fut, self._timeout)
-            except asyncio.TimeoutError:
-                raise TimeoutError(self._host)
-            if re.search(pattern, output, flags=re_flags):
-                logger.debug(
-                    "Host {}: Reading pattern '{}' was found: {}".format(
-                        self._host, pattern, repr(output)
-                    )
-                )
-                return output
+        logger.debug("Host %s: Reading pattern: %s", self._host, pattern)
+        return await self._read_until(self._compile_channel_pattern(pattern, re_flags))
 
-    async def _read_until_prompt_or_pattern(self, pattern="", re_flags=0):
+    async def _read_until_prompt_or_pattern(self, pattern="", re_flags=0, decode=True):
         """Read until either self.base_pattern or pattern is detected. Return ALL data available"""
-        output = ""
-        logger.info("Host {}: Reading until prompt or pattern".format(self._host))
+        logger.info("Host %s: Reading until prompt or pattern", self._host)
+        return await self._read_until(
+            *self._prompt_or_pattern_regexes(pattern, re_flags), decode=decode
+        )
+
+    def _prompt_or_pattern_regexes(self, pattern="", re_flags=0):
+        """
+        Return compiled pattern and base pattern for reading until the prompt or the pattern
+
+        send_command and stream_command use them both, so platforms with special prompts override
+        only this method
+        """
         if not pattern:
             pattern = self._base_pattern
         base_prompt_pattern = self._base_pattern
-        while True:
-            fut = self._stdout.read(self._MAX_BUFFER)
-            try:
-                output += await asyncio.wait_for(fut, self._timeout)
-            except asyncio.TimeoutError:
-                raise TimeoutError(self._host)
-            if re.search(pattern, output, flags=re_flags) or re.search(
-                base_prompt_pattern, output, flags=re_flags
-            ):
-                logger.debug(
-                    "Host {}: Reading pattern '{}' or '{}' was found: {}".format(
-                        self._host, pattern, base_prompt_pattern, repr(output)
-                    )
-                )
-                return output
+        logger.debug(
+            "Host %s: Reading pattern: %s or %s", self._host, pattern, base_prompt_pattern
+        )
+        return (
+            self._compile_channel_pattern(pattern, re_flags),
+            self._compile_channel_pattern(base_prompt_pattern, re_flags),
+        )
+
+    async def _read_until(self, *patterns, decode=True):
+        """
+        Read channel until one of compiled patterns is detected. Return ALL data available
+
+        Only new data and the last _prompt_window characters are rescanned after each read,
+        so reading is linear in the size of the output. In bytes mode the data is decoded once
+        after reading, or it's returned as bytes if decode is False
+        """
+        start = time.monotonic()
+        buffer = ReadBuffer(
+            window=self._prompt_window, empty=b"" if self._bytes_mode else ""
+        )
+        stats = self._stats
+        with self._deadline_scope() as deadline:
+            while True:
+                match = await self._read_chunk(buffer, patterns, deadline)
+                if match:
+                    break
+        self._last_prompt = self._find_prompt_line(buffer.tail, match)
+        output = buffer.getvalue()
+        if stats is not None:
+            stats.add_read(len(output), buffer.chunks)
+        log_event(
+            self._host,
+            "read",
+            bytes=len(output),
+            chunks=buffer.chunks,
+            duration=time.monotonic() - start,
+            payload=output,
+        )
+        if decode:
+            output = self._decode(output)
+        return output
+
+    async def _read_chunk(self, buffer, patterns, deadline):
+        """Read one chunk from the channel into the buffer and search compiled patterns in the new data"""
+        buffer.feed(await self._stdout.read(self._MAX_BUFFER))
+        deadline.touch()
+        stats = self._stats
+        if stats is None:
+            return buffer.search(*patterns)
+        return self._timed_search(stats, buffer, patterns)
+
+    @staticmethod
+    def _timed_search(stats, buffer, patterns):
+        """Search the patterns in the buffer adding the time of searching to the stats"""
+        scan_start = time.monotonic()
+        if stats.first_byte is None:
+            stats.first_byte = scan_start - stats.start
+        match = buffer.search(*patterns)
+        stats.scan_time += time.monotonic() - scan_start
+        return match
+
+    @contextlib.contextmanager
+    def _operation(self, operation, command=None):
+        """
+        Context manager collecting the stats of the operation and reporting them to the hooks
+
+        Reads and post-processing add their counters to the stats of the session while the operation
+        runs. Nested operations (send_command inside send_config_set of the platform for example)
+        are parts of the outer one
+
+        :param str operation: name of the operation
+        :param command: the command or the list of commands
+        """
+        if self._hooks is None or self._stats is not None:
+            yield
+            return
+        stats = self._stats = OperationStats(operation, command)
+        try:
+            yield
+        except Exception as e:
+            self._hooks.on_error(self, operation, e)
+            raise
+        finally:
+            self._stats = None
+        self._report_operation(stats)
+
+    def _report_operation(self, stats):
+        """Finish the stats of the successful operation and give them to the hooks"""
+        if stats is not None:
+            stats.duration = time.monotonic() - stats.start
+            self._hooks.on_operation(self, stats)
+
+    def _find_prompt_line(self, data, match):
+        """
+        Return the line of data with the found match if the read has ended on the device prompt
+
+        The match must be found by the base pattern and only whitespaces can follow it,
+        otherwise the state of the device is unknown and None is returned
+        """
+        if not self._base_pattern or data[match.end() :].strip():
+            return None
+        if match.re.pattern != self._compile_channel_pattern(self._base_pattern).pattern:
+            return None
+        newline = b"\n" if isinstance(data, bytes) else "\n"
+        line_start = data.rfind(newline, 0, match.start()) + 1
+        return self._decode(data[line_start:])
+
+    async def _current_prompt(self):
+        """
+        Return the current prompt of the device for checking its mode
+
+        The prompt which has ended the last read is used if nothing was written to the channel after it.
+        The device is probed by sending a new line only when the prompt is unknown
+        """
+        if self._last_prompt is not None:
+            return self._last_prompt
+        self._write_channel(self._normalize_cmd("\n"))
+        return await self._read_until_prompt()
+
+    def _write_channel(self, data):
+        """Write string to the channel. In bytes mode it's encoded before writing"""
+        if self._stdin is None and self._exec_mode:
+            raise ValueError(
+                "Host {}: Shell isn't opened in exec mode, only send_command and "
+                "send_commands are supported".format(self._host)
+            )
+        if self._bytes_mode:
+            data = data.encode(self._encoding)
+        self._last_prompt = None
+        self._stdin.write(data)
+
+    def _decode(self, data):
+        """Decode data from the channel in bytes mode. Strings are returned as is"""
+        if isinstance(data, bytes):
+            return data.decode(self._encoding, errors="replace")
+        return data
+
+    @contextlib.contextmanager
+    def _deadline_scope(self, timeout=None, total_timeout=None):
+        """
+        Context manager with the deadline of the current operation
+
+        The operation has one timer for idle and total timeouts instead of timer for every read.
+        Nested scopes (reads inside send_command for example) use the deadline of the outer scope.
+
+        :param float timeout: idle timeout in seconds. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for the whole operation. Default is None (no limit)
+        """
+        if self._deadline is not None:
+            yield self._deadline
+            return
+        deadline = Deadline(self._loop, timeout or self._timeout, total_timeout)
+        self._deadline = deadline
+        try:
+            with deadline:
+                yield deadline
+        except asyncio.TimeoutError:
+            raise TimeoutError(self._host)
+        finally:
+            self._deadline = None
+
+    def _compile_pattern(self, pattern, re_flags=0):
+        """
+        Return compiled pattern from the session cache
+
+        Base pattern is unique for every session, so with a lot of sessions the module level cache of re
+        is thrashed. Every session keeps its own compiled base pattern and user patterns instead
+        """
+        key = (pattern, re_flags)
+        regex = self._pattern_cache.get(key)
+        if regex is None:
+            if len(self._pattern_cache) >= self._pattern_cache_size:
+                self._pattern_cache.clear()
+            regex = self._pattern_cache[key] = re.compile(pattern, flags=re_flags)
+        return regex
+
+    def _compile_channel_pattern(self, pattern, re_flags=0):
+        """Return compiled pattern for searching in the channel data. In bytes mode it's a bytes pattern"""
+        if self._bytes_mode:
+            pattern = pattern.encode(self._encoding)
+        return self._compile_pattern(pattern, re_flags)
 
     @staticmethod
     def _strip_backspaces(output):
@@ -422,18 +1371,20 @@ class BaseDevice(object):
         # Check for line wrap (remove backspaces)
         if backspace_char in output:
             output = output.replace(backspace_char, "")
-            output_lines = output.split("\n")
-            new_output = output_lines[1:]
-            return "\n".join(new_output)
+            first_line_end = output.find("\n")
+            if first_line_end < 0:
+                return ""
+            return output[first_line_end + 1 :]
         else:
             command_length = len(command_string)
             return output[command_length:]
 
-    @staticmethod
-    def _normalize_linefeeds(a_string):
-        """Convert '\r\r\n','\r\n', '\n\r' to '\n"""
-        newline = re.compile(r"(\r\r\n|\r\n|\n\r)")
-        return newline.sub("\n", a_string)
+    @classmethod
+    def _normalize_linefeeds(cls, a_string):
+        """Convert '\r\r\n','\r\n', '\n\r' to '\n (by default, see _linefeed_replacements)"""
+        for old, new in cls._linefeed_replacements:
+            a_string = a_string.replace(old, new)
+        return a_string
 
     @staticmethod
     def _normalize_cmd(command):
@@ -442,16 +1393,37 @@ class BaseDevice(object):
         command += "\n"
         return command
 
-    async def send_config_set(self, config_commands=None):
+    @_on_channel
+    async def send_config_set(
+        self,
+        config_commands=None,
+        timeout=None,
+        total_timeout=None,
+        window=1,
+        stop_on_error=False,
+    ):
         """
         Sending configuration commands to device
 
-        The commands will be executed one after the other.
+        The commands will be executed one after the other. With window > 1 the commands are pipelined:
+        up to window commands are written ahead without waiting for the prompt, and the output is split
+        by prompt occurrences. Pipelining is only for non interactive commands. Use
+        window=len(config_commands) for writing all commands at once if the platform buffers input safely
+
+        The output of every command is checked for the error signatures of the platform as soon as it's
+        received. Found errors are available in :attr:`config_errors`. With stop_on_error the rest of
+        commands isn't sent after the first error (the commands already written are waited for) and
+        :class:`ConfigError <netdev.exceptions.ConfigError>` is raised. The device stays in the current mode
 
         :param list config_commands: iterable string list with commands for applying to network device
+        :param float timeout: idle timeout in seconds for receiving data. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for all commands. Default is None (no limit)
+        :param int window: maximum count of commands written to device without waiting for the prompt
+        :param bool stop_on_error: if true it stops sending commands after the first rejected one
         :return: The output of this commands
         """
-        logger.info("Host {}: Sending configuration settings".format(self._host))
+        logger.info("Host %s: Sending configuration settings", self._host)
+        self._check_window(window)
         if config_commands is None:
             return ""
         if not hasattr(config_commands, "__iter__"):
@@ -462,45 +1434,170 @@ class BaseDevice(object):
             )
 
         # Send config commands
-        logger.debug("Host {}: Config commands: {}".format(self._host, config_commands))
-        output = ""
-        for cmd in config_commands:
-            self._stdin.write(self._normalize_cmd(cmd))
-            output += await self._read_until_prompt()
+        logger.debug("Host %s: Config commands: %s", self._host, config_commands)
+        start = time.monotonic()
+        with self._operation("send_config_set", config_commands):
+            with self._deadline_scope(timeout, total_timeout):
+                outputs = await self._send_pipelined(
+                    config_commands, window, stop_on_error, check_errors=True
+                )
 
-        if self._ansi_escape_codes:
-            output = self._strip_ansi_escape_codes(output)
+            output = self._normalize_output("".join(outputs))
+            log_event(
+                self._host,
+                "config_commands",
+                bytes=len(output),
+                duration=time.monotonic() - start,
+                payload=output,
+            )
+            if stop_on_error and self._config_errors:
+                command, error = self._config_errors[0]
+                raise ConfigError(self._host, command, error)
+        return output
 
-        output = self._normalize_linefeeds(output)
-        logger.debug(
-            "Host {}: Config commands output: {}".format(self._host, repr(output))
+    def _check_window(self, window):
+        """Raise ValueError if the window of pipelined commands doesn't allow writing any command"""
+        if window is not None and window < 1:
+            raise ValueError(
+                "Host {}: Window must be at least 1, got {!r}".format(self._host, window)
+            )
+
+    async def _send_pipelined(
+        self, commands, window=1, stop_on_error=False, check_errors=False
+    ):
+        """
+        Send commands keeping up to window of them in flight and return the list of their outputs
+
+        Every command ends with one device prompt, so the output of the command is the data after
+        the previous prompt up to its own prompt. Only new data is searched for prompts after each read.
+        Outputs are split and checked for configuration errors (if check_errors) after each read,
+        so the sending can stop early
+        """
+        commands = [self._normalize_cmd(cmd) for cmd in commands]
+        regex = self._compile_channel_pattern(self._base_pattern)
+        empty = b"" if self._bytes_mode else ""
+        buffer = ReadBuffer(window=self._prompt_window, empty=empty)
+        self._config_errors = []
+        outputs = []
+        # Received data which isn't split into outputs yet and its absolute offset
+        pending = []
+        pending_start = 0
+        total = len(commands)
+        sent = 0
+        match = None
+        stats = self._stats
+        with self._deadline_scope() as deadline:
+            while len(outputs) < total:
+                while sent < total and sent - len(outputs) < window:
+                    self._write_channel(commands[sent])
+                    sent += 1
+                chunk = await self._stdout.read(self._MAX_BUFFER)
+                buffer.feed(chunk)
+                pending.append(chunk)
+                deadline.touch()
+                if stats is not None:
+                    scan_start = time.monotonic()
+                    if stats.first_byte is None:
+                        stats.first_byte = scan_start - stats.start
+                # Absolute offsets of the ends of outputs completed by this read
+                ends = []
+                match = buffer.search(regex)
+                while match:
+                    end = self._find_prompt_end(buffer.tail, match)
+                    ends.append(buffer.tail_start + end)
+                    if len(outputs) + len(ends) == sent:
+                        # Nothing else is expected, the match is kept for finding the prompt
+                        break
+                    buffer.consume(match)
+                    match = buffer.search(regex)
+                if stats is not None:
+                    stats.scan_time += time.monotonic() - scan_start
+                if not ends:
+                    continue
+
+                data = empty.join(pending)
+                data_start = pending_start
+                for end in ends:
+                    output = self._decode(
+                        data[pending_start - data_start : end - data_start]
+                    )
+                    pending_start = end
+                    outputs.append(output)
+                    if check_errors:
+                        self._check_config_output(commands[len(outputs) - 1], output)
+                pending = [data[pending_start - data_start :]]
+                if stop_on_error and self._config_errors:
+                    total = sent
+                if len(outputs) < total and match:
+                    buffer.consume(match)
+
+        if match is not None:
+            self._last_prompt = self._find_prompt_line(buffer.tail, match)
+            # The last output gets all remaining data like a single read
+            outputs[-1] += self._decode(pending[0])
+        if stats is not None:
+            stats.add_read(len(buffer), buffer.chunks)
+        # The whole output is joined only for the payload logger
+        payload = None
+        if payload_logger.isEnabledFor(logging.DEBUG):
+            payload = buffer.getvalue()
+        log_event(
+            self._host,
+            "read",
+            bytes=len(buffer),
+            chunks=buffer.chunks,
+            commands=len(commands),
+            payload=payload,
         )
-        return output
+        return outputs
+
+    def _check_config_output(self, command, output):
+        """Find the error signatures of the platform in the output of the configuration command"""
+        regex = type(self)._compiled_config_errors()
+        if regex is None:
+            return
+        match = regex.search(output)
+        if match:
+            error = match.group().strip()
+            logger.warning(
+                "Host %s: Command %r is rejected: %s",
+                self._host,
+                command.rstrip("\n"),
+                error,
+            )
+            self._config_errors.append((command.rstrip("\n"), error))
+
+    @classmethod
+    def _compiled_config_errors(cls):
+        """
+        Return one compiled pattern for all error signatures of the class or None
+
+        The pattern matches the whole line with the error. It's compiled once for every class
+        """
+        if "_config_error_regex" not in cls.__dict__:
+            regex = None
+            if cls._config_error_signatures:
+                signatures = r"|".join(cls._config_error_signatures)
+                regex = re.compile(r"^.*(?:{}).*$".format(signatures), flags=re.M)
+            cls._config_error_regex = regex
+        return cls._config_error_regex
 
     @staticmethod
     def _strip_ansi_escape_codes(string_buffer):
         """
-        Remove some ANSI ESC codes from the output
+        Remove ANSI ESC codes from the output
 
         http://en.wikipedia.org/wiki/ANSI_escape_code
 
-        Note: this does not capture ALL possible ANSI Escape Codes only the ones
-        I have encountered
-
-        Current codes that are filtered:
+        All codes are removed by one precompiled regular expression:
         ESC = '\x1b' or chr(27)
-        ESC = is the escape character [^ in hex ('\x1b')
-        ESC[24;27H   Position cursor
-        ESC[?25h     Show the cursor
-        ESC[E        Next line (HP does ESC-E)
-        ESC[K        Erase line. Clear from cursor to end of screen
-        ESC[2K       Erase line
-        ESC[1;24r    Enable scrolling from start to row end
-        ESC7         Save cursor position
-        ESC[r        Scroll all screen
-        ESC8         Restore cursor position
-        ESC[nA       Move cursor up to n cells
-        ESC[nB       Move cursor down to n cells
+        ESC[ params intermediates final   Control Sequences (CSI): ESC[24;27H, ESC[?25h, ESC[K, ESC[2K,
+                                          ESC[1;24r, ESC[r, ESC[nA, ESC[nB, ESC[0m etc
+        ESC] text BEL or ESC\\              Operating System Commands (OSC)
+        ESC intermediates final           Other escape sequences: ESC7 (save cursor), ESC8 (restore cursor),
+                                          ESC(B etc
+
+        ESC E (Next line, HP does ESC-E) is substituted with '\n'
 
         require:
             HP ProCurve
@@ -508,53 +1605,26 @@ class BaseDevice(object):
             Mikrotik
         """
         logger.info("Stripping ansi escape codes")
-        logger.debug("Unstripped output: {}".format(repr(string_buffer)))
-
-        code_save_cursor = chr(27) + r"7"
-        code_scroll_screen = chr(27) + r"\[r"
-        code_restore_cursor = chr(27) + r"8"
-        code_cursor_up = chr(27) + r"\[\d+A"
-        code_cursor_down = chr(27) + r"\[\d+B"
-
-        code_position_cursor = chr(27) + r"\[\d+;\d+H"
-        code_show_cursor = chr(27) + r"\[\?25h"
-        code_next_line = chr(27) + r"E"
-        code_erase_line_from_cursor = chr(27) + r"\[K"
-        code_erase_line = chr(27) + r"\[2K"
-        code_enable_scroll = chr(27) + r"\[\d+;\d+r"
-
-        code_set = [
-            code_save_cursor,
-            code_scroll_screen,
-            code_restore_cursor,
-            code_cursor_up,
-            code_cursor_down,
-            code_position_cursor,
-            code_show_cursor,
-            code_erase_line,
-            code_erase_line_from_cursor,
-            code_enable_scroll,
-        ]
-
-        output = string_buffer
-        for ansi_esc_code in code_set:
-            output = re.sub(ansi_esc_code, "", output)
+        if _ANSI_ESCAPE_CHAR not in string_buffer:
+            return string_buffer
 
         # CODE_NEXT_LINE must substitute with '\n'
-        output = re.sub(code_next_line, "\n", output)
-
-        logger.debug("Stripped output: {}".format(repr(output)))
-
-        return output
+        output = string_buffer.replace(_ANSI_NEXT_LINE, "\n")
+        return _ANSI_ESCAPE_PATTERN.sub("", output)
 
     async def _cleanup(self):
         """ Any needed cleanup before closing connection """
-        logger.info("Host {}: Cleanup session".format(self._host))
+        logger.info("Host %s: Cleanup session", self._host)
         pass
 
     async def disconnect(self):
         """ Gracefully close the SSH connection """
-        logger.info("Host {}: Disconnecting".format(self._host))
-        await self._cleanup()
-        self._conn.close()
-        await self._conn.wait_closed()
+        logger.info("Host %s: Disconnecting", self._host)
+        try:
+            if not self._exec_mode:
+                await self._cleanup()
+            self._conn.close()
+            await self._conn.wait_closed()
+        finally:
+            if self._hooks is not None:
+                self._hooks.on_disconnect(self)
@@ -31,6 +31,8 @@ class CiscoASA(IOSLikeDevice):
 
     _disable_paging_command = "terminal pager 0"
 
+    _config_error_signatures = IOSLikeDevice._config_error_signatures + (r"^ERROR: ",)
+
     @property
     def multiple_mode(self):
         """ Returning Bool True if ASA in multiple mode"""
@@ -48,13 +50,14 @@ class CiscoASA(IOSLikeDevice):
         * _disable_paging() for non interact output in commands
         *  _check_multiple_mode() for checking multiple mode in ASA
         """
-        logger.info("Host {}: trying to connect to the device".format(self._host))
-        await self._establish_connection()
-        await self._set_base_prompt()
-        await self.enable_mode()
-        await self._disable_paging()
-        await self._check_multiple_mode()
-        logger.info("Host {}: Has connected to the device".format(self._host))
+        logger.info("Host %s: trying to connect to the device", self._host)
+        with self._connecting():
+            await self._phase("establish_connection", self._establish_connection())
+            await self._phase("set_base_prompt", self._set_base_prompt())
+            await self._phase("enable_mode", self.enable_mode())
+            await self._phase("disable_paging", self._disable_paging())
+            await self._phase("check_multiple_mode", self._check_multiple_mode())
+        logger.info("Host %s: Has connected to the device", self._host)
 
     async def _set_base_prompt(self):
         """
@@ -64,7 +67,7 @@ class CiscoASA(IOSLikeDevice):
 
         For ASA devices base_pattern is "prompt([\/\w]+)?(\(.*?\))?[#|>]
         """
-        logger.info("Host {}: Setting base prompt".format(self._host))
+        logger.info("Host %s: Setting base prompt", self._host)
         prompt = await self._find_prompt()
         # Cut off prompt from "prompt/context/other" if it exists
         # If not we get all prompt
@@ -76,17 +79,19 @@ class CiscoASA(IOSLikeDevice):
         base_prompt = re.escape(self._base_prompt[:12])
         pattern = type(self)._pattern
         self._base_pattern = pattern.format(prompt=base_prompt, delimiters=delimiters)
-        logger.debug("Host {}: Base Prompt: {}".format(self._host, self._base_prompt))
-        logger.debug("Host {}: Base Pattern: {}".format(self._host, self._base_pattern))
+        logger.debug("Host %s: Base Prompt: %s", self._host, self._base_prompt)
+        logger.debug("Host %s: Base Pattern: %s", self._host, self._base_pattern)
         return self._base_prompt
 
     async def _check_multiple_mode(self):
         """Check mode multiple. If mode is multiple we adding info about contexts"""
-        logger.info("Host {}:Checking multiple mode".format(self._host))
-        out = await self.send_command("show mode")
-        if "multiple" in out:
-            self._multiple_mode = True
-
-        logger.debug(
-            "Host {}: Multiple mode: {}".format(self._host, self._multiple_mode)
-        )
+        logger.info("Host %s:Checking multiple mode", self._host)
+        if self._profile_valid and "multiple_mode" in self._profile:
+            self._multiple_mode = self._profile["multiple_mode"]
+        else:
+            out = await self.send_command("show mode")
+            if "multiple" in out:
+                self._multiple_mode = True
+            self._update_profile(multiple_mode=self._multiple_mode)
+
+        logger.debug("Host %s: Multiple mode: %s", self._host, self._multiple_mode)
@@ -1,5 +1,6 @@
 from netdev.exceptions import CommitError
-from netdev.logger import logger
+from netdev.logger import log_event, logger
+from netdev.vendors.base import _on_channel
 from netdev.vendors.ios_like import IOSLikeDevice
 
 
@@ -21,12 +22,17 @@ class CiscoIOSXR(IOSLikeDevice):
     _show_commit_changes = "show configuration commit changes"
     """Command for showing the other commit which have occurred during our session"""
 
+    @_on_channel
     async def send_config_set(
         self,
         config_commands=None,
         with_commit=True,
         commit_comment="",
         exit_config_mode=True,
+        timeout=None,
+        total_timeout=None,
+        window=1,
+        stop_on_error=False,
     ):
         """
         Sending configuration commands to device
@@ -36,61 +42,71 @@ class CiscoIOSXR(IOSLikeDevice):
         :param bool with_commit: if true it commit all changes after applying all config_commands
         :param string commit_comment: message for configuration commit
         :param bool exit_config_mode: If true it will quit from configuration mode automatically
+        :param float timeout: idle timeout in seconds for receiving data. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for all commands. Default is None (no limit)
+        :param int window: maximum count of commands written to device without waiting for the prompt
+        :param bool stop_on_error: if true it raises ConfigError and stops sending commands after the first
+                rejected one. Nothing is committed and the device stays in configuration mode
         :return: The output of these commands
         """
 
+        self._check_window(window)
         if config_commands is None:
             return ""
 
         # Send config commands
-        output = await self.config_mode()
-        output += await super(IOSLikeDevice, self).send_config_set(
-            config_commands=config_commands
-        )
-        if with_commit:
-            commit = type(self)._commit_command
-            if commit_comment:
-                commit = type(self)._commit_comment_command.format(commit_comment)
-
-            self._stdin.write(self._normalize_cmd(commit))
-            output += await self._read_until_prompt_or_pattern(
-                r"Do you wish to proceed with this commit anyway\?"
-            )
-            if "Failed to commit" in output:
-                show_config_failed = type(self)._show_config_failed
-                reason = await self.send_command(
-                    self._normalize_cmd(show_config_failed)
-                )
-                raise CommitError(self._host, reason)
-            if "One or more commits have occurred" in output:
-                show_commit_changes = type(self)._show_commit_changes
-                self._stdin.write(self._normalize_cmd("no"))
-                reason = await self.send_command(
-                    self._normalize_cmd(show_commit_changes)
+        with self._operation("send_config_set", config_commands):
+            with self._deadline_scope(timeout, total_timeout):
+                output = await self.config_mode()
+                output += await super(IOSLikeDevice, self).send_config_set(
+                    config_commands=config_commands,
+                    window=window,
+                    stop_on_error=stop_on_error,
                 )
-                raise CommitError(self._host, reason)
-
-        if exit_config_mode:
-            output += await self.exit_config_mode()
+                if with_commit:
+                    commit = type(self)._commit_command
+                    if commit_comment:
+                        commit = type(self)._commit_comment_command.format(
+                            commit_comment
+                        )
+
+                    self._write_channel(self._normalize_cmd(commit))
+                    output += await self._read_until_prompt_or_pattern(
+                        r"Do you wish to proceed with this commit anyway\?"
+                    )
+                    if "Failed to commit" in output:
+                        show_config_failed = type(self)._show_config_failed
+                        reason = await self.send_command(
+                            self._normalize_cmd(show_config_failed)
+                        )
+                        raise CommitError(self._host, reason)
+                    if "One or more commits have occurred" in output:
+                        show_commit_changes = type(self)._show_commit_changes
+                        self._write_channel(self._normalize_cmd("no"))
+                        reason = await self.send_command(
+                            self._normalize_cmd(show_commit_changes)
+                        )
+                        raise CommitError(self._host, reason)
+
+                if exit_config_mode:
+                    output += await self.exit_config_mode()
 
         output = self._normalize_linefeeds(output)
-        logger.debug(
-            "Host {}: Config commands output: {}".format(self._host, repr(output))
-        )
+        log_event(self._host, "send_config_set", bytes=len(output), payload=output)
         return output
 
     async def exit_config_mode(self):
         """Exit from configuration mode"""
-        logger.info("Host {}: Exiting from configuration mode".format(self._host))
+        logger.info("Host %s: Exiting from configuration mode", self._host)
         output = ""
         exit_config = type(self)._config_exit
         if await self.check_config_mode():
-            self._stdin.write(self._normalize_cmd(exit_config))
+            self._write_channel(self._normalize_cmd(exit_config))
             output = await self._read_until_prompt_or_pattern(
                 r"Uncommitted changes found"
             )
             if "Uncommitted changes found" in output:
-                self._stdin.write(self._normalize_cmd("no"))
+                self._write_channel(self._normalize_cmd("no"))
                 output += await self._read_until_prompt()
             if await self.check_config_mode():
                 raise ValueError("Failed to exit from configuration mode")
@@ -100,5 +116,5 @@ class CiscoIOSXR(IOSLikeDevice):
         """ Any needed cleanup before closing connection """
         abort = type(self)._abort_command
         abort = self._normalize_cmd(abort)
-        self._stdin.write(abort)
-        logger.info("Host {}: Cleanup session".format(self._host))
+        self._write_channel(abort)
+        logger.info("Host %s: Cleanup session", self._host)
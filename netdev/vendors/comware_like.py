@@ -6,8 +6,8 @@ Connection Method are based upon AsyncSSH and should be running in asyncio loop
 
 import re
 
-from netdev.logger import logger
-from netdev.vendors.base import BaseDevice
+from netdev.logger import log_event, logger
+from netdev.vendors.base import BaseDevice, _on_channel
 
 
 class ComwareLikeDevice(BaseDevice):
@@ -41,6 +41,16 @@ class ComwareLikeDevice(BaseDevice):
     _system_view_check = "]"
     """Checking string in prompt. If it's exist im prompt - we are in system view"""
 
+    _config_error_signatures = (
+        r"% ?Unrecognized command",
+        r"% ?Incomplete command",
+        r"% ?Ambiguous command",
+        r"% ?Wrong parameter",
+        r"% ?Too many parameters",
+        r"^\s*Error: ?",
+    )
+    """Patterns of the messages about rejected configuration commands"""
+
     async def _set_base_prompt(self):
         """
         Setting two important vars
@@ -49,7 +59,7 @@ class ComwareLikeDevice(BaseDevice):
 
         For Comware devices base_pattern is "[\]|>]prompt(\-\w+)?[\]|>]
         """
-        logger.info("Host {}: Setting base prompt".format(self._host))
+        logger.info("Host %s: Setting base prompt", self._host)
         prompt = await self._find_prompt()
         # Strip off trailing terminator
         self._base_prompt = prompt[1:-1]
@@ -64,25 +74,24 @@ class ComwareLikeDevice(BaseDevice):
             prompt=base_prompt,
             delimiter_right=delimiter_right,
         )
-        logger.debug("Host {}: Base Prompt: {}".format(self._host, self._base_prompt))
-        logger.debug("Host {}: Base Pattern: {}".format(self._host, self._base_pattern))
+        logger.debug("Host %s: Base Prompt: %s", self._host, self._base_prompt)
+        logger.debug("Host %s: Base Pattern: %s", self._host, self._base_pattern)
         return self._base_prompt
 
     async def _check_system_view(self):
         """Check if we are in system view. Return boolean"""
-        logger.info("Host {}: Checking system view".format(self._host))
+        logger.info("Host %s: Checking system view", self._host)
         check_string = type(self)._system_view_check
-        self._stdin.write(self._normalize_cmd("\n"))
-        output = await self._read_until_prompt()
+        output = await self._current_prompt()
         return check_string in output
 
     async def _system_view(self):
         """Enter to system view"""
-        logger.info("Host {}: Entering to system view".format(self._host))
+        logger.info("Host %s: Entering to system view", self._host)
         output = ""
         system_view_enter = type(self)._system_view_enter
         if not await self._check_system_view():
-            self._stdin.write(self._normalize_cmd(system_view_enter))
+            self._write_channel(self._normalize_cmd(system_view_enter))
             output += await self._read_until_prompt()
             if not await self._check_system_view():
                 raise ValueError("Failed to enter to system view")
@@ -90,38 +99,57 @@ class ComwareLikeDevice(BaseDevice):
 
     async def _exit_system_view(self):
         """Exit from system view"""
-        logger.info("Host {}: Exiting from system view".format(self._host))
+        logger.info("Host %s: Exiting from system view", self._host)
         output = ""
         system_view_exit = type(self)._system_view_exit
         if await self._check_system_view():
-            self._stdin.write(self._normalize_cmd(system_view_exit))
+            self._write_channel(self._normalize_cmd(system_view_exit))
             output += await self._read_until_prompt()
             if await self._check_system_view():
                 raise ValueError("Failed to exit from system view")
         return output
 
-    async def send_config_set(self, config_commands=None, exit_system_view=False):
+    @_on_channel
+    async def send_config_set(
+        self,
+        config_commands=None,
+        exit_system_view=False,
+        timeout=None,
+        total_timeout=None,
+        window=1,
+        stop_on_error=False,
+    ):
         """
         Sending configuration commands to device
         Automatically exits/enters system-view.
 
         :param list config_commands: iterable string list with commands for applying to network devices in system view
         :param bool exit_system_view: If true it will quit from system view automatically
+        :param float timeout: idle timeout in seconds for receiving data. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for all commands. Default is None (no limit)
+        :param int window: maximum count of commands written to device without waiting for the prompt
+        :param bool stop_on_error: if true it raises ConfigError and stops sending commands after the first
+                rejected one. The device stays in configuration mode
         :return: The output of this commands
         """
 
+        self._check_window(window)
         if config_commands is None:
             return ""
 
         # Send config commands
-        output = await self._system_view()
-        output += await super().send_config_set(config_commands=config_commands)
-
-        if exit_system_view:
-            output += await self._exit_system_view()
+        with self._operation("send_config_set", config_commands):
+            with self._deadline_scope(timeout, total_timeout):
+                output = await self._system_view()
+                output += await super().send_config_set(
+                    config_commands=config_commands,
+                    window=window,
+                    stop_on_error=stop_on_error,
+                )
+
+                if exit_system_view:
+                    output += await self._exit_system_view()
 
         output = self._normalize_linefeeds(output)
-        logger.debug(
-            "Host {}: Config commands output: {}".format(self._host, repr(output))
-        )
+        log_event(self._host, "send_config_set", bytes=len(output), payload=output)
         return output
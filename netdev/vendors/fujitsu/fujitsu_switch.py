@@ -18,6 +18,14 @@ class FujitsuSwitch(IOSLikeDevice):
     _config_enter = "conf"
     """Command for entering to configuration mode"""
 
+    _linefeed_replacements = (
+        ("\r\r\n", "\n"),
+        ("\r\n", "\n"),
+        ("\n\r", "\n"),
+        ("\n\n", "\n"),
+    )
+    """Convert '\r\r\n','\r\n', '\n\r' to '\n and remove extra '\n\n' in the text"""
+
     async def _set_base_prompt(self):
         """
         Setting two important vars
@@ -26,7 +34,7 @@ class FujitsuSwitch(IOSLikeDevice):
 
         For Fujitsu devices base_pattern is "(prompt) (\(.*?\))?[>|#]"
         """
-        logger.info("Host {}: Setting base prompt".format(self._host))
+        logger.info("Host %s: Setting base prompt", self._host)
         prompt = await self._find_prompt()
         # Strip off trailing terminator
         self._base_prompt = prompt[1:-3]
@@ -35,14 +43,6 @@ class FujitsuSwitch(IOSLikeDevice):
         base_prompt = re.escape(self._base_prompt[:12])
         pattern = type(self)._pattern
         self._base_pattern = pattern.format(prompt=base_prompt, delimiters=delimiters)
-        logger.debug("Host {}: Base Prompt: {}".format(self._host, self._base_prompt))
-        logger.debug("Host {}: Base Pattern: {}".format(self._host, self._base_pattern))
+        logger.debug("Host %s: Base Prompt: %s", self._host, self._base_prompt)
+        logger.debug("Host %s: Base Pattern: %s", self._host, self._base_pattern)
         return self._base_prompt
-
-    @staticmethod
-    def _normalize_linefeeds(a_string):
-        """
-        Convert '\r\r\n','\r\n', '\n\r' to '\n and remove extra '\n\n' in the text
-        """
-        newline = re.compile(r"(\r\r\n|\r\n|\n\r)")
-        return newline.sub("\n", a_string).replace("\n\n", "\n")
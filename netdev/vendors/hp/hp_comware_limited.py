@@ -1,4 +1,4 @@
-from netdev.logger import logger
+from netdev.logger import log_event, logger
 from netdev.vendors.comware_like import ComwareLikeDevice
 
 
@@ -43,16 +43,17 @@ class HPComwareLimited(ComwareLikeDevice):
         * _cmdline_mode_enter() for entering hidden full functional mode
         * _disable_paging() for non interact output in commands
         """
-        logger.info("Host {}: Trying to connect to the device".format(self._host))
-        await self._establish_connection()
-        await self._set_base_prompt()
-        await self._cmdline_mode_enter()
-        await self._disable_paging()
-        logger.info("Host {}: Has connected to the device".format(self._host))
+        logger.info("Host %s: Trying to connect to the device", self._host)
+        with self._connecting():
+            await self._phase("establish_connection", self._establish_connection())
+            await self._phase("set_base_prompt", self._set_base_prompt())
+            await self._phase("cmdline_mode_enter", self._cmdline_mode_enter())
+            await self._phase("disable_paging", self._disable_paging())
+        logger.info("Host %s: Has connected to the device", self._host)
 
     async def _cmdline_mode_enter(self):
         """Entering to cmdline-mode"""
-        logger.info("Host {}: Entering to cmdline mode".format(self._host))
+        logger.info("Host %s: Entering to cmdline mode", self._host)
         output = ""
         cmdline_mode_enter = type(self)._cmdline_mode_enter_command
         check_error_string = type(self)._cmdline_mode_check
@@ -61,10 +62,8 @@ class HPComwareLimited(ComwareLikeDevice):
         output += await self.send_command("Y", pattern="password\:")
         output += await self.send_command(self._cmdline_password)
 
-        logger.debug(
-            "Host {}: cmdline mode output: {}".format(self._host, repr(output))
-        )
-        logger.info("Host {}: Checking cmdline mode".format(self._host))
+        log_event(self._host, "cmdline_mode", bytes=len(output), payload=output)
+        logger.info("Host %s: Checking cmdline mode", self._host)
         if check_error_string in output:
             raise ValueError("Failed to enter to cmdline mode")
 
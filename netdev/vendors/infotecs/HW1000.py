@@ -2,7 +2,7 @@
 HW1000 is a class for working with Vipnet HW1000 crypto gateways
 """
 import re
-from netdev.logger import logger
+from netdev.logger import log_event, logger
 from netdev.vendors.base import BaseDevice
 
 class HW1000(BaseDevice):
@@ -72,36 +72,36 @@ class HW1000(BaseDevice):
         * _set_base_prompt() for finding and setting device prompt
         * _enable() for getting privilege exec mode
         """
-        logger.info("Host {}: Trying to connect to the device".format(self._host))
-        await self._establish_connection()
-        await self._set_base_prompt()
-        await self.enable_mode()
-        logger.info("Host {}: Has connected to the device".format(self._host))
+        logger.info("Host %s: Trying to connect to the device", self._host)
+        with self._connecting():
+            await self._phase("establish_connection", self._establish_connection())
+            await self._phase("set_base_prompt", self._set_base_prompt())
+            await self._phase("enable_mode", self.enable_mode())
+        logger.info("Host %s: Has connected to the device", self._host)
 
     async def check_enable_mode(self):
         """Check if we are in privilege exec. Return boolean"""
-        logger.info('Host {}: Checking privilege exec'.format(self._host))
+        logger.info("Host %s: Checking privilege exec", self._host)
         check_string = type(self)._priv_check
-        self._stdin.write(self._normalize_cmd('\n'))
-        output = await self._read_until_prompt()
+        output = await self._current_prompt()
         return check_string in output
 
     async def enable_mode(self, pattern='password', re_flags=re.IGNORECASE):
         """Enter to privilege exec"""
-        logger.info('Host {}: Entering to privilege exec'.format(self._host))
+        logger.info("Host %s: Entering to privilege exec", self._host)
         output = ""
         enable_command = type(self)._priv_enter
         if not await self.check_enable_mode():
-            self._stdin.write(self._normalize_cmd(enable_command))
+            self._write_channel(self._normalize_cmd(enable_command))
             output += await self._read_until_prompt_or_pattern(
                 pattern=pattern, re_flags=re_flags)
-            if re.search(pattern, output, re_flags):
-                self._stdin.write(self._normalize_cmd(self._secret))
+            if self._compile_pattern(pattern, re_flags).search(output):
+                self._write_channel(self._normalize_cmd(self._secret))
                 output += await self._read_until_prompt_or_pattern(
                     pattern=type(self)._priv_confirm_message,re_flags=re_flags)
-                if re.search(type(self)._priv_confirm_message,output,re_flags):
+                if self._compile_pattern(type(self)._priv_confirm_message, re_flags).search(output):
                     if self._preempt_privilege:
-                        self._stdin.write(self._normalize_cmd("Yes"))
+                        self._write_channel(self._normalize_cmd("Yes"))
                     else:
                         raise ValueError("Failed to enter privilege exec:"
                         "there is already a active administration session."
@@ -112,11 +112,11 @@ class HW1000(BaseDevice):
 
     async def exit_enable_mode(self):
         """Exit from privilege exec"""
-        logger.info('Host {}: Exiting from privilege exec'.format(self._host))
+        logger.info("Host %s: Exiting from privilege exec", self._host)
         output = ""
         exit_enable = type(self)._priv_exit
         if await self.check_enable_mode():
-            self._stdin.write(self._normalize_cmd(exit_enable))
+            self._write_channel(self._normalize_cmd(exit_enable))
             output += await self._read_until_prompt()
             if await self.check_enable_mode():
                 raise ValueError("Failed to exit from privilege exec")
@@ -124,25 +124,27 @@ class HW1000(BaseDevice):
 
     async def check_shell_mode(self):
         """Checks if device in shell mode or not"""
-        logger.info('Host {}: Checking shell mode'.format(self._host))
+        logger.info("Host %s: Checking shell mode", self._host)
         check_string = type(self)._shell_check
-        self._stdin.write(self._normalize_cmd('\n'))
+        if self._last_prompt is not None:
+            return check_string in self._last_prompt
+        self._write_channel(self._normalize_cmd('\n'))
         output = await self._read_until_pattern(r'[\>|\#]')
-        logger.info(output)
+        log_event(self._host, "check_shell_mode", bytes=len(output), payload=output)
         return check_string in output
     
     async def enter_shell_mode(self,re_flags=re.IGNORECASE):
         """ Enter into shell mode"""
-        logger.info('Host {}: Entering to shell mode'.format(self._host))
+        logger.info("Host %s: Entering to shell mode", self._host)
         output = ''
         shell_command = type(self)._shell_enter
         if not await self.check_shell_mode():
-            self._stdin.write(self._normalize_cmd(shell_command))
+            self._write_channel(self._normalize_cmd(shell_command))
             output += await self._read_until_pattern(
                 pattern=type(self)._shell_enter_message,re_flags=re_flags)
-            self._stdin.write(self._normalize_cmd("Yes"))
+            self._write_channel(self._normalize_cmd("Yes"))
             output += await self._read_until_pattern('password:', re_flags=re_flags)
-            self._stdin.write(self._normalize_cmd(self._secret))
+            self._write_channel(self._normalize_cmd(self._secret))
             output += await self._read_until_pattern(r'[\>|\#]')
             await self._set_base_prompt() # base promt differs in shell mode
             if not await self.check_shell_mode():
@@ -151,11 +153,11 @@ class HW1000(BaseDevice):
     
     async def exit_shell_mode(self):
         """Exit from shell mode"""
-        logger.info('Host {}: Exiting from shell mode'.format(self._host))
+        logger.info("Host %s: Exiting from shell mode", self._host)
         output = ''
         exit_shell = type(self)._shell_exit
         if await self.check_shell_mode():
-            self._stdin.write(self._normalize_cmd(exit_shell))
+            self._write_channel(self._normalize_cmd(exit_shell))
             output = await self._read_until_pattern(r'[\>|\#]')
             if await self.check_shell_mode():
                 raise ValueError("Failed to exit from shell mode")
@@ -164,7 +166,7 @@ class HW1000(BaseDevice):
     
     async def _cleanup(self):
         """ Any needed cleanup before closing connection """
-        logger.info("Host {}: Cleanup session".format(self._host))
+        logger.info("Host %s: Cleanup session", self._host)
         await self.exit_shell_mode()
         await self.exit_enable_mode()
         
\ No newline at end of file
@@ -6,8 +6,8 @@ Connection Method are based upon AsyncSSH and should be running in asyncio loop
 
 import re
 
-from netdev.logger import logger
-from netdev.vendors.base import BaseDevice
+from netdev.logger import log_event, logger
+from netdev.vendors.base import BaseDevice, _on_channel
 
 
 class IOSLikeDevice(BaseDevice):
@@ -59,6 +59,15 @@ class IOSLikeDevice(BaseDevice):
     _config_check = ")#"
     """Checking string in prompt. If it's exist im prompt - we are in configuration mode"""
 
+    _config_error_signatures = (
+        r"% ?Invalid input",
+        r"% ?Invalid command",
+        r"% ?Ambiguous command",
+        r"% ?Incomplete command",
+        r"% ?Unknown command",
+    )
+    """Patterns of the messages about rejected configuration commands"""
+
     async def connect(self):
         """
         Basic asynchronous connection method for Cisco IOS like devices
@@ -71,33 +80,35 @@ class IOSLikeDevice(BaseDevice):
         * _enable() for getting privilege exec mode
         * _disable_paging() for non interact output in commands
         """
-        logger.info("Host {}: Trying to connect to the device".format(self._host))
-        await self._establish_connection()
-        await self._set_base_prompt()
-        await self.enable_mode()
-        await self._disable_paging()
-        logger.info("Host {}: Has connected to the device".format(self._host))
+        logger.info("Host %s: Trying to connect to the device", self._host)
+        with self._connecting():
+            if self._exec_mode:
+                return await self._connect_exec()
+            await self._phase("establish_connection", self._establish_connection())
+            await self._phase("set_base_prompt", self._set_base_prompt())
+            await self._phase("enable_mode", self.enable_mode())
+            await self._phase("disable_paging", self._disable_paging())
+        logger.info("Host %s: Has connected to the device", self._host)
 
     async def check_enable_mode(self):
         """Check if we are in privilege exec. Return boolean"""
-        logger.info("Host {}: Checking privilege exec".format(self._host))
+        logger.info("Host %s: Checking privilege exec", self._host)
         check_string = type(self)._priv_check
-        self._stdin.write(self._normalize_cmd("\n"))
-        output = await self._read_until_prompt()
+        output = await self._current_prompt()
         return check_string in output
 
     async def enable_mode(self, pattern="password", re_flags=re.IGNORECASE):
         """Enter to privilege exec"""
-        logger.info("Host {}: Entering to privilege exec".format(self._host))
+        logger.info("Host %s: Entering to privilege exec", self._host)
         output = ""
         enable_command = type(self)._priv_enter
         if not await self.check_enable_mode():
-            self._stdin.write(self._normalize_cmd(enable_command))
+            self._write_channel(self._normalize_cmd(enable_command))
             output += await self._read_until_prompt_or_pattern(
                 pattern=pattern, re_flags=re_flags
             )
-            if re.search(pattern, output, re_flags):
-                self._stdin.write(self._normalize_cmd(self._secret))
+            if self._compile_pattern(pattern, re_flags).search(output):
+                self._write_channel(self._normalize_cmd(self._secret))
                 output += await self._read_until_prompt()
             if not await self.check_enable_mode():
                 raise ValueError("Failed to enter to privilege exec")
@@ -105,11 +116,11 @@ class IOSLikeDevice(BaseDevice):
 
     async def exit_enable_mode(self):
         """Exit from privilege exec"""
-        logger.info("Host {}: Exiting from privilege exec".format(self._host))
+        logger.info("Host %s: Exiting from privilege exec", self._host)
         output = ""
         exit_enable = type(self)._priv_exit
         if await self.check_enable_mode():
-            self._stdin.write(self._normalize_cmd(exit_enable))
+            self._write_channel(self._normalize_cmd(exit_enable))
             output += await self._read_until_prompt()
             if await self.check_enable_mode():
                 raise ValueError("Failed to exit from privilege exec")
@@ -117,19 +128,18 @@ class IOSLikeDevice(BaseDevice):
 
     async def check_config_mode(self):
         """Checks if the device is in configuration mode or not"""
-        logger.info("Host {}: Checking configuration mode".format(self._host))
+        logger.info("Host %s: Checking configuration mode", self._host)
         check_string = type(self)._config_check
-        self._stdin.write(self._normalize_cmd("\n"))
-        output = await self._read_until_prompt()
+        output = await self._current_prompt()
         return check_string in output
 
     async def config_mode(self):
         """Enter into config_mode"""
-        logger.info("Host {}: Entering to configuration mode".format(self._host))
+        logger.info("Host %s: Entering to configuration mode", self._host)
         output = ""
         config_command = type(self)._config_enter
         if not await self.check_config_mode():
-            self._stdin.write(self._normalize_cmd(config_command))
+            self._write_channel(self._normalize_cmd(config_command))
             output = await self._read_until_prompt()
             if not await self.check_config_mode():
                 raise ValueError("Failed to enter to configuration mode")
@@ -137,43 +147,62 @@ class IOSLikeDevice(BaseDevice):
 
     async def exit_config_mode(self):
         """Exit from configuration mode"""
-        logger.info("Host {}: Exiting from configuration mode".format(self._host))
+        logger.info("Host %s: Exiting from configuration mode", self._host)
         output = ""
         exit_config = type(self)._config_exit
         if await self.check_config_mode():
-            self._stdin.write(self._normalize_cmd(exit_config))
+            self._write_channel(self._normalize_cmd(exit_config))
             output = await self._read_until_prompt()
             if await self.check_config_mode():
                 raise ValueError("Failed to exit from configuration mode")
         return output
 
-    async def send_config_set(self, config_commands=None, exit_config_mode=True):
+    @_on_channel
+    async def send_config_set(
+        self,
+        config_commands=None,
+        exit_config_mode=True,
+        timeout=None,
+        total_timeout=None,
+        window=1,
+        stop_on_error=False,
+    ):
         """
         Sending configuration commands to Cisco IOS like devices
         Automatically exits/enters configuration mode.
 
         :param list config_commands: iterable string list with commands for applying to network devices in conf mode
         :param bool exit_config_mode: If true it will quit from configuration mode automatically
+        :param float timeout: idle timeout in seconds for receiving data. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for all commands. Default is None (no limit)
+        :param int window: maximum count of commands written to device without waiting for the prompt
+        :param bool stop_on_error: if true it raises ConfigError and stops sending commands after the first
+                rejected one. The device stays in configuration mode
         :return: The output of this commands
         """
 
+        self._check_window(window)
         if config_commands is None:
             return ""
 
         # Send config commands
-        output = await self.config_mode()
-        output += await super().send_config_set(config_commands=config_commands)
-
-        if exit_config_mode:
-            output += await self.exit_config_mode()
+        with self._operation("send_config_set", config_commands):
+            with self._deadline_scope(timeout, total_timeout):
+                output = await self.config_mode()
+                output += await super().send_config_set(
+                    config_commands=config_commands,
+                    window=window,
+                    stop_on_error=stop_on_error,
+                )
+
+                if exit_config_mode:
+                    output += await self.exit_config_mode()
 
         output = self._normalize_linefeeds(output)
-        logger.debug(
-            "Host {}: Config commands output: {}".format(self._host, repr(output))
-        )
+        log_event(self._host, "send_config_set", bytes=len(output), payload=output)
         return output
 
     async def _cleanup(self):
         """ Any needed cleanup before closing connection """
-        logger.info("Host {}: Cleanup session".format(self._host))
+        logger.info("Host %s: Cleanup session", self._host)
         await self.exit_config_mode()
@@ -11,6 +11,9 @@ class JuniperJunOS(JunOSLikeDevice):
     _cli_command = "cli"
     """Command for entering to cli mode"""
 
+    _exec_supported = True
+    """Platform runs CLI commands by SSH exec requests, so exec_mode can be used"""
+
     async def connect(self):
         """
         Juniper JunOS asynchronous connection method
@@ -22,28 +25,30 @@ class JuniperJunOS(JunOSLikeDevice):
         * _set_base_prompt() for finding and setting device prompt
         * _disable_paging() for non interact output in commands
         """
-        logger.info("Host {}: Trying to connect to the device".format(self._host))
-        await self._establish_connection()
-        await self._set_base_prompt()
-        await self.cli_mode()
-        await self._disable_paging()
-        logger.info("Host {}: Entering to cmdline mode".format(self._host))
+        logger.info("Host %s: Trying to connect to the device", self._host)
+        with self._connecting():
+            if self._exec_mode:
+                return await self._connect_exec()
+            await self._phase("establish_connection", self._establish_connection())
+            await self._phase("set_base_prompt", self._set_base_prompt())
+            await self._phase("cli_mode", self.cli_mode())
+            await self._phase("disable_paging", self._disable_paging())
+        logger.info("Host %s: Entering to cmdline mode", self._host)
 
     async def check_cli_mode(self):
         """Check if we are in cli mode. Return boolean"""
-        logger.info("Host {}: Checking shell mode".format(self._host))
+        logger.info("Host %s: Checking shell mode", self._host)
         cli_check = type(self)._cli_check
-        self._stdin.write(self._normalize_cmd("\n"))
-        output = await self._read_until_prompt()
+        output = await self._current_prompt()
         return cli_check in output
 
     async def cli_mode(self):
         """Enter to cli mode"""
-        logger.info("Host {}: Entering to cli mode".format(self._host))
+        logger.info("Host %s: Entering to cli mode", self._host)
         output = ""
         cli_command = type(self)._cli_command
         if not await self.check_cli_mode():
-            self._stdin.write(self._normalize_cmd(cli_command))
+            self._write_channel(self._normalize_cmd(cli_command))
             output += await self._read_until_prompt()
             if not await self.check_cli_mode():
                 raise ValueError("Failed to enter to cli mode")
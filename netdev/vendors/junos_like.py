@@ -6,8 +6,8 @@ Connection Method are based upon AsyncSSH and should be running in asyncio loop
 
 import re
 
-from netdev.logger import logger
-from netdev.vendors.base import BaseDevice
+from netdev.logger import log_event, logger
+from netdev.vendors.base import BaseDevice, _on_channel
 
 
 class JunOSLikeDevice(BaseDevice):
@@ -41,6 +41,13 @@ class JunOSLikeDevice(BaseDevice):
     _config_check = "#"
     """Checking string in prompt. If it's exist im prompt - we are in configuration mode"""
 
+    _config_error_signatures = (
+        r"^\s*syntax error",
+        r"^\s*unknown command",
+        r"^error: ",
+    )
+    """Patterns of the messages about rejected configuration commands"""
+
     _commit_command = "commit"
     """Command for committing changes"""
 
@@ -55,7 +62,7 @@ class JunOSLikeDevice(BaseDevice):
 
         For JunOS devices base_pattern is "user(@[hostname])?[>|#]
         """
-        logger.info("Host {}: Setting base prompt".format(self._host))
+        logger.info("Host %s: Setting base prompt", self._host)
         prompt = await self._find_prompt()
         prompt = prompt[:-1]
         # Strip off trailing terminator
@@ -67,25 +74,24 @@ class JunOSLikeDevice(BaseDevice):
         base_prompt = re.escape(self._base_prompt[:12])
         pattern = type(self)._pattern
         self._base_pattern = pattern.format(delimiters=delimiters)
-        logger.debug("Host {}: Base Prompt: {}".format(self._host, self._base_prompt))
-        logger.debug("Host {}: Base Pattern: {}".format(self._host, self._base_pattern))
+        logger.debug("Host %s: Base Prompt: %s", self._host, self._base_prompt)
+        logger.debug("Host %s: Base Pattern: %s", self._host, self._base_pattern)
         return self._base_prompt
 
     async def check_config_mode(self):
         """Check if are in configuration mode. Return boolean"""
-        logger.info("Host {}: Checking configuration mode".format(self._host))
+        logger.info("Host %s: Checking configuration mode", self._host)
         check_string = type(self)._config_check
-        self._stdin.write(self._normalize_cmd("\n"))
-        output = await self._read_until_prompt()
+        output = await self._current_prompt()
         return check_string in output
 
     async def config_mode(self):
         """Enter to configuration mode"""
-        logger.info("Host {}: Entering to configuration mode".format(self._host))
+        logger.info("Host %s: Entering to configuration mode", self._host)
         output = ""
         config_enter = type(self)._config_enter
         if not await self.check_config_mode():
-            self._stdin.write(self._normalize_cmd(config_enter))
+            self._write_channel(self._normalize_cmd(config_enter))
             output += await self._read_until_prompt()
             if not await self.check_config_mode():
                 raise ValueError("Failed to enter to configuration mode")
@@ -93,22 +99,27 @@ class JunOSLikeDevice(BaseDevice):
 
     async def exit_config_mode(self):
         """Exit from configuration mode"""
-        logger.info("Host {}: Exiting from configuration mode".format(self._host))
+        logger.info("Host %s: Exiting from configuration mode", self._host)
         output = ""
         config_exit = type(self)._config_exit
         if await self.check_config_mode():
-            self._stdin.write(self._normalize_cmd(config_exit))
+            self._write_channel(self._normalize_cmd(config_exit))
             output += await self._read_until_prompt()
             if await self.check_config_mode():
                 raise ValueError("Failed to exit from configuration mode")
         return output
 
+    @_on_channel
     async def send_config_set(
         self,
         config_commands=None,
         with_commit=True,
         commit_comment="",
         exit_config_mode=True,
+        timeout=None,
+        total_timeout=None,
+        window=1,
+        stop_on_error=False,
     ):
         """
         Sending configuration commands to device
@@ -118,28 +129,40 @@ class JunOSLikeDevice(BaseDevice):
         :param bool with_commit: if true it commit all changes after applying all config_commands
         :param string commit_comment: message for configuration commit
         :param bool exit_config_mode: If true it will quit from configuration mode automatically
+        :param float timeout: idle timeout in seconds for receiving data. Default is timeout of the session
+        :param float total_timeout: timeout in seconds for all commands. Default is None (no limit)
+        :param int window: maximum count of commands written to device without waiting for the prompt
+        :param bool stop_on_error: if true it raises ConfigError and stops sending commands after the first
+                rejected one. Nothing is committed and the device stays in configuration mode
         :return: The output of these commands
         """
 
+        self._check_window(window)
         if config_commands is None:
             return ""
 
         # Send config commands
-        output = await self.config_mode()
-        output += await super().send_config_set(config_commands=config_commands)
-        if with_commit:
-            commit = type(self)._commit_command
-            if commit_comment:
-                commit = type(self)._commit_comment_command.format(commit_comment)
-
-            self._stdin.write(self._normalize_cmd(commit))
-            output += await self._read_until_prompt()
-
-        if exit_config_mode:
-            output += await self.exit_config_mode()
+        with self._operation("send_config_set", config_commands):
+            with self._deadline_scope(timeout, total_timeout):
+                output = await self.config_mode()
+                output += await super().send_config_set(
+                    config_commands=config_commands,
+                    window=window,
+                    stop_on_error=stop_on_error,
+                )
+                if with_commit:
+                    commit = type(self)._commit_command
+                    if commit_comment:
+                        commit = type(self)._commit_comment_command.format(
+                            commit_comment
+                        )
+
+                    self._write_channel(self._normalize_cmd(commit))
+                    output += await self._read_until_prompt()
+
+                if exit_config_mode:
+                    output += await self.exit_config_mode()
 
         output = self._normalize_linefeeds(output)
-        logger.debug(
-            "Host {}: Config commands output: {}".format(self._host, repr(output))
-        )
+        log_event(self._host, "send_config_set", bytes=len(output), payload=output)
         return output
@@ -1,8 +1,4 @@
-import asyncssh
-import asyncio
-
-from netdev.exceptions import DisconnectError, TimeoutError
-from netdev.logger import logger
+from netdev.logger import log_event, logger
 from netdev.vendors.base import BaseDevice
 
 
@@ -40,6 +36,17 @@ class MikrotikRouterOS(BaseDevice):
 
     _pattern = r"\[.*?\] (\/.*?)?\>"
 
+    _config_error_signatures = (
+        r"^\s*syntax error",
+        r"^\s*bad command name",
+        r"^\s*expected end of command",
+        r"^failure: ",
+    )
+    """
+    Patterns of the messages about rejected configuration commands. They are anchored to the start
+    of the line, because the checked output begins with the echoed command
+    """
+
     async def connect(self):
         """
         Async Connection method
@@ -49,33 +56,30 @@ class MikrotikRouterOS(BaseDevice):
         * _establish_connection() for connecting to device
         * _set_base_prompt() for finding and setting device prompt
         """
-        logger.info("Host {}: Connecting to device".format(self._host))
-        await self._establish_connection()
-        await self._set_base_prompt()
-        logger.info("Host {}: Connected to device".format(self._host))
+        logger.info("Host %s: Connecting to device", self._host)
+        with self._connecting():
+            await self._phase("establish_connection", self._establish_connection())
+            await self._phase("set_base_prompt", self._set_base_prompt())
+        logger.info("Host %s: Connected to device", self._host)
 
     async def _establish_connection(self):
         """Establish SSH connection to the network device"""
         logger.info(
-            "Host {}: Establishing connection to port {}".format(self._host, self._port)
+            "Host %s: Establishing connection to port %s", self._host, self._port
         )
         output = ""
-        # initiate SSH connection
-        fut = asyncssh.connect(**self._connect_params_dict)
-        try:
-            self._conn = await asyncio.wait_for(fut, self._timeout)
-        except asyncssh.DisconnectError as e:
-            raise DisconnectError(self._host, e.code, e.reason)
-        except asyncio.TimeoutError:
-            raise TimeoutError(self._host)
+        await self._open_connection()
+        if self._stdout is not None:
+            # The session is adopted from autodetection and the first prompt is already read
+            return ""
         self._stdin, self._stdout, self._stderr = await self._conn.open_session(
-            term_type="Dumb"
+            term_type="Dumb", encoding=self._channel_encoding
         )
-        logger.info("Host {}: Connection is established".format(self._host))
+        logger.info("Host %s: Connection is established", self._host)
         # Flush unnecessary data
         output = await self._read_until_prompt()
-        logger.debug(
-            "Host {}: Establish Connection Output: {}".format(self._host, repr(output))
+        log_event(
+            self._host, "establish_connection", bytes=len(output), payload=output
         )
         return output
 
@@ -87,7 +91,7 @@ class MikrotikRouterOS(BaseDevice):
 
         For Mikrotik devices base_pattern is "r"\[.*?\] (\/.*?)?\>"
         """
-        logger.info("Host {}: Setting base prompt".format(self._host))
+        logger.info("Host %s: Setting base prompt", self._host)
         self._base_pattern = type(self)._pattern
         prompt = await self._find_prompt()
         user = ""
@@ -96,14 +100,14 @@ class MikrotikRouterOS(BaseDevice):
         if "@" in prompt:
             prompt = prompt.split("@")[1]
         self._base_prompt = prompt
-        logger.debug("Host {}: Base Prompt: {}".format(self._host, self._base_prompt))
-        logger.debug("Host {}: Base Pattern: {}".format(self._host, self._base_pattern))
+        logger.debug("Host %s: Base Prompt: %s", self._host, self._base_prompt)
+        logger.debug("Host %s: Base Pattern: %s", self._host, self._base_pattern)
         return self._base_prompt
 
     async def _find_prompt(self):
         """Finds the current network device prompt, last line only."""
-        logger.info("Host {}: Finding prompt".format(self._host))
-        self._stdin.write("\r")
+        logger.info("Host %s: Finding prompt", self._host)
+        self._write_channel("\r")
         prompt = ""
         prompt = await self._read_until_prompt()
         prompt = prompt.strip()
@@ -111,7 +115,7 @@ class MikrotikRouterOS(BaseDevice):
             prompt = self._strip_ansi_escape_codes(prompt)
         if not prompt:
             raise ValueError("Unable to find prompt: {0}".format(prompt))
-        logger.debug("Host {}: Prompt: {}".format(self._host, prompt))
+        logger.debug("Host %s: Prompt: %s", self._host, prompt)
         return prompt
 
     @staticmethod
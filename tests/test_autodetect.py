@@ -0,0 +1,145 @@
+import asyncio
+import unittest
+import unittest.mock
+
+import netdev
+import netdev.autodetect
+from netdev.autodetect import AutoDetect, _Detector
+from netdev.testing import FakeDevice
+
+
+class Connection(object):
+    def __init__(self, banner):
+        self.banner = banner
+        self.closed = False
+
+    def get_extra_info(self, name):
+        return self.banner if name == "server_version" else None
+
+    def close(self):
+        self.closed = True
+
+
+class Channel(object):
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.written = []
+
+    async def read(self, n):
+        return self.chunks.pop(0)
+
+    def write(self, data):
+        self.written.append(data)
+
+
+class TestDetector(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def detect(self, banner, chunks):
+        detector = _Detector(host="localhost", loop=self.loop)
+        detector._conn = Connection(banner)
+        detector._stdin = detector._stdout = self.channel = Channel(chunks)
+        return self.loop.run_until_complete(detector.detect())
+
+    def test_prompt_shapes(self):
+        cases = [
+            ("SSH-2.0-HUAWEI-1.5", "\r\n<HUAWEI-S5720>", "huawei"),
+            ("SSH-2.0-Comware-7.1.064", "\r\n<HP-5130>", "hp_comware"),
+            ("SSH-2.0-ROSSSH", "\r\n[admin@MikroTik] > ", "mikrotik_routeros"),
+            ("SSH-2.0-OpenSSH_7.5", "\r\nadmin@mx960-re0> ", "juniper_junos"),
+            ("SSH-2.0-Cisco-1.25", "\r\nRP/0/RSP0/CPU0:xr1#", "cisco_ios_xr"),
+            ("SSH-2.0-OpenSSH_8.9", "\r\nuser@server:~$ ", "terminal"),
+        ]
+        for banner, prompt, device_type in cases:
+            self.assertEqual(self.detect(banner, [prompt]), (device_type, prompt.strip()))
+        self.assertEqual(self.channel.written, ["\n"])
+
+    def test_version_with_paging(self):
+        chunks = [
+            "\r\nnexus1# ",
+            "show version\r\nCisco Nexus Operating System (NX-OS) Software\r\n --More-- ",
+            "\r\nnexus1# ",
+        ]
+        self.assertEqual(self.detect("SSH-2.0-OpenSSH_6.2", chunks), ("cisco_nxos", "nexus1#"))
+        self.assertEqual(self.channel.written, ["\n", "show version\n", "q"])
+
+    def test_unknown_device(self):
+        with self.assertRaises(ValueError):
+            self.detect("SSH-2.0-OpenSSH_6.2", ["\r\nswitch# ", "show version\r\nUnknown OS\r\nswitch# "])
+
+
+class TestAutoDetect(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_create(self):
+        device = netdev.create(host="localhost", device_type="autodetect", secret="secret")
+        self.assertIsInstance(device, AutoDetect)
+        self.assertIsNone(device.device_type)
+        with self.assertRaises(AttributeError):
+            device.send_command
+
+    def test_detector_params(self):
+        device = AutoDetect(
+            host="localhost", device_type="autodetect", secret="secret", channels=4, hooks=netdev.Hooks()
+        )
+        self.assertEqual(device._detector_params(), {"host": "localhost", "device_type": "autodetect"})
+
+    def test_exec_mode(self):
+        phases = []
+
+        class Hooks(netdev.Hooks):
+            def on_phase(self, device, phase, start, duration):
+                phases.append((device.device_type, phase))
+
+        async def run():
+            async with FakeDevice("cisco_nxos") as fake:
+                params = fake.connection_params(device_type="autodetect", exec_mode=True, hooks=Hooks())
+                try:
+                    async with netdev.create(**params) as device:
+                        output = await device.send_command("show version")
+                        # The shell channel of the detector is closed and its session ends
+                        await asyncio.wait_for(asyncio.gather(*fake._sessions), 5)
+                        return device._stdin, output
+                finally:
+                    netdev.autodetect._detected.pop(params["host"], None)
+
+        stdin, output = self.loop.run_until_complete(run())
+        self.assertIsNone(stdin)
+        self.assertIn("NX-OS", output)
+        self.assertEqual(phases, [("cisco_nxos", "establish_connection"), ("cisco_nxos", "connect")])
+
+    def test_stale_cache(self):
+        async def run():
+            async with FakeDevice("juniper_junos") as fake:
+                params = fake.connection_params(device_type="autodetect")
+                # RouterOS session fails to authenticate, because it adds options to the username
+                netdev.autodetect._detected[params["host"]] = "mikrotik_routeros"
+                try:
+                    async with netdev.create(**params) as device:
+                        return device.device_type, netdev.autodetect._detected[params["host"]]
+                finally:
+                    netdev.autodetect._detected.pop(params["host"], None)
+
+        self.assertEqual(self.loop.run_until_complete(run()), ("juniper_junos", "juniper_junos"))
+
+    def test_detector_is_closed_on_error(self):
+        connections = []
+
+        async def detect(detector):
+            detector._conn = Connection("SSH-2.0-OpenSSH_6.2")
+            connections.append(detector._conn)
+            raise ValueError("Unknown device")
+
+        device = AutoDetect(host="localhost", device_type="autodetect")
+        with unittest.mock.patch.object(_Detector, "detect", detect):
+            with self.assertRaises(ValueError):
+                self.loop.run_until_complete(device.connect())
+        self.assertTrue(connections[0].closed)
@@ -0,0 +1,509 @@
+import asyncio
+import logging
+import time
+import unittest
+import unittest.mock
+
+import netdev
+from netdev.buffer import ReadBuffer
+from netdev.logger import log_event, payload_logger
+from netdev.vendors import AlcatelAOS, BaseDevice, CiscoIOS, JuniperJunOS, MikrotikRouterOS
+
+ESC = "\x1b"
+
+
+class TestStripAnsiEscapeCodes(unittest.TestCase):
+    def test_cursor_codes(self):
+        output = ESC + "[24;27H" + ESC + "[?25h" + ESC + "7text" + ESC + "8" + ESC + "[2K" + ESC + "[K"
+        output += ESC + "[1;24r" + ESC + "[r" + ESC + "[3A" + ESC + "[12B"
+        self.assertEqual(BaseDevice._strip_ansi_escape_codes(output), "text")
+
+    def test_next_line(self):
+        output = "first" + ESC + "Esecond"
+        self.assertEqual(BaseDevice._strip_ansi_escape_codes(output), "first\nsecond")
+
+    def test_colors_and_osc(self):
+        output = ESC + "[1;31mred" + ESC + "[0m " + ESC + "]0;title\x07" + ESC + "(Bplain"
+        self.assertEqual(BaseDevice._strip_ansi_escape_codes(output), "red plain")
+
+    def test_without_codes(self):
+        output = "[admin@MikroTik] > "
+        self.assertIs(BaseDevice._strip_ansi_escape_codes(output), output)
+
+
+class TestNormalizeOutput(unittest.TestCase):
+    def setUp(self):
+        self.device = BaseDevice(host="localhost")
+        self.device._base_prompt = "router"
+
+    def test_send_command_output(self):
+        output = "show clock\r\n10:00:00.000 UTC Mon Jan 1 2024\r\nrouter#"
+        self.assertEqual(
+            self.device._normalize_output(output, "show clock\n", strip_command=True, strip_prompt=True),
+            "10:00:00.000 UTC Mon Jan 1 2024",
+        )
+
+    def test_backspaces(self):
+        output = "show\x08\x08\x08\x08show clock\r\n10:00:00\r\nrouter#"
+        self.assertEqual(
+            self.device._normalize_output(output, "show clock\n", strip_command=True, strip_prompt=True),
+            "10:00:00",
+        )
+
+    def test_prompt_only(self):
+        self.assertEqual(self.device._normalize_output("router#", strip_prompt=True), "")
+        self.assertEqual(self.device._normalize_output("line\r\n", strip_prompt=True), "line\n")
+
+    def test_linefeeds(self):
+        self.assertEqual(BaseDevice._normalize_linefeeds("a\r\r\nb\r\nc\n\rd"), "a\nb\nc\nd")
+
+
+class ChunkReader(object):
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+
+    async def read(self, n):
+        return self._chunks.pop(0)
+
+
+class TestBytesMode(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.device = BaseDevice(host="localhost", loop=self.loop, bytes_mode=True)
+        self.device._base_prompt = "router"
+        self.device._base_pattern = r"router.*?(\(.*?\))?[>#]"
+        self.chunks = ["show ver\r\n", "Caf\u00e9 version\r\nrou", "ter#"]
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_decode_once(self):
+        self.device._stdout = ChunkReader(chunk.encode() for chunk in self.chunks)
+        output = self.loop.run_until_complete(self.device._read_until_prompt_or_pattern())
+        self.assertEqual(output, "".join(self.chunks))
+
+    def test_raw_bytes(self):
+        self.device._stdout = ChunkReader(chunk.encode() for chunk in self.chunks)
+        output = self.loop.run_until_complete(self.device._read_until_prompt_or_pattern(decode=False))
+        self.assertEqual(output, "".join(self.chunks).encode())
+
+    def test_text_patterns_are_kept(self):
+        self.device._compile_channel_pattern(self.device._base_pattern)
+        self.assertIsInstance(self.device._compile_pattern(self.device._base_pattern).pattern, str)
+
+    def test_stream_boundary(self):
+        self.assertEqual(BaseDevice._find_stream_boundary(b"a\r\nb\r\n\r\ncd", 6), 8)
+        self.assertEqual(BaseDevice._find_stream_boundary("a\r\nb\r\n\r\ncd", 6), 8)
+
+
+class ChunkWriter(object):
+    def __init__(self):
+        self.data = []
+        self.closed = False
+
+    def write(self, data):
+        self.data.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+class TestPromptTracking(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.device = BaseDevice(host="localhost", loop=self.loop)
+        self.device._base_prompt = "router"
+        self.device._base_pattern = r"router.*?(\(.*?\))?[>#]"
+        self.device._stdin = ChunkWriter()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def read(self, chunks, pattern=""):
+        self.device._stdout = ChunkReader(chunks)
+        return self.loop.run_until_complete(self.device._read_until_pattern(pattern))
+
+    def test_prompt_is_reused(self):
+        self.read(["conf t\r\nEnter configuration commands\r\nrouter(config)#"])
+        prompt = self.loop.run_until_complete(self.device._current_prompt())
+        self.assertEqual(prompt, "router(config)#")
+        self.assertEqual(self.device._stdin.data, [])
+
+    def test_write_resets_prompt(self):
+        self.read(["\r\nrouter#"])
+        self.device._write_channel("show clock\n")
+        self.assertIsNone(self.device._last_prompt)
+
+    def test_unknown_prompt_is_probed(self):
+        self.read(["Password:"], pattern="Password")
+        self.assertIsNone(self.device._last_prompt)
+        self.device._stdout = ChunkReader(["\r\nrouter#"])
+        prompt = self.loop.run_until_complete(self.device._current_prompt())
+        self.assertEqual(prompt, "\r\nrouter#")
+        self.assertEqual(self.device._stdin.data, ["\n"])
+
+    def test_data_after_match(self):
+        self.read(["router# is not a prompt"])
+        self.assertIsNone(self.device._last_prompt)
+
+
+class TestPipelinedConfig(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.device = BaseDevice(host="localhost", loop=self.loop)
+        self.device._base_prompt = "router"
+        self.device._base_pattern = r"router.*?(\(.*?\))?[>#]"
+        self.device._stdin = ChunkWriter()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def send(self, commands, chunks, window):
+        self.device._stdout = ChunkReader(chunks)
+        return self.loop.run_until_complete(self.device._send_pipelined(commands, window))
+
+    def test_split_by_prompts(self):
+        chunks = [
+            "interface Gi1\r\nrouter(config-if)#desc",
+            "ription uplink\r\nrouter(config-if)#bad\r\n% Invalid input\r\nrouter(config-if)#",
+        ]
+        outputs = self.send(["interface Gi1", "description uplink", "bad"], chunks, window=3)
+        self.assertEqual(
+            outputs,
+            [
+                "interface Gi1\r\nrouter(config-if)#",
+                "description uplink\r\nrouter(config-if)#",
+                "bad\r\n% Invalid input\r\nrouter(config-if)#",
+            ],
+        )
+        self.assertEqual(self.device._stdin.data, ["interface Gi1\n", "description uplink\n", "bad\n"])
+        self.assertEqual(self.device._last_prompt, "router(config-if)#")
+
+    def test_window(self):
+        chunks = ["a\r\nrouter(config)#", "b\r\nrouter(config)#", "c\r\nrouter(config)#"]
+        self.device._stdout = ChunkReader(chunks)
+        writes = []
+
+        async def read(n):
+            writes.append(len(self.device._stdin.data))
+            return chunks.pop(0)
+
+        self.device._stdout.read = read
+        outputs = self.loop.run_until_complete(self.device._send_pipelined(["a", "b", "c"], 2))
+        self.assertEqual(len(outputs), 3)
+        self.assertEqual(writes, [2, 3, 3])
+
+    def test_send_commands(self):
+        self.device._stdout = ChunkReader(
+            ["show clock\r\n12:00\r\nrouter#show ver", "\r\nVersion 15.2\r\nUptime 1 day\r\nrouter#"]
+        )
+        outputs = self.loop.run_until_complete(self.device.send_commands(["show clock", "show ver"]))
+        self.assertEqual(outputs, {"show clock": "12:00", "show ver": "Version 15.2\nUptime 1 day"})
+        self.assertEqual(self.device._stdin.data, ["show clock\n", "show ver\n"])
+
+    def test_prompt_ending_with_space(self):
+        self.device._base_prompt = "admin@router"
+        self.device._base_pattern = r"admin@router.*?[>#%]"
+        for window in (1, 2):
+            self.device._stdout = ChunkReader(
+                ["show a\r\nAAA\r\nadmin@router> ", "show b\r\nBBB\r\nadmin@router> \t"]
+            )
+            outputs = self.loop.run_until_complete(
+                self.device.send_commands(["show a", "show b"], window=window)
+            )
+            self.assertEqual(outputs, {"show a": "AAA", "show b": "BBB"})
+            self.assertEqual(self.device._last_prompt, "admin@router> \t")
+
+
+class TestStreamCommand(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.lines = ["interface Gi0/{} is up".format(i) for i in range(20)]
+        self.output = "show int\r\n" + "\r\n".join(self.lines) + "\r\nrouter#"
+
+    def tearDown(self):
+        self.loop.close()
+
+    def make_device(self, chunks, cls=BaseDevice, bytes_mode=False):
+        device = cls(host="localhost", loop=self.loop, bytes_mode=bytes_mode)
+        device._base_prompt = "router"
+        device._base_pattern = r"router.*?(\(.*?\))?[>#]"
+        device._prompt_window = 16
+        device._stdin = ChunkWriter()
+        device._stdout = ChunkReader(chunks)
+        return device
+
+    def stream(self, chunks, bytes_mode=False, cls=BaseDevice, **kwargs):
+        device = self.make_device(chunks, cls, bytes_mode)
+
+        async def collect():
+            return [part async for part in device.stream_command("show int", **kwargs)]
+
+        return self.loop.run_until_complete(collect())
+
+    def test_prompt_split_across_chunks(self):
+        split = self.output.index("rou")
+        parts = self.stream([self.output[:split], self.output[split:]])
+        self.assertGreater(len(parts), 1)
+        self.assertEqual("".join(parts), "\n".join(self.lines))
+        # The held back data isn't taken for the prompt before the rest of it is received
+        self.assertTrue(all(part.endswith("\n") for part in parts[:-1]))
+
+    def test_small_chunks(self):
+        chunks = [self.output[i : i + 7] for i in range(0, len(self.output), 7)]
+        parts = self.stream(chunks)
+        self.assertGreater(len(parts), 1)
+        self.assertEqual("".join(parts), "\n".join(self.lines))
+
+    def test_command_and_prompt_are_kept(self):
+        parts = self.stream([self.output], strip_command=False, strip_prompt=False)
+        self.assertEqual("".join(parts), self.output.replace("\r\n", "\n"))
+
+    def test_bytes_without_decoding(self):
+        data = self.output.encode()
+        chunks = [data[i : i + 50] for i in range(0, len(data), 50)]
+        parts = self.stream(chunks, bytes_mode=True, decode=False)
+        self.assertGreater(len(parts), 1)
+        self.assertTrue(all(isinstance(part, bytes) for part in parts))
+        self.assertEqual(b"".join(parts), data)
+
+    def test_early_stop(self):
+        chunks = [self.output[i : i + 50] for i in range(0, len(self.output), 50)]
+        device = self.make_device(chunks + ["show clock\r\n10:00:00\r\nrouter#"])
+
+        async def first_part():
+            parts = device.stream_command("show int")
+            async for part in parts:
+                break
+            await parts.aclose()
+            return part
+
+        self.assertTrue(self.loop.run_until_complete(first_part()).startswith(self.lines[0]))
+        # The rest of the output is dropped, so the next command gets its own output
+        self.assertEqual(device._last_prompt, "router#")
+        self.assertEqual(self.loop.run_until_complete(device.send_command("show clock")), "10:00:00")
+        self.assertFalse(device._stdin.closed)
+
+    def test_platform_prompt_pattern(self):
+        self.lines[5] = "description uplink to router#2"
+        self.output = "show int\r\n" + "\r\n".join(self.lines) + "\r\nrouter#"
+        chunks = [self.output[i : i + 7] for i in range(0, len(self.output), 7)]
+        # The prompt of AlcatelAOS must begin a new line, so the description doesn't end the output
+        parts = self.stream(chunks, cls=AlcatelAOS)
+        self.assertEqual("".join(parts), "\n".join(self.lines))
+
+
+class TestConfigErrors(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.device = CiscoIOS(host="localhost", loop=self.loop)
+        self.device._base_prompt = "router"
+        self.device._base_pattern = r"router.*?(\(.*?\))?[>#]"
+        self.device._stdin = ChunkWriter()
+        self.chunks = [
+            "interface Gi1\r\nrouter(config-if)#bad\r\n",
+            "% Invalid input detected at '^' marker.\r\nrouter(config-if)#",
+            "shutdown\r\nrouter(config-if)#",
+        ]
+        self.device._stdout = ChunkReader(self.chunks)
+        self.commands = ["interface Gi1", "bad", "shutdown"]
+
+    def tearDown(self):
+        self.loop.close()
+
+    def send(self, **kwargs):
+        return self.loop.run_until_complete(BaseDevice.send_config_set(self.device, self.commands, **kwargs))
+
+    def test_errors_are_collected(self):
+        output = self.send(window=3)
+        self.assertIn("shutdown", output)
+        self.assertEqual(self.device.config_errors, [("bad", "% Invalid input detected at '^' marker.")])
+
+    def test_stop_on_error(self):
+        with self.assertRaises(netdev.ConfigError) as context:
+            self.send(stop_on_error=True)
+        self.assertEqual(context.exception.command, "bad")
+        self.assertEqual(self.device._stdin.data, ["interface Gi1\n", "bad\n"])
+        self.assertEqual(self.device._last_prompt, "router(config-if)#")
+
+    def test_no_errors(self):
+        self.commands = ["interface Gi1"]
+        self.device._stdout = ChunkReader(["interface Gi1\r\nrouter(config-if)#"])
+        self.send(stop_on_error=True)
+        self.assertEqual(self.device.config_errors, [])
+
+    def test_output_is_joined_only_for_payload(self):
+        with unittest.mock.patch.object(ReadBuffer, "getvalue", side_effect=AssertionError):
+            self.send(window=3)
+        self.device._stdout = ChunkReader(self.chunks)
+        payload_logger.setLevel(logging.DEBUG)
+        try:
+            with self.assertLogs("netdev.payload", level=logging.DEBUG) as logs:
+                self.send(window=3)
+        finally:
+            payload_logger.setLevel(logging.WARNING)
+        self.assertIn("shutdown", logs.records[0].getMessage())
+
+    def test_invalid_window(self):
+        for window in (0, -1):
+            with self.subTest(window=window):
+                with self.assertRaises(ValueError):
+                    self.loop.run_until_complete(self.device.send_config_set(self.commands, window=window))
+                with self.assertRaises(ValueError):
+                    self.loop.run_until_complete(self.device.send_commands(self.commands, window=window))
+        self.assertEqual(self.device._stdin.data, [])
+
+    def test_error_in_echoed_command(self):
+        outputs = {
+            JuniperJunOS: [
+                ('set interfaces ge-0/0/0 description "syntax error"', "\r\n"),
+                ("set interfaces ge-0/0/0 description unknown-command", "\r\n"),
+                ("set foo", "\r\n       ^\r\nsyntax error.\r\n"),
+                ("foo", "\r\n^\r\nunknown command.\r\n"),
+            ],
+            MikrotikRouterOS: [
+                ('/interface set ether1 comment="syntax error"', "\r\n"),
+                ("/interface set ether1 comment=bad-command-name", "\r\n"),
+                ("/foo", "\r\nbad command name foo (line 1 column 2)\r\n"),
+                ("/interface print 1 2", "\r\nexpected end of command (line 1 column 19)\r\n"),
+            ],
+        }
+        for device_class, commands in outputs.items():
+            device = device_class(host="localhost", loop=self.loop)
+            for command, output in commands:
+                device._check_config_output(command, command + output)
+            with self.subTest(device_class.__name__):
+                self.assertEqual([command for command, error in device.config_errors], [commands[2][0], commands[3][0]])
+
+
+class SessionConnection(object):
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sessions = []
+
+    async def open_session(self, **kwargs):
+        session = ChunkWriter(), ChunkReader(self.chunks), None
+        self.sessions.append(session)
+        return session
+
+
+class TestParallelChannels(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_failed_channel_is_closed(self):
+        device = BaseDevice(host="localhost", loop=self.loop, channels=2)
+        # The reader has no prompt, so preparing of the channel fails
+        device._conn = SessionConnection(["\r\n"])
+        device._stdin = ChunkWriter()
+        device._idle_channels = asyncio.Queue()
+        with self.assertRaises(IndexError):
+            self.loop.run_until_complete(device._acquire_channel())
+        self.assertEqual(len(device._conn.sessions), 1)
+        self.assertTrue(device._conn.sessions[0][0].closed)
+        self.assertEqual(device._opened_channels, 1)
+
+
+class ExecStream(object):
+    def __init__(self, data, delay):
+        self._chunks = [data] if data else []
+        self._delay = delay
+
+    async def read(self, n):
+        await asyncio.sleep(self._delay)
+        return self._chunks.pop(0) if self._chunks else ""
+
+
+class ExecProcess(object):
+    def __init__(self, conn, stdout, stderr, delay):
+        self._conn = conn
+        self.stdout = ExecStream(stdout, delay)
+        self.stderr = ExecStream(stderr, delay)
+
+    def close(self):
+        self._conn.active -= 1
+
+
+class ExecConnection(object):
+    def __init__(self):
+        self.active = self.max_active = 0
+
+    async def create_process(self, command, encoding):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        delay = 1 if command == "slow" else 0.01
+        if command == "bad":
+            return ExecProcess(self, "", "% Invalid command\r\n", delay)
+        return ExecProcess(self, "output of {}\r\n".format(command), "", delay)
+
+
+class TestExecMode(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.device = CiscoIOS(host="localhost", loop=self.loop, exec_mode=True, channels=2)
+        self.device._conn = ExecConnection()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_send_command(self):
+        output = self.loop.run_until_complete(self.device.send_command("show clock"))
+        self.assertEqual(output, "output of show clock")
+        output = self.loop.run_until_complete(self.device.send_command("bad"))
+        self.assertEqual(output, "% Invalid command")
+
+    def test_concurrency_limit(self):
+        commands = ["show {}".format(i) for i in range(6)]
+        outputs = self.loop.run_until_complete(self.device.send_commands(commands))
+        self.assertEqual(outputs["show 5"], "output of show 5")
+        self.assertEqual(self.device._conn.max_active, 2)
+
+    def test_timeout_of_concurrent_commands(self):
+        async def run():
+            return await asyncio.gather(
+                self.device.send_command("show clock"),
+                self.device.send_command("slow", timeout=0.1),
+                return_exceptions=True,
+            )
+
+        start = time.monotonic()
+        output, error = self.loop.run_until_complete(run())
+        self.assertEqual(output, "output of show clock")
+        self.assertIsInstance(error, netdev.TimeoutError)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(self.device._conn.active, 0)
+
+    def test_shell_is_not_available(self):
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(self.device.send_config_set(["interface Gi1"]))
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(self.device.send_command("copy run start", pattern=r"\?"))
+
+    def test_unsupported_platform(self):
+        with self.assertRaises(ValueError):
+            BaseDevice(host="localhost", loop=self.loop, exec_mode=True)
+
+
+class TestLogEvent(unittest.TestCase):
+    def test_payload_is_opt_in(self):
+        netdev.logger.setLevel(logging.DEBUG)
+        try:
+            with self.assertLogs("netdev", level=logging.DEBUG) as logs:
+                log_event("router", "send_command", bytes=6, payload="output")
+        finally:
+            netdev.logger.setLevel(logging.WARNING)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].netdev, {"host": "router", "phase": "send_command", "bytes": 6})
+        self.assertEqual(logs.records[0].getMessage(), "Host router: send_command bytes=6")
+
+    def test_payload_capture(self):
+        payload_logger.setLevel(logging.DEBUG)
+        try:
+            with self.assertLogs("netdev.payload", level=logging.DEBUG) as logs:
+                log_event("router", "send_command", bytes=6, payload="output")
+        finally:
+            payload_logger.setLevel(logging.WARNING)
+        self.assertIn("'output'", logs.records[0].getMessage())
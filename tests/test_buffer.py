@@ -0,0 +1,68 @@
+import re
+import unittest
+
+from netdev.buffer import ReadBuffer
+
+
+class TestReadBuffer(unittest.TestCase):
+    def test_prompt_split_between_chunks(self):
+        pattern = re.compile(r"router.*?(\(.*?\))?[>#]")
+        buffer = ReadBuffer(window=16)
+        for chunk in ["show version\n", "x" * 100 + "\n", "rou", "ter(con", "fig)#"]:
+            buffer.feed(chunk)
+            match = buffer.search(pattern)
+        self.assertIsNotNone(match)
+        self.assertEqual(match.group(), "router(config)#")
+        self.assertEqual(buffer.getvalue(), "show version\n" + "x" * 100 + "\nrouter(config)#")
+
+    def test_no_match_keeps_bounded_tail(self):
+        pattern = re.compile(r"router#")
+        buffer = ReadBuffer(window=32)
+        for _ in range(100):
+            buffer.feed("a" * 1000)
+            self.assertIsNone(buffer.search(pattern))
+        self.assertLessEqual(len(buffer.tail), 33)
+        self.assertEqual(len(buffer), 100000)
+        self.assertEqual(buffer.chunks, 100)
+
+    def test_anchor_sees_real_context(self):
+        pattern = re.compile(r"^router#", flags=re.M)
+        buffer = ReadBuffer(window=8)
+        buffer.feed("a" * 100)
+        self.assertIsNone(buffer.search(pattern))
+        buffer.feed("router#")
+        self.assertIsNone(buffer.search(pattern))
+        buffer.feed("\nrouter#")
+        self.assertIsNotNone(buffer.search(pattern))
+
+    def test_consume(self):
+        pattern = re.compile(r"router#")
+        buffer = ReadBuffer(window=8)
+        buffer.feed("router#\nout\nrouter#")
+        first = buffer.search(pattern)
+        buffer.consume(first)
+        second = buffer.search(pattern)
+        self.assertIsNotNone(second)
+        self.assertEqual(buffer.tail_start + second.start(), 12)
+
+    def test_take(self):
+        pattern = re.compile(r"router#")
+        buffer = ReadBuffer(window=8)
+        buffer.feed("line 1\nline 2\nrou")
+        buffer.getvalue()
+        self.assertIsNone(buffer.search(pattern))
+        self.assertEqual(buffer.take(buffer.scan_start), "line 1\nli")
+        buffer.feed("ter#")
+        match = buffer.search(pattern)
+        self.assertEqual(buffer.tail_start + match.start(), 14)
+        self.assertEqual((buffer.start, buffer.getvalue()), (9, "ne 2\nrouter#"))
+        self.assertEqual((len(buffer), buffer.chunks), (21, 2))
+
+    def test_bytes(self):
+        pattern = re.compile(rb"router#")
+        buffer = ReadBuffer(window=8, empty=b"")
+        buffer.feed(b"data\nrou")
+        self.assertIsNone(buffer.search(pattern))
+        buffer.feed(b"ter#")
+        self.assertIsNotNone(buffer.search(pattern))
+        self.assertEqual(buffer.getvalue(), b"data\nrouter#")
@@ -56,6 +56,27 @@ class TestIOS(unittest.TestCase):
 
         self.loop.run_until_complete(task())
 
+    def test_stream_command(self):
+        async def task():
+            for dev in self.devices:
+                async with netdev.create(**dev) as ios:
+                    out = await ios.send_command('show run')
+                    parts = [part async for part in ios.stream_command('show run')]
+                    self.assertEqual(out, "".join(parts))
+
+        self.loop.run_until_complete(task())
+
+    def test_parallel_channels(self):
+        async def task():
+            for dev in self.devices:
+                async with netdev.create(**dev, channels=3) as ios:
+                    commands = ["show run | i hostname", "show run | i interface", "show run | i line", "dir"]
+                    outputs = await asyncio.gather(*(ios.send_command(cmd) for cmd in commands))
+                    for cmd, out in zip(commands, outputs):
+                        self.assertEqual(out, await ios.send_command(cmd))
+
+        self.loop.run_until_complete(task())
+
     def test_config_set(self):
         async def task():
             for dev in self.devices:
@@ -0,0 +1,107 @@
+import asyncio
+import re
+import unittest
+
+from netdev.deadline import Deadline
+from netdev.exceptions import TimeoutError
+from netdev.vendors import BaseDevice
+
+
+class SlowReader(object):
+    """Reader returning chunks with a delay between them"""
+
+    def __init__(self, chunks, delay):
+        self._chunks = list(chunks)
+        self._delay = delay
+
+    async def read(self, n):
+        await asyncio.sleep(self._delay)
+        if not self._chunks:
+            await asyncio.sleep(3600)
+        return self._chunks.pop(0)
+
+
+class TestDeadline(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_reads(self, reader, idle_timeout, total_timeout, count):
+        async def reads():
+            with Deadline(self.loop, idle_timeout, total_timeout) as deadline:
+                for _ in range(count):
+                    await reader.read(1)
+                    deadline.touch()
+            return deadline
+
+        return self.loop.run_until_complete(reads())
+
+    def test_activity_extends_idle_timeout(self):
+        reader = SlowReader(["x"] * 10, 0.02)
+        deadline = self.run_reads(reader, 0.05, None, 10)
+        self.assertFalse(deadline.expired)
+
+    def test_idle_timeout(self):
+        reader = SlowReader([], 0.01)
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_reads(reader, 0.05, None, 1)
+
+    def test_total_timeout(self):
+        reader = SlowReader(["x"] * 100, 0.01)
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_reads(reader, 0.05, 0.1, 100)
+
+    def test_remaining(self):
+        deadline = Deadline(self.loop, idle_timeout=10, total_timeout=5)
+        self.assertLessEqual(deadline.remaining(), 5)
+        self.assertIsNone(Deadline(self.loop).remaining())
+
+
+class TestDeviceDeadline(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.device = BaseDevice(host="localhost", timeout=0.05, loop=self.loop)
+        self.device._base_pattern = r"router#"
+
+    def tearDown(self):
+        self.loop.close()
+
+    def read(self):
+        pattern = re.compile(self.device._base_pattern)
+        return self.loop.run_until_complete(self.device._read_until(pattern))
+
+    def test_slow_output_within_idle_timeout(self):
+        self.device._stdout = SlowReader(["line\n"] * 10 + ["router#"], 0.01)
+        self.assertTrue(self.read().endswith("router#"))
+
+    def test_idle_timeout(self):
+        self.device._stdout = SlowReader(["line\n"], 0.01)
+        with self.assertRaises(TimeoutError):
+            self.read()
+        self.assertIsNone(self.device._deadline)
+
+    def test_device_created_outside_running_loop(self):
+        other_loop = asyncio.new_event_loop()
+        self.addCleanup(other_loop.close)
+        self.device = BaseDevice(host="localhost", timeout=0.05, loop=other_loop)
+        self.device._stdout = SlowReader(["line\n"], 0.01)
+
+        async def read():
+            return await asyncio.wait_for(
+                self.device._read_until(re.compile(r"router#")), 2
+            )
+
+        with self.assertRaises(TimeoutError):
+            self.loop.run_until_complete(read())
+
+    def test_total_timeout(self):
+        self.device._stdout = SlowReader(["line\n"] * 100 + ["router#"], 0.01)
+
+        async def read():
+            with self.device._deadline_scope(total_timeout=0.1):
+                return await self.device._read_until(re.compile(r"router#"))
+
+        with self.assertRaises(TimeoutError):
+            self.loop.run_until_complete(read())
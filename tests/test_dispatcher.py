@@ -0,0 +1,86 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import netdev
+import netdev.dispatcher
+from netdev.dispatcher import CLASS_MAPPER, get_class
+from netdev.vendors import IOSLikeDevice
+
+
+class FastIOS(IOSLikeDevice):
+    pass
+
+
+class TestDispatcher(unittest.TestCase):
+    def test_all_classes_are_importable(self):
+        for device_type in CLASS_MAPPER:
+            self.assertTrue(issubclass(get_class(device_type), netdev.vendors.BaseDevice))
+
+    def test_unsupported_device_type(self):
+        with self.assertRaises(ValueError):
+            netdev.create(host="localhost", device_type="unknown")
+
+    def test_lazy_vendors(self):
+        self.assertIs(netdev.vendors.CiscoIOS, get_class("cisco_ios"))
+        with self.assertRaises(AttributeError):
+            netdev.vendors.Unknown
+
+    def test_import_without_vendors(self):
+        statement = (
+            "import sys, netdev; "
+            "assert 'asyncssh' not in sys.modules; "
+            "assert not [name for name in sys.modules if name.startswith('netdev.vendors.')]; "
+            "netdev.create(host='localhost', device_type='cisco_ios'); "
+            "assert 'netdev.vendors.cisco.cisco_asa' in sys.modules; "
+            "assert 'netdev.vendors.juniper' not in sys.modules"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", statement], cwd=root, check=True)
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.mapper = dict(CLASS_MAPPER)
+        self.platforms = list(netdev.platforms)
+        self.tmp_dir = tempfile.mkdtemp()
+        netdev.dispatcher._entry_points_loaded = False
+
+    def tearDown(self):
+        CLASS_MAPPER.clear()
+        CLASS_MAPPER.update(self.mapper)
+        netdev.platforms[:] = self.platforms
+        netdev.dispatcher._classes.clear()
+        netdev.dispatcher._entry_points_loaded = False
+        if self.tmp_dir in sys.path:
+            sys.path.remove(self.tmp_dir)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_register_string(self):
+        netdev.register("fast_ios", "test_dispatcher:FastIOS")
+        self.assertIn("fast_ios", netdev.platforms)
+        self.assertIsInstance(netdev.create(host="localhost", device_type="fast_ios"), FastIOS)
+
+    def test_override(self):
+        get_class("cisco_ios")
+        netdev.register("cisco_ios", FastIOS)
+        self.assertIs(get_class("cisco_ios"), FastIOS)
+        self.assertEqual(netdev.platforms.count("cisco_ios"), 1)
+
+    def test_invalid_path(self):
+        with self.assertRaises(ValueError):
+            netdev.register("fast_ios", "test_dispatcher.FastIOS")
+
+    def test_entry_points(self):
+        dist_info = os.path.join(self.tmp_dir, "netdev_fast-1.0.dist-info")
+        os.mkdir(dist_info)
+        with open(os.path.join(dist_info, "METADATA"), "w") as file:
+            file.write("Metadata-Version: 2.1\nName: netdev-fast\nVersion: 1.0\n")
+        with open(os.path.join(dist_info, "entry_points.txt"), "w") as file:
+            file.write("[netdev.vendors]\nfast_ios = test_dispatcher:FastIOS\ncisco_ios = test_dispatcher:FastIOS\n")
+        sys.path.append(self.tmp_dir)
+        self.assertIs(get_class("fast_ios"), FastIOS)
+        self.assertIsNot(get_class("cisco_ios"), FastIOS)
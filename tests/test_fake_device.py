@@ -0,0 +1,178 @@
+import asyncio
+import unittest
+
+import asyncssh
+
+import netdev
+from netdev.testing import FakeDevice
+
+BIG_OUTPUT = "\n".join("line {}".format(i) for i in range(60))
+
+
+class TestFakeDevice(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_fake(self, device_type, job, **kwargs):
+        async def run():
+            async with FakeDevice(device_type, **kwargs) as fake:
+                return await asyncio.wait_for(job(fake), 10)
+
+        return self.loop.run_until_complete(run())
+
+    def test_platforms(self):
+        config = {
+            "cisco_ios": ["interface Gi0/1", "description uplink"],
+            "cisco_ios_xr": ["interface Gi0/0/0/1", "description uplink"],
+            "juniper_junos": ["set system host-name lab"],
+            "hp_comware": ["vlan 10"],
+            "hp_comware_limited": ["vlan 10"],
+            "mikrotik_routeros": None,
+        }
+        for device_type, commands in config.items():
+            async def job(fake):
+                async with netdev.create(**fake.connection_params()) as device:
+                    output = await device.send_command("show big")
+                    if commands:
+                        await device.send_config_set(commands)
+                    return output, device.base_prompt
+
+            with self.subTest(device_type=device_type):
+                output, prompt = self.run_fake(device_type, job, outputs={"show big": BIG_OUTPUT})
+                self.assertEqual(output, BIG_OUTPUT)
+                self.assertEqual(prompt.split(":")[-1], "fake")
+
+    def test_commands(self):
+        async def job(fake):
+            async with netdev.create(**fake.connection_params()) as device:
+                await device.send_config_set(["interface Gi0/1", "description uplink"])
+            return fake.commands
+
+        commands = self.run_fake("cisco_ios", job)
+        self.assertEqual(
+            commands, ["enable", "terminal length 0", "conf t", "interface Gi0/1", "description uplink", "end"]
+        )
+
+    def test_send_commands(self):
+        async def job(fake):
+            async with netdev.create(**fake.connection_params()) as device:
+                return [
+                    await device.send_commands(["show a", "show b"], window=window)
+                    for window in (1, 2)
+                ]
+
+        outputs = {"show a": "AAA", "show b": "BBB"}
+        # Prompts of JunOS, RouterOS and terminal end with a space after the delimiter
+        for device_type in ("cisco_ios", "juniper_junos", "mikrotik_routeros", "terminal"):
+            with self.subTest(device_type=device_type):
+                results = self.run_fake(device_type, job, outputs=outputs)
+                self.assertEqual(results, [outputs, outputs])
+
+    def test_config_error(self):
+        async def job(fake):
+            async with netdev.create(**fake.connection_params()) as device:
+                with self.assertRaises(netdev.ConfigError):
+                    await device.send_config_set(["invalid command"], stop_on_error=True)
+
+        self.run_fake("cisco_ios", job)
+
+    def test_wrong_secret(self):
+        async def job(fake):
+            with self.assertRaises(ValueError):
+                async with netdev.create(**fake.connection_params(secret="wrong")):
+                    pass
+
+        self.run_fake("cisco_ios", job)
+
+    def test_paging(self):
+        async def job(fake):
+            async with asyncssh.connect(
+                fake.host, port=fake.port, username="admin", password="admin", known_hosts=None
+            ) as conn:
+                stdin, stdout, _ = await conn.open_session(term_type="Dumb")
+                await stdout.readuntil("fake>")
+                stdin.write("show big\n")
+                first_page = await stdout.readuntil("--More--")
+                stdin.write(" ")
+                second_page = await stdout.readuntil("--More--")
+                stdin.write("q")
+                await stdout.readuntil("fake>")
+                return first_page.count("line"), second_page.count("line")
+
+        self.assertEqual(self.run_fake("cisco_ios", job, outputs={"show big": BIG_OUTPUT}), (24, 24))
+
+    def test_ansi_codes(self):
+        async def job(fake):
+            async with netdev.create(**fake.connection_params()) as device:
+                return await device.send_command("show big")
+
+        output = self.run_fake("cisco_sg3xx", job, outputs={"show big": BIG_OUTPUT})
+        self.assertEqual(output, BIG_OUTPUT)
+
+    def test_parallel_channels(self):
+        async def job(fake):
+            async with netdev.create(**fake.connection_params(channels=2)) as device:
+
+                async def stream():
+                    return "".join([part async for part in device.stream_command("show big")])
+
+                return await asyncio.gather(
+                    device.send_config_set(["interface Gi0/1", "description uplink"]),
+                    device.send_command("show big"),
+                    stream(),
+                    device.send_command("show big"),
+                )
+
+        config, *outputs = self.run_fake("cisco_ios", job, latency=0.05, outputs={"show big": BIG_OUTPUT})
+        self.assertIn("description uplink", config)
+        self.assertEqual(outputs, [BIG_OUTPUT] * 3)
+
+    def test_exec_mode(self):
+        async def job(fake):
+            async with netdev.create(**fake.connection_params(exec_mode=True, channels=2)) as device:
+                return await device.send_commands(["show clock", "show version"])
+
+        outputs = self.run_fake("cisco_nxos", job, outputs={"show clock": "12:00:00"})
+        self.assertEqual(outputs["show clock"], "12:00:00")
+        self.assertIn("NX-OS", outputs["show version"])
+
+    def test_idle_timeout(self):
+        big_output = "\n".join("interface Ethernet1/{} is up".format(i) for i in range(2000))
+        for exec_mode in (False, True):
+            async def job(fake):
+                async with netdev.create(**fake.connection_params(exec_mode=exec_mode, timeout=1)) as device:
+                    return await device.send_command("show big")
+
+            # The output is sent for more than a second, but the timeout is the idle one in both modes
+            with self.subTest(exec_mode=exec_mode):
+                output = self.run_fake(
+                    "cisco_nxos", job, outputs={"show big": big_output}, bandwidth=40000, chunk_size=4096
+                )
+                self.assertEqual(output, big_output)
+
+    def test_latency(self):
+        async def job(fake):
+            async with netdev.create(**fake.connection_params()) as device:
+                start = self.loop.time()
+                await device.send_command("show clock")
+                return self.loop.time() - start
+
+        duration = self.run_fake("cisco_ios", job, outputs={"show clock": "12:00:00"}, latency=0.1)
+        self.assertGreaterEqual(duration, 0.1)
+
+    def test_chunks(self):
+        async def job(fake):
+            async with netdev.create(**fake.connection_params()) as device:
+                return await device.send_command("show big")
+
+        output = self.run_fake("juniper_junos", job, outputs={"show big": BIG_OUTPUT}, chunk_size=7)
+        self.assertEqual(output, BIG_OUTPUT)
+
+    def test_loopback_only(self):
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(FakeDevice().start("0.0.0.0"))
+        with self.assertRaises(ValueError):
+            FakeDevice("unknown")
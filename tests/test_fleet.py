@@ -0,0 +1,220 @@
+import asyncio
+import threading
+import time
+import unittest
+import unittest.mock
+
+import netdev.fleet
+from netdev.fleet import Result, ShardedRunner
+from netdev.pool import ConnectionPool
+from netdev.testing import FakeDevice
+
+
+class Connection(object):
+    def __init__(self, params):
+        self._params = params
+
+    async def __aenter__(self):
+        return self._params
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class Pool(object):
+    def connection(self, **params):
+        return Connection(params)
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.active = {}
+        self.max_active = {}
+
+    def tearDown(self):
+        self.loop.close()
+
+    async def job(self, device):
+        keys = ("all", device["device_type"])
+        for key in keys:
+            self.active[key] = self.active.get(key, 0) + 1
+            self.max_active[key] = max(self.max_active.get(key, 0), self.active[key])
+        await asyncio.sleep(0.01)
+        for key in keys:
+            self.active[key] -= 1
+        if device["host"] == "fail":
+            raise ValueError("job error")
+        return device["host"]
+
+    def run_fleet(self, inventory, **kwargs):
+        async def collect():
+            return [result async for result in netdev.fleet.run(inventory, self.job, pool=Pool(), **kwargs)]
+
+        return self.loop.run_until_complete(collect())
+
+    def test_limits(self):
+        inventory = [{"host": str(i), "device_type": "cisco_asa" if i % 2 else "cisco_ios"} for i in range(40)]
+        results = self.run_fleet(inventory, limit=8, type_limits={"cisco_asa": 2})
+        self.assertEqual(sorted(result.result for result in results), sorted(str(i) for i in range(40)))
+        self.assertEqual(self.max_active["all"], 8)
+        self.assertEqual(self.max_active["cisco_asa"], 2)
+
+    def test_site_is_not_passed(self):
+        inventory = [{"host": "r1", "device_type": "cisco_ios", "site": "dc1"}]
+        result = self.run_fleet(inventory, site_limits=1)[0]
+        self.assertEqual(result.result, "r1")
+        self.assertEqual(result.params, inventory[0])
+
+    def test_exception_in_result(self):
+        inventory = [{"host": "fail", "device_type": "cisco_ios"}, {"host": "ok", "device_type": "cisco_ios"}]
+        results = {result.host: result for result in self.run_fleet(inventory)}
+        self.assertIsInstance(results["fail"].exception, ValueError)
+        self.assertEqual(results["ok"].result, "ok")
+
+    def test_ramp_up(self):
+        inventory = [{"host": str(i), "device_type": "cisco_ios"} for i in range(5)]
+        start = self.loop.time()
+        self.run_fleet(inventory, ramp_up=50)
+        self.assertGreaterEqual(self.loop.time() - start, 0.08)
+
+
+class UnpicklableError(Exception):
+    def __init__(self, host, reason):
+        super().__init__("{}: {}".format(host, reason))
+
+
+class Process(object):
+    def __init__(self, alive):
+        self.alive = alive
+
+    def is_alive(self):
+        return self.alive
+
+
+class BusyQueue(object):
+    """Results queue of workers which always has a message"""
+
+    def __init__(self):
+        self.stopped = False
+
+    def get(self, timeout):
+        time.sleep(0.01)
+        return None if self.stopped else (0, "done", 0)
+
+
+class UnpicklableResult(object):
+    def __init__(self, output):
+        self.output = output
+
+    def __reduce__(self):
+        return UnpicklableResult, ()
+
+
+async def show_version(device):
+    return await device.send_command("show version")
+
+
+class TestFailedConnect(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_connection_is_closed(self):
+        async def run(pool):
+            async with FakeDevice("cisco_ios") as fake:
+                params = fake.connection_params(secret="wrong", timeout=2)
+                results = [result async for result in netdev.fleet.run([params], show_version, pool=pool)]
+                # Closing of the connection is finished by the server asynchronously
+                for _ in range(100):
+                    if not fake._connections:
+                        break
+                    await asyncio.sleep(0.01)
+                return results, len(fake._connections)
+
+        for pool in (None, ConnectionPool()):
+            with self.subTest(pool=pool):
+                (result,), connections = self.loop.run_until_complete(run(pool))
+                self.assertIsNotNone(result.exception)
+                self.assertEqual(connections, 0)
+
+
+class TestShardedRunner(unittest.TestCase):
+    def test_deterministic_shards(self):
+        runner = ShardedRunner(workers=4)
+        hosts = ["10.0.0.{}".format(i) for i in range(100)]
+        shards = [runner.shard(host) for host in hosts]
+        self.assertEqual(shards, [ShardedRunner(workers=4).shard(host) for host in hosts])
+        self.assertEqual(set(shards), {0, 1, 2, 3})
+
+    def test_picklable_results(self):
+        def send(result):
+            return netdev.fleet._loads_result(netdev.fleet._dumps_result(result))
+
+        result = send(Result("r1", {"host": "r1"}, None, UnpicklableError("r1", "failed")))
+        self.assertIsInstance(result.exception, RuntimeError)
+        result = send(Result("r1", {"host": "r1"}, lambda: None, None))
+        self.assertIsNone(result.result)
+        self.assertIsNotNone(result.exception)
+        result = Result("r1", {"host": "r1"}, "output", netdev.TimeoutError("r1"))
+        sent = send(result)
+        self.assertEqual((sent.host, sent.params, sent.result), (result.host, result.params, result.result))
+        self.assertIsInstance(sent.exception, netdev.TimeoutError)
+        result = send(Result("r1", {"host": "r1"}, UnpicklableResult("output"), None))
+        self.assertEqual(result.params, {"host": "r1"})
+        self.assertIsInstance(result.exception, RuntimeError)
+
+    def test_dead_worker_while_others_send(self):
+        runner = ShardedRunner(workers=2)
+        runner._loop = loop = asyncio.new_event_loop()
+        runner._results = BusyQueue()
+        runner._processes = [Process(True), Process(False)]
+
+        async def wait_dead():
+            while 1 not in runner._dead:
+                await asyncio.sleep(0.01)
+
+        reader = threading.Thread(target=runner._read_results)
+        try:
+            with unittest.mock.patch.object(netdev.fleet, "_WORKERS_CHECK_INTERVAL", 0.05):
+                reader.start()
+                loop.run_until_complete(asyncio.wait_for(wait_dead(), 5))
+        finally:
+            runner._results.stopped = True
+            reader.join()
+            loop.close()
+        self.assertEqual(runner._dead, {1})
+
+    def test_dead_worker(self):
+        runner = ShardedRunner(workers=2)
+        inventory = [
+            {"host": "127.0.0.{}".format(i), "port": 1, "device_type": "cisco_ios", "timeout": 5}
+            for i in range(1, 10)
+        ]
+        alive = [item for item in inventory if runner.shard(item["host"]) == 0]
+        dead = [item for item in inventory if runner.shard(item["host"]) == 1]
+
+        async def collect(items):
+            return [result async for result in runner.run(items, show_version)]
+
+        async def run():
+            async with runner:
+                runner._processes[1].kill()
+                while 1 not in runner._dead:
+                    await asyncio.sleep(0.1)
+                with self.assertRaises(RuntimeError):
+                    await collect(dead)
+                with self.assertRaises(RuntimeError):
+                    await collect(inventory)
+                return await collect(alive)
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(asyncio.wait_for(run(), 30))
+        finally:
+            loop.close()
+        self.assertEqual(sorted(result.host for result in results), sorted(item["host"] for item in alive))
+        self.assertTrue(all(result.exception is not None for result in results))
+
@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+
+import netdev
+from netdev.testing import FakeDevice
+
+
+class Recorder(netdev.Hooks):
+    def __init__(self):
+        self.phases = []
+        self.operations = []
+        self.errors = []
+        self.disconnects = 0
+
+    def on_phase(self, device, phase, start, duration):
+        self.phases.append(phase)
+
+    def on_operation(self, device, stats):
+        self.operations.append(stats)
+
+    def on_error(self, device, operation, exception):
+        self.errors.append((operation, exception))
+
+    def on_disconnect(self, device):
+        self.disconnects += 1
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.hooks = Recorder()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_fake(self, job, latency=0, **params):
+        async def run():
+            outputs = {"show big": "line\n" * 500}
+            async with FakeDevice(outputs=outputs, latency=latency) as fake:
+                params.update(hooks=self.hooks)
+                device = netdev.create(**fake.connection_params(**params))
+                return await asyncio.wait_for(job(device), 10)
+
+        return self.loop.run_until_complete(run())
+
+    def test_connect_phases(self):
+        async def job(device):
+            async with device:
+                pass
+
+        self.run_fake(job)
+        self.assertEqual(
+            self.hooks.phases,
+            [
+                "tcp_connect",
+                "kex",
+                "auth",
+                "establish_connection",
+                "set_base_prompt",
+                "enable_mode",
+                "disable_paging",
+                "connect",
+            ],
+        )
+        self.assertEqual(self.hooks.operations, [])
+        self.assertEqual(self.hooks.disconnects, 1)
+
+    def test_operations(self):
+        async def job(device):
+            async with device:
+                await device.send_command("show big")
+                await device.send_commands(["show version", "show big"])
+                await device.send_config_set(["interface Gi0/1", "description uplink"])
+
+        self.run_fake(job)
+        command, commands, config = self.hooks.operations
+        self.assertEqual(command.operation, "send_command")
+        self.assertEqual(command.command, "show big\n")
+        self.assertGreater(command.bytes, 2500)
+        self.assertGreaterEqual(command.chunks, 1)
+        self.assertEqual(command.reads, 1)
+        self.assertLessEqual(command.first_byte, command.duration)
+        self.assertLessEqual(
+            command.scan_time + command.normalize_time, command.duration
+        )
+        self.assertEqual(commands.operation, "send_commands")
+        self.assertIsNone(commands.command)
+        self.assertEqual(commands.commands, 2)
+        self.assertGreater(commands.bytes, command.bytes)
+        # Entering and leaving configuration mode are parts of the operation
+        self.assertEqual(config.operation, "send_config_set")
+        self.assertEqual(config.commands, 2)
+        self.assertGreaterEqual(config.reads, 3)
+        self.assertEqual(self.hooks.errors, [])
+
+    def test_exec_mode(self):
+        async def job(device):
+            async with device:
+                await device.send_command("show big")
+
+        self.run_fake(job, exec_mode=True)
+        self.assertEqual(self.hooks.phases[-2:], ["establish_connection", "connect"])
+        (stats,) = self.hooks.operations
+        self.assertEqual(stats.operation, "exec_command")
+        self.assertGreater(stats.bytes, 2500)
+
+    def test_config_error(self):
+        async def job(device):
+            async with device:
+                with self.assertRaises(netdev.ConfigError):
+                    await device.send_config_set(
+                        ["invalid command"], stop_on_error=True
+                    )
+
+        self.run_fake(job)
+        ((operation, error),) = self.hooks.errors
+        self.assertEqual(operation, "send_config_set")
+        self.assertIsInstance(error, netdev.ConfigError)
+        self.assertEqual(self.hooks.operations, [])
+
+    def test_timeout(self):
+        async def job(device):
+            async with device:
+                with self.assertRaises(netdev.TimeoutError):
+                    await device.send_command("show big", timeout=0.01)
+
+        self.run_fake(job, latency=0.05)
+        ((operation, error),) = self.hooks.errors
+        self.assertEqual(operation, "send_command")
+        self.assertIsInstance(error, netdev.TimeoutError)
+
+    def test_connect_error(self):
+        with self.assertRaises(netdev.DisconnectError):
+            self.run_fake(lambda device: device.connect(), password="wrong")
+        ((operation, error),) = self.hooks.errors
+        self.assertEqual(operation, "connect")
+        self.assertIsInstance(error, netdev.DisconnectError)
+        self.assertEqual(self.hooks.phases, ["tcp_connect", "kex"])
+
+    def test_parallel_channels(self):
+        async def job(device):
+            async with device:
+                await asyncio.gather(
+                    device.send_command("show big"), device.send_command("show version")
+                )
+
+        self.run_fake(job, channels=2)
+        self.assertEqual(self.hooks.phases.count("connect"), 1)
+        self.assertEqual(self.hooks.phases[-1], "open_channel")
+        self.assertEqual(len(self.hooks.operations), 2)
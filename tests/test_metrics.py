@@ -0,0 +1,140 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+import netdev
+from netdev.metrics import Metrics
+from netdev.testing import FakeDevice
+
+
+class StubDevice(object):
+    device_type = "cisco_ios"
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.metrics = Metrics(buckets=(0.1, 1))
+
+    def tearDown(self):
+        self.loop.close()
+
+    def samples(self):
+        lines = self.metrics.render().splitlines()
+        return dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+
+    def test_sessions(self):
+        async def run():
+            async with FakeDevice("cisco_ios") as fake:
+                params = fake.connection_params(hooks=self.metrics)
+                async with netdev.create(**params) as device:
+                    await device.send_command("show version")
+                    await device.send_command("show version")
+                    active = self.samples()
+                return active
+
+        active = self.loop.run_until_complete(asyncio.wait_for(run(), 10))
+        self.assertEqual(active['netdev_sessions_active{device_type="cisco_ios"}'], "1")
+        samples = self.samples()
+        self.assertEqual(
+            samples['netdev_sessions_active{device_type="cisco_ios"}'], "0"
+        )
+        self.assertEqual(
+            samples['netdev_connect_duration_seconds_count{device_type="cisco_ios"}'],
+            "1",
+        )
+        labels = '{device_type="cisco_ios",operation="send_command"}'
+        self.assertEqual(samples["netdev_command_duration_seconds_count" + labels], "2")
+        self.assertGreater(
+            int(samples['netdev_received_bytes_total{device_type="cisco_ios"}']), 0
+        )
+
+    def test_errors(self):
+        device = StubDevice()
+        self.metrics.on_error(device, "connect", netdev.TimeoutError("host"))
+        self.metrics.on_error(device, "send_command", netdev.TimeoutError("host"))
+        self.metrics.on_error(device, "send_command", netdev.TimeoutError("host"))
+        self.metrics.on_error(device, "connect", netdev.DisconnectError("host", 2, ""))
+        self.metrics.on_error(device, "send_config_set", netdev.CommitError("host", ""))
+        self.metrics.on_error(device, "send_config_set", ValueError())
+        samples = self.samples()
+        self.assertEqual(
+            samples[
+                'netdev_timeouts_total{device_type="cisco_ios",operation="connect"}'
+            ],
+            "1",
+        )
+        self.assertEqual(
+            samples[
+                'netdev_timeouts_total{device_type="cisco_ios",operation="send_command"}'
+            ],
+            "2",
+        )
+        self.assertEqual(
+            samples[
+                'netdev_disconnects_total{device_type="cisco_ios",operation="connect"}'
+            ],
+            "1",
+        )
+        self.assertEqual(
+            samples['netdev_commit_failures_total{device_type="cisco_ios"}'], "1"
+        )
+
+    def test_histogram(self):
+        for duration in (0.05, 0.1, 0.5, 2):
+            self.metrics.on_phase(StubDevice(), "connect", 0, duration)
+        self.metrics.on_phase(StubDevice(), "auth", 0, 0.01)
+        lines = [
+            line
+            for line in self.metrics.render().splitlines()
+            if line.startswith("netdev_connect_duration_seconds")
+        ]
+        self.assertEqual(
+            lines,
+            [
+                'netdev_connect_duration_seconds_bucket{device_type="cisco_ios",le="0.1"} 2',
+                'netdev_connect_duration_seconds_bucket{device_type="cisco_ios",le="1"} 3',
+                'netdev_connect_duration_seconds_bucket{device_type="cisco_ios",le="+Inf"} 4',
+                'netdev_connect_duration_seconds_sum{device_type="cisco_ios"} 2.65',
+                'netdev_connect_duration_seconds_count{device_type="cisco_ios"} 4',
+            ],
+        )
+        self.assertIn(
+            "# TYPE netdev_connect_duration_seconds histogram", self.metrics.render()
+        )
+
+    def test_write(self):
+        self.metrics.on_phase(StubDevice(), "connect", 0, 0.5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "netdev.prom")
+            self.metrics.write(path)
+            with open(path) as file:
+                self.assertEqual(file.read(), self.metrics.render())
+            self.assertEqual(os.listdir(directory), ["netdev.prom"])
+
+    def test_serve(self):
+        async def get(port, path):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                "GET {} HTTP/1.1\r\nHost: localhost\r\n\r\n".format(path).encode()
+            )
+            response = await reader.read()
+            writer.close()
+            return response.decode()
+
+        async def run():
+            server = await self.metrics.serve()
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return await get(port, "/metrics"), await get(port, "/")
+            finally:
+                await self.metrics.close()
+
+        self.metrics.on_phase(StubDevice(), "connect", 0, 0.5)
+        metrics, other = self.loop.run_until_complete(run())
+        head, body = metrics.split("\r\n\r\n", 1)
+        self.assertTrue(head.startswith("HTTP/1.0 200 OK"))
+        self.assertIn("Content-Type: text/plain; version=0.0.4", head)
+        self.assertEqual(body, self.metrics.render())
+        self.assertTrue(other.startswith("HTTP/1.0 404 Not Found"))
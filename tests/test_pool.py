@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+
+import netdev
+from netdev.pool import ConnectionPool
+
+
+class Channel(object):
+    def __init__(self):
+        self.eof = False
+
+    def at_eof(self):
+        return self.eof
+
+
+class Device(object):
+    def __init__(self, host):
+        self._host = host
+        self._stdout = Channel()
+        self.disconnected = False
+
+    async def disconnect(self):
+        self.disconnected = True
+
+
+class Connection(object):
+    """Connection of asyncssh before 2.15 without is_closed()"""
+
+    def __init__(self):
+        self._transport = object()
+
+
+class ClosableConnection(Connection):
+    def is_closed(self):
+        return self._transport is None
+
+
+class ExecDevice(Device):
+    def __init__(self, host, conn):
+        super().__init__(host)
+        self._exec_mode = True
+        self._conn = conn
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.pool = ConnectionPool(max_per_host=2, idle_ttl=0.05, health_check=False)
+        self.params = {"host": "router", "username": "user", "password": "pass"}
+
+    def tearDown(self):
+        self.loop.close()
+
+    def checkin(self, device, params):
+        async def checkin():
+            self.pool._host_limits.setdefault(device._host, asyncio.Semaphore(2))
+            await self.pool._host_limits[device._host].acquire()
+            self.pool._checked_out[device] = self.pool._make_key(params)
+            await self.pool.release(device)
+
+        self.loop.run_until_complete(checkin())
+
+    def test_reuse_most_recent(self):
+        first, second = Device("router"), Device("router")
+        self.checkin(first, self.params)
+        self.checkin(second, self.params)
+        device = self.loop.run_until_complete(self.pool.acquire(**self.params))
+        self.assertIs(device, second)
+
+    def test_credentials_in_key(self):
+        self.checkin(Device("router"), self.params)
+        params = dict(self.params, password="other")
+        key = self.pool._make_key(params)
+        self.assertIsNone(self.loop.run_until_complete(self.pool._get_idle(key)))
+
+    def test_expired_and_broken_sessions_are_closed(self):
+        expired, broken = Device("router"), Device("router")
+        self.checkin(expired, self.params)
+        self.loop.run_until_complete(asyncio.sleep(0.1))
+        self.checkin(broken, self.params)
+        broken._stdout.eof = True
+        key = self.pool._make_key(self.params)
+        self.assertIsNone(self.loop.run_until_complete(self.pool._get_idle(key)))
+        self.assertTrue(expired.disconnected)
+        self.assertTrue(broken.disconnected)
+
+    def test_exec_mode_health(self):
+        for conn in (Connection(), ClosableConnection()):
+            device = ExecDevice("router", conn)
+            with self.subTest(type(conn).__name__):
+                self.assertTrue(self.loop.run_until_complete(self.pool._is_healthy(device)))
+                conn._transport = None
+                self.assertFalse(self.loop.run_until_complete(self.pool._is_healthy(device)))
+
+    def test_dirty_sessions_are_discarded(self):
+        async def use(error):
+            with self.assertRaises(type(error)):
+                async with self.pool.connection(**self.params):
+                    raise error
+
+        errors = (
+            netdev.ConfigError("router", "bad", "% Invalid input"),
+            asyncio.CancelledError(),
+            netdev.TimeoutError("router"),
+            ValueError("job error"),
+        )
+        for error in errors:
+            device = Device("router")
+            self.checkin(device, self.params)
+            self.loop.run_until_complete(use(error))
+            with self.subTest(type(error).__name__):
+                self.assertEqual(device.disconnected, not isinstance(error, ValueError))
+            self.loop.run_until_complete(self.pool.close())
+            self.pool = ConnectionPool(max_per_host=2, idle_ttl=0.05, health_check=False)
+
+    def test_close(self):
+        device = Device("router")
+        self.checkin(device, self.params)
+        self.loop.run_until_complete(self.pool.close())
+        self.assertTrue(device.disconnected)
+        with self.assertRaises(RuntimeError):
+            self.loop.run_until_complete(self.pool.acquire(**self.params))
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from netdev.profiles import ProfileCache
+from netdev.vendors import CiscoIOS
+
+
+class TestProfileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "profiles.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_persistence(self):
+        cache = ProfileCache(self.path)
+        cache.set("10.0.0.1", "cisco_asa", {"prompt": "asa#"})
+        cache.set("10.0.0.1", "cisco_asa", {"prompt": "asa#", "multiple_mode": True})
+        cache.set("10.0.0.2", "cisco_ios", {"prompt": "router>"})
+        cache = ProfileCache(self.path)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("10.0.0.1", "cisco_asa"), {"prompt": "asa#", "multiple_mode": True})
+        self.assertIsNone(cache.get("10.0.0.1", "cisco_ios"))
+
+    def test_compact(self):
+        cache = ProfileCache(self.path)
+        for prompt in ("r1>", "r2>", "r3>"):
+            cache.set("10.0.0.1", "cisco_ios", {"prompt": prompt})
+        cache.compact()
+        with open(self.path) as file:
+            self.assertEqual(len(file.readlines()), 1)
+        self.assertEqual(ProfileCache(self.path).get("10.0.0.1", "cisco_ios"), {"prompt": "r3>"})
+
+    def test_broken_line(self):
+        with open(self.path, "w") as file:
+            file.write('{"host":"10.0.0.1","device_type":"cisco_ios","prompt":"r1>"}\n{"host":"10.0')
+        self.assertEqual(ProfileCache(self.path).get("10.0.0.1", "cisco_ios"), {"prompt": "r1>"})
+
+
+class TestProfileValidation(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ProfileCache(os.path.join(self.tmp_dir, "profiles.jsonl"))
+        self.cache.set("10.0.0.1", "cisco_ios", {"prompt": "router>"})
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def create(self):
+        return CiscoIOS(host="10.0.0.1", device_type="cisco_ios", loop=self.loop, profile_cache=self.cache)
+
+    def test_valid_prompt(self):
+        device = self.create()
+        device._validate_profile("Banner\r\n\r\nrouter>")
+        prompt = self.loop.run_until_complete(device._find_prompt())
+        self.assertEqual(prompt, "router>")
+
+    def test_changed_prompt(self):
+        device = self.create()
+        device._validate_profile("Banner\r\nswitch>")
+        self.assertFalse(device._profile_valid)
+        self.assertIsNone(device._last_prompt)